@@ -0,0 +1,55 @@
+"""Synthetic inputs for the benchmark suite."""
+import math
+import random
+from datetime import datetime, timedelta
+
+def price_csv_text(start: datetime = datetime(2025, 1, 1), days: int = 365, seed: int = 0) -> str:
+    """
+    Builds an hourly price CSV in the Nord Pool layout (ts_start, ts_end, price)
+    with a daily double peak, a weekly cycle and noise.
+
+    Timestamps carry a fixed +02:00 offset, so the data covers whole local days
+    of the simulator's Europe/Riga calendar.
+
+    Args:
+        start (datetime): The start of the first hour, in +02:00 local time.
+        days (int): The number of days covered.
+        seed (int): The seed of the noise.
+
+    Returns:
+        str: The CSV text.
+    """
+    rng = random.Random(seed)
+    lines = ["ts_start,ts_end,price"]
+    for hour in range(days * 24):
+        ts = start + timedelta(hours=hour)
+        daily = 0.04 * math.sin(math.pi * (ts.hour - 6) / 12) ** 2 + 0.03 * (ts.hour in (8, 9, 18, 19, 20))
+        weekly = -0.02 if ts.weekday() >= 5 else 0.0
+        price = max(-0.01, 0.08 + daily + weekly + rng.gauss(0.0, 0.015))
+        lines.append(f"{ts:%Y-%m-%d %H:%M:%S}+02:00,{ts + timedelta(hours=1):%Y-%m-%d %H:%M:%S}+02:00,{price:.6f}")
+    return "\n".join(lines) + "\n"
+
+def write_price_csv(path, days: int = 365, seed: int = 0) -> str:
+    """Writes a synthetic price CSV covering `days` days from 2025-01-01 and returns its path."""
+    with open(path, 'w') as f:
+        f.write(price_csv_text(days=days, seed=seed))
+    return str(path)
+
+def make_mock_sb3_agent():
+    """
+    Builds an untrained SB3 DQN with the simulator's observation and action
+    spaces, standing in for a trained checkpoint. Returns None if
+    stable_baselines3 is not installed.
+    """
+    try:
+        import gymnasium as gym
+        import numpy as np
+        from stable_baselines3 import DQN
+    except ImportError:
+        return None
+
+    class ChargingEnv(gym.Env):
+        observation_space = gym.spaces.Box(low=0.0, high=96.0, shape=(2,), dtype=np.float32)
+        action_space = gym.spaces.Discrete(3)
+
+    return DQN("MlpPolicy", ChargingEnv(), seed=0)
@@ -0,0 +1,402 @@
+"""
+Benchmarks for the simulation hot paths.
+
+Each benchmark reports its throughput (operations per second), per-call
+latency and peak Python-tracked memory. Results can be saved as a JSON
+baseline and later runs compared against it:
+
+    python -m benchmarks.suite --save            # record benchmarks/baselines.json
+    python -m benchmarks.suite                   # compare, exit 1 on regressions
+    python -m benchmarks.suite -k engine --quick # a reduced subset
+
+An operation is one call for the micro-benchmarks and one simulated battery
+step (agent x 15-minute step) for the end-to-end runs.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from .fixtures import write_price_csv, make_mock_sb3_agent
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+@dataclass
+class BenchmarkResult:
+    """The measurements of one benchmark."""
+    name: str
+    ops: int
+    seconds: float
+    latency_s: float
+    throughput: float
+    peak_memory_bytes: int
+
+class BenchmarkContext:
+    """Shared inputs of a suite run: a work directory, a price fixture and the scale."""
+    def __init__(self, workdir: str, scale: float = 1.0):
+        self.workdir = workdir
+        self.scale = scale
+        self.price_path = write_price_csv(os.path.join(workdir, "prices.csv"))
+
+    def count(self, n: int) -> int:
+        """Scales an operation count, keeping at least one operation."""
+        return max(1, int(n * self.scale))
+
+    def config(self, days: int) -> dict:
+        """Returns a simulation configuration over `days` days of the price fixture."""
+        from src.ev_cli_simulator.config_manager import ScenarioConfig
+        return {
+            'run_id': 1,
+            'years': days / 365 + 1e-9,
+            'battery_capacity': 60.0,
+            'max_charge_speed': 11.0,
+            'charger_power_levels': [-11.0, 0.0, 7.4, 11.0],
+            'start_soc': 0.2,
+            'soc_target': 0.8,
+            'price_path': self.price_path,
+            'scenarios': [ScenarioConfig("Workday", 18, 7, 0.7), ScenarioConfig("Holiday", 0, 24, 0.3)],
+            'seed': 1,
+        }
+
+# name -> (setup, repeats); setup(ctx) returns a callable that does the work and returns its op count
+BENCHMARKS: Dict[str, tuple] = {}
+
+def benchmark(name: str, repeats: int = 5):
+    """Registers a benchmark setup function under `name`."""
+    def register(setup: Callable[[BenchmarkContext], Callable[[], int]]):
+        BENCHMARKS[name] = (setup, repeats)
+        return setup
+    return register
+
+def _timestamps(n: int, seed: int = 0) -> list:
+    """Returns n random quarter-hour timestamps in Riga local time during 2025."""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=ZoneInfo("Europe/Riga"))
+    return [start + timedelta(minutes=15 * rng.randrange(4 * 24 * 360)) for _ in range(n)]
+
+@benchmark("price_model.get_price")
+def _price_lookup(ctx: BenchmarkContext):
+    from src.ev_cli_simulator.core.price_model import load_price_model
+    model = load_price_model(ctx.price_path)
+    timestamps = _timestamps(ctx.count(20_000))
+
+    def run():
+        get_price = model.get_price
+        for ts in timestamps:
+            get_price(ts)
+        return len(timestamps)
+    return run
+
+@benchmark("price_model.from_csv", repeats=3)
+def _price_load(ctx: BenchmarkContext):
+    from src.ev_cli_simulator.core.price_model import PriceModel
+
+    def run():
+        model = PriceModel.from_csv(ctx.price_path)
+        return len(model._price_array)
+    return run
+
+@benchmark("cost_calculator.calculate_step_costs")
+def _step_costs(ctx: BenchmarkContext):
+    from src.ev_cli_simulator.main import _build_cost_calculator
+    from src.ev_cli_simulator.core.price_model import load_price_model
+    config = ctx.config(1)
+    calculator = _build_cost_calculator(config, load_price_model(ctx.price_path))
+    rng = random.Random(1)
+    levels = config['charger_power_levels']
+    calls = [(rng.choice(levels), rng.random(), rng.uniform(0.0, 0.2)) for _ in range(ctx.count(20_000))]
+    timestamp = datetime(2025, 3, 1, tzinfo=ZoneInfo("Europe/Riga"))
+
+    def run():
+        for power_kw, soc, price in calls:
+            calculator.calculate_step_costs(power_kw, 0.25, timestamp, 60.0, soc, 1, price=price)
+        return len(calls)
+    return run
+
+@benchmark("simulation_engine.run_step")
+def _engine_steps(ctx: BenchmarkContext):
+    from src.ev_cli_simulator.main import _build_cost_calculator
+    from src.ev_cli_simulator.core.battery import Battery
+    from src.ev_cli_simulator.core.price_model import load_price_model
+    from src.ev_cli_simulator.core.simulation_engine import SimulationEngine
+    config = ctx.config(1)
+    calculator = _build_cost_calculator(config, load_price_model(ctx.price_path))
+    rng = random.Random(2)
+    calls = [(rng.choice(config['charger_power_levels']), rng.uniform(0.0, 0.2)) for _ in range(ctx.count(20_000))]
+    timestamp = datetime(2025, 3, 1, tzinfo=ZoneInfo("Europe/Riga"))
+
+    def run():
+        engine = SimulationEngine(Battery(60.0, initial_soc=0.5), calculator, 8000)
+        for power_kw, price in calls:
+            engine.run_step(power_kw, 0.25, timestamp, 1, price=price)
+        return len(calls)
+    return run
+
+def _step_row(i: int, timestamp: datetime) -> dict:
+    return dict(
+        run_id=1, day=i // 96, timestamp=timestamp, agent_type="DumbAgent", charging_scenario="Workday",
+        power_kw=11.0, electricity_cost=0.1 * i, calendar_cost=0.01, cyclic_cost=0.02,
+        total_cost=0.13, soc=0.5, soh=0.99, soc_fulfillment=0.625
+    )
+
+def _logger_benchmark(logger_class_name: str):
+    def setup(ctx: BenchmarkContext):
+        from src.ev_cli_simulator import data_logger
+        logger_class = getattr(data_logger, logger_class_name)
+        timestamp = datetime(2025, 3, 1, tzinfo=ZoneInfo("Europe/Riga"))
+        rows = [_step_row(i, timestamp) for i in range(ctx.count(50_000))]
+
+        def run():
+            logger = logger_class()
+            for row in rows:
+                logger.log_step(**row)
+            return len(rows)
+        return run
+    return setup
+
+benchmark("data_logger.log_step")(_logger_benchmark("DataLogger"))
+benchmark("columnar_logger.log_step")(_logger_benchmark("ColumnarDataLogger"))
+
+@benchmark("data_logger.get_dataframe", repeats=3)
+def _get_dataframe(ctx: BenchmarkContext):
+    from src.ev_cli_simulator.data_logger import DataLogger
+    logger = DataLogger()
+    timestamp = datetime(2025, 3, 1, tzinfo=ZoneInfo("Europe/Riga"))
+    for i in range(ctx.count(50_000)):
+        logger.log_step(**_step_row(i, timestamp))
+
+    def run():
+        return len(logger.get_dataframe())
+    return run
+
+def _simulation_benchmark(agent_kind: str, days: int, log_level: str = 'step'):
+    def setup(ctx: BenchmarkContext):
+        from src.ev_cli_simulator.main import run_simulation_run, DumbAgent
+        from src.ev_cli_simulator.data_logger import ColumnarDataLogger
+        from src.ev_cli_simulator.core.price_model import load_price_model
+        if agent_kind == 'baseline':
+            agents = {"DumbAgent": DumbAgent(), "DumbAgent2": DumbAgent()}
+        else:
+            model = make_mock_sb3_agent()
+            if model is None:
+                return None
+            agents = {"SB3": model}
+        config = {**ctx.config(ctx.count(days)), 'log_level': log_level}
+        price_model = load_price_model(ctx.price_path)
+
+        def run():
+            logger = ColumnarDataLogger()
+            summaries = run_simulation_run(config, agents, logger, price_model=price_model)
+            return sum(int(s['steps']) for s in summaries.values())
+        return run
+    return setup
+
+benchmark("run_simulation_run.baseline_year", repeats=3)(_simulation_benchmark('baseline', 365))
+benchmark("run_simulation_run.baseline_year_run_level", repeats=3)(_simulation_benchmark('baseline', 365, 'run'))
+benchmark("run_simulation_run.sb3_60_days", repeats=1)(_simulation_benchmark('sb3', 60))
+
+def _eight_runs_benchmark(batch: bool, log_level: str = 'step'):
+    """The same eight baseline runs, simulated as one batch or one run after another."""
+    def setup(ctx: BenchmarkContext):
+        from src.ev_cli_simulator.main import run_simulation_batch, run_simulation_run, DumbAgent
+        from src.ev_cli_simulator.data_logger import ColumnarDataLogger
+        from src.ev_cli_simulator.core.price_model import load_price_model
+        from src.ev_cli_simulator.core.simulation_calendar import SimulationCalendar
+        config = {**ctx.config(ctx.count(365)), 'log_level': log_level}
+        price_model = load_price_model(ctx.price_path)
+        calendar = SimulationCalendar(int(config['years'] * 365), config['scenarios'], price_model)
+        agents = {"DumbAgent": DumbAgent(), "DumbAgent2": DumbAgent()}
+        run_ids = list(range(1, 9))
+
+        def run():
+            logger = ColumnarDataLogger()
+            if batch:
+                summaries = run_simulation_batch(
+                    config, agents, logger, run_ids, price_model=price_model, calendar=calendar
+                )
+            else:
+                summaries = {
+                    run_id: run_simulation_run(
+                        {**config, 'run_id': run_id}, agents, logger, price_model=price_model, calendar=calendar
+                    )
+                    for run_id in run_ids
+                }
+            return sum(int(s['steps']) for run in summaries.values() for s in run.values())
+        return run
+    return setup
+
+benchmark("run_simulation_batch.baseline_8_runs", repeats=3)(_eight_runs_benchmark(batch=True))
+benchmark("run_simulation_batch.baseline_8_runs_run_level", repeats=3)(_eight_runs_benchmark(batch=True, log_level='run'))
+benchmark("run_simulation_run.baseline_8_runs", repeats=3)(_eight_runs_benchmark(batch=False))
+benchmark("run_simulation_run.baseline_8_runs_run_level", repeats=3)(_eight_runs_benchmark(batch=False, log_level='run'))
+
+def measure(name: str, ctx: BenchmarkContext, repeats: Optional[int] = None) -> Optional[BenchmarkResult]:
+    """
+    Runs one benchmark: best-of-`repeats` wall time, then one traced pass for
+    the peak memory. Returns None if the benchmark's dependencies are missing.
+    """
+    setup, default_repeats = BENCHMARKS[name]
+    run = setup(ctx)
+    if run is None:
+        return None
+
+    best, ops = float('inf'), 0
+    for _ in range(repeats or default_repeats):
+        started = time.perf_counter()
+        ops = run()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(name, ops, best, best / ops, ops / best, peak)
+
+def run_suite(names: List[str], scale: float = 1.0, repeats: Optional[int] = None) -> List[BenchmarkResult]:
+    """Runs the named benchmarks against a fresh synthetic fixture."""
+    with tempfile.TemporaryDirectory() as workdir:
+        ctx = BenchmarkContext(workdir, scale)
+        results = []
+        for name in names:
+            result = measure(name, ctx, repeats)
+            if result is None:
+                print(f"Skipping {name}: missing optional dependency")
+                continue
+            results.append(result)
+        return results
+
+def save_baseline(results: List[BenchmarkResult], path: str, scale: float):
+    """Writes results as a JSON baseline, merged into any existing file."""
+    baseline = load_baseline(path) if os.path.exists(path) else {'benchmarks': {}}
+    if baseline.get('metadata', {}).get('scale', scale) != scale:
+        baseline['benchmarks'] = {}
+    baseline['metadata'] = {
+        'scale': scale,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    for result in results:
+        baseline['benchmarks'][result.name] = asdict(result)
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def load_baseline(path: str) -> dict:
+    """Reads a JSON baseline."""
+    with open(path) as f:
+        return json.load(f)
+
+def find_regressions(
+    results: List[BenchmarkResult],
+    baseline: dict,
+    time_threshold: float = 0.25,
+    memory_threshold: float = 0.25
+) -> List[str]:
+    """
+    Compares results with a baseline.
+
+    Args:
+        results (list): The current BenchmarkResults.
+        baseline (dict): A baseline as written by `save_baseline`.
+        time_threshold (float): The allowed relative increase of per-call latency.
+        memory_threshold (float): The allowed relative increase of peak memory.
+
+    Returns:
+        list: One message per regression; empty if there are none.
+
+    Raises:
+        ValueError: If the baseline was recorded at another scale.
+    """
+    scale = baseline.get('metadata', {}).get('scale')
+    recorded = baseline.get('benchmarks', {})
+    regressions = []
+    for result in results:
+        reference = recorded.get(result.name)
+        if reference is None:
+            continue
+        if scale is not None and result.ops != reference['ops']:
+            raise ValueError(f"Baseline for {result.name} was recorded with {reference['ops']} ops "
+                             f"(scale {scale}); rerun at the same scale or re-record it.")
+        latency_ratio = result.latency_s / reference['latency_s']
+        if latency_ratio > 1 + time_threshold:
+            regressions.append(f"{result.name}: latency {latency_ratio:.2f}x the baseline "
+                               f"({result.latency_s * 1e6:.2f} vs {reference['latency_s'] * 1e6:.2f} us/op)")
+        memory_ratio = result.peak_memory_bytes / max(reference['peak_memory_bytes'], 1)
+        if memory_ratio > 1 + memory_threshold:
+            regressions.append(f"{result.name}: peak memory {memory_ratio:.2f}x the baseline "
+                               f"({result.peak_memory_bytes / 2**20:.1f} vs "
+                               f"{reference['peak_memory_bytes'] / 2**20:.1f} MiB)")
+    return regressions
+
+def format_report(results: List[BenchmarkResult], baseline: Optional[dict] = None) -> str:
+    """Formats results as a table, with the latency change against a baseline if given."""
+    recorded = (baseline or {}).get('benchmarks', {})
+    lines = [f"{'benchmark':<45} {'ops':>9} {'ops/sec':>12} {'us/op':>9} {'peak MiB':>9} {'vs base':>8}"]
+    for r in results:
+        reference = recorded.get(r.name)
+        change = f"{r.latency_s / reference['latency_s'] - 1:+.0%}" if reference else "new"
+        lines.append(f"{r.name:<45} {r.ops:>9} {r.throughput:>12,.0f} {r.latency_s * 1e6:>9.2f} "
+                     f"{r.peak_memory_bytes / 2**20:>9.2f} {change:>8}")
+    return "\n".join(lines)
+
+def parse_args(args_list: Optional[List[str]] = None):
+    """Parses command-line arguments for the benchmark suite."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the simulation hot paths.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("-k", "--filter", type=str, default=None,
+                        help="Only run benchmarks whose name contains this text.")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE_PATH,
+                        help="JSON baseline to compare with or save to.")
+    parser.add_argument("--save", action="store_true",
+                        help="Record the results as the new baseline instead of comparing.")
+    parser.add_argument("--time-threshold", type=float, default=0.25,
+                        help="Allowed relative latency increase before failing.")
+    parser.add_argument("--memory-threshold", type=float, default=0.25,
+                        help="Allowed relative peak memory increase before failing.")
+    parser.add_argument("--quick", action="store_true",
+                        help="Run every benchmark at 5%% of its size, e.g. as a smoke test.")
+    parser.add_argument("--repeats", type=int, default=None,
+                        help="Override the number of timed repetitions of each benchmark.")
+    return parser.parse_args(args_list)
+
+def main(args_list: Optional[List[str]] = None) -> int:
+    """Entry point of the benchmark suite. Returns the process exit code."""
+    args = parse_args(args_list)
+    scale = 0.05 if args.quick else 1.0
+    names = [name for name in BENCHMARKS if args.filter is None or args.filter in name]
+    results = run_suite(names, scale, args.repeats)
+
+    if args.save:
+        save_baseline(results, args.baseline, scale)
+        print(format_report(results))
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline) if os.path.exists(args.baseline) else None
+    print(format_report(results, baseline))
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save to record one.")
+        return 0
+
+    regressions = find_regressions(results, baseline, args.time_threshold, args.memory_threshold)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
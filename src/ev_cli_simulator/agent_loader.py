@@ -1,5 +1,7 @@
-from stable_baselines3 import DQN
 import os
+import numpy as np
+from .agents.numpy_policy import NumpyQPolicy
+from .agents.tabular_policy import TabularPolicy
 
 def load_agent(agent_path: str):
     """
@@ -17,6 +19,112 @@ def load_agent(agent_path: str):
     if not os.path.exists(agent_path):
         raise FileNotFoundError(f"Agent model not found at path: {agent_path}")
 
+    # Imported here so that the NumPy inference path never loads torch
+    from stable_baselines3 import DQN
+
     # Use the library's built-in load function
     model = DQN.load(agent_path)
-    return model
\ No newline at end of file
+    return model
+
+def exported_policy_path(agent_path: str) -> str:
+    """Returns the path of the NumPy export cached next to an SB3 agent file."""
+    return os.path.splitext(str(agent_path))[0] + ".qnet.npz"
+
+def _source_stamp(agent_path: str) -> np.ndarray:
+    """Returns the (mtime_ns, size) pair that identifies a version of an agent file."""
+    stat = os.stat(agent_path)
+    return np.array([stat.st_mtime_ns, stat.st_size], dtype=np.int64)
+
+def _is_current_export(export_path: str, agent_path: str) -> bool:
+    """Checks whether an export exists and was made from the current agent file."""
+    if not os.path.exists(export_path):
+        return False
+    try:
+        with np.load(export_path) as data:
+            return np.array_equal(data['source_stamp'], _source_stamp(agent_path))
+    except (OSError, KeyError, ValueError):
+        return False
+
+def export_agent(agent_path: str, export_path: str = None) -> str:
+    """
+    Exports the Q-network of an SB3 DQN agent to a compact .npz file.
+
+    The export holds the weights and bias of every linear layer and the
+    activation that follows it, plus a stamp of the source file. An export that
+    is already up to date is reused without loading the agent.
+
+    Args:
+        agent_path (str): The file path to the saved agent model.
+        export_path (str, optional): Where to write the export. Defaults to
+                                     `exported_policy_path(agent_path)`.
+
+    Returns:
+        str: The path of the export.
+
+    Raises:
+        FileNotFoundError: If the agent file does not exist.
+        ValueError: If the Q-network is not a flat stack of linear layers.
+    """
+    agent_path = str(agent_path)
+    if export_path is None:
+        export_path = exported_policy_path(agent_path)
+    if not os.path.exists(agent_path):
+        raise FileNotFoundError(f"Agent model not found at path: {agent_path}")
+    if _is_current_export(export_path, agent_path):
+        return export_path
+
+    from torch import nn
+    from stable_baselines3.common.torch_layers import FlattenExtractor
+
+    q_net = load_agent(agent_path).policy.q_net
+    if not isinstance(q_net.features_extractor, FlattenExtractor):
+        raise ValueError("Only agents with flat vector observations can be exported.")
+
+    activation_names = {nn.ReLU: 'relu', nn.Tanh: 'tanh', nn.Identity: 'identity'}
+    arrays, activations = {}, []
+    for module in q_net.q_net:
+        if isinstance(module, nn.Linear):
+            index = len(activations)
+            arrays[f'weight_{index}'] = module.weight.detach().cpu().numpy().astype(np.float32)
+            arrays[f'bias_{index}'] = module.bias.detach().cpu().numpy().astype(np.float32)
+            activations.append('identity')
+        elif type(module) in activation_names and activations and activations[-1] == 'identity':
+            activations[-1] = activation_names[type(module)]
+        else:
+            raise ValueError(f"Cannot export Q-network layer {module!r}.")
+
+    # Write next to the target and rename, so that concurrent readers never see a partial file
+    tmp_path = f"{export_path}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(
+        tmp_path, num_layers=len(activations), activations=np.array(activations),
+        source_stamp=_source_stamp(agent_path), **arrays
+    )
+    os.replace(tmp_path, export_path)
+    return export_path
+
+def load_policy(agent_path: str):
+    """
+    Loads an agent for greedy NumPy inference.
+
+    An .npz path is loaded as an exported Q-network or, if it holds an action
+    table, as a compiled TabularPolicy. An SB3 .zip agent is exported on first
+    use and its cached export is loaded from then on, so torch and
+    stable_baselines3 are only imported when the export is missing or stale.
+
+    Args:
+        agent_path (str): The file path to the saved agent model or export.
+
+    Returns:
+        NumpyQPolicy | TabularPolicy: The agent's greedy policy.
+
+    Raises:
+        FileNotFoundError: If the file at the specified path does not exist.
+    """
+    agent_path = str(agent_path)
+    if not os.path.exists(agent_path):
+        raise FileNotFoundError(f"Agent model not found at path: {agent_path}")
+    if agent_path.endswith(".npz"):
+        with np.load(agent_path) as data:
+            is_table = 'actions' in data.files
+        return TabularPolicy.load(agent_path) if is_table else NumpyQPolicy.load(agent_path)
+    return NumpyQPolicy.load(export_agent(agent_path))
@@ -0,0 +1,30 @@
+import numpy as np
+
+class DumbAgent:
+    """A simple baseline agent that charges at max power if below target SOC."""
+    # Actions depend only on the observation, so day trajectories can be memoized
+    is_deterministic = True
+
+    def predict(self, obs, power_levels: list, target_soc: float, deterministic=True):
+        soc = obs[0]
+        max_power = max(power_levels)
+        max_power_index = power_levels.index(max_power)
+        idle_power_index = power_levels.index(0) if 0 in power_levels else 0
+        action_index = max_power_index if soc < target_soc else idle_power_index
+        return (action_index, None)
+
+    def predict_batch(self, obs: np.ndarray, power_levels: list, target_soc: float) -> np.ndarray:
+        """
+        Vectorized counterpart of `predict` for a batch of observations.
+
+        Args:
+            obs (np.ndarray): The (n, 2) array of [soc, step] observations.
+            power_levels (list): The available charger power levels in kW.
+            target_soc (float): The SOC below which the agent charges.
+
+        Returns:
+            np.ndarray: The action index of each observation.
+        """
+        max_power_index = power_levels.index(max(power_levels))
+        idle_power_index = power_levels.index(0) if 0 in power_levels else 0
+        return np.where(obs[:, 0] < target_soc, max_power_index, idle_power_index)
@@ -0,0 +1,79 @@
+import numpy as np
+
+# Element-wise activations supported between the layers of an exported Q-network
+ACTIVATIONS = {
+    'relu': lambda x: np.maximum(x, 0.0, dtype=np.float32),
+    'tanh': np.tanh,
+    'identity': lambda x: x,
+}
+
+class NumpyQPolicy:
+    """
+    Greedy inference for an exported DQN Q-network, in pure NumPy.
+
+    The network is a stack of linear layers with element-wise activations, as
+    written by `agent_loader.export_agent`. `predict` mirrors the SB3 API so the
+    policy can stand in for a loaded DQN model in the simulator.
+    """
+    # Greedy actions depend only on the observation
+    is_deterministic = True
+
+    def __init__(self, weights: list, biases: list, activations: list):
+        """
+        Initializes the NumpyQPolicy.
+
+        Args:
+            weights (list): The (out, in) weight matrix of each linear layer.
+            biases (list): The bias vector of each linear layer.
+            activations (list): The activation applied after each linear layer,
+                                one of ACTIVATIONS.
+
+        Raises:
+            ValueError: If the layers are inconsistent or an activation is unknown.
+        """
+        if not (len(weights) == len(biases) == len(activations)):
+            raise ValueError("Every layer needs a weight matrix, a bias and an activation.")
+        for name in activations:
+            if name not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation '{name}'.")
+
+        # Stored transposed so that a batch of observations is a plain (n, in) @ (in, out)
+        self.weights = [np.ascontiguousarray(np.asarray(w, dtype=np.float32).T) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activations = list(activations)
+        self.observation_size = self.weights[0].shape[0]
+        self.n_actions = self.weights[-1].shape[1]
+
+    @classmethod
+    def load(cls, path) -> "NumpyQPolicy":
+        """Loads a policy from an .npz file written by `agent_loader.export_agent`."""
+        with np.load(path) as data:
+            num_layers = int(data['num_layers'])
+            return cls(
+                [data[f'weight_{i}'] for i in range(num_layers)],
+                [data[f'bias_{i}'] for i in range(num_layers)],
+                [str(name) for name in data['activations']]
+            )
+
+    def q_values(self, obs: np.ndarray) -> np.ndarray:
+        """Returns the (n, n_actions) Q-values of a batch of observations."""
+        x = np.asarray(obs, dtype=np.float32).reshape(-1, self.observation_size)
+        for weight, bias, activation in zip(self.weights, self.biases, self.activations):
+            x = ACTIVATIONS[activation](x @ weight + bias)
+        return x
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True):
+        """
+        Returns the greedy action for an observation or a batch of observations.
+
+        Args:
+            obs (np.ndarray): A single observation or an (n, observation_size) batch.
+
+        Returns:
+            tuple: The action index (an array of indices for a batch) and None,
+                   in the shape of SB3's `predict`.
+        """
+        actions = self.q_values(obs).argmax(axis=1)
+        if np.ndim(obs) == 1:
+            return int(actions[0]), None
+        return actions, None
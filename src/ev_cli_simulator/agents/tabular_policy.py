@@ -0,0 +1,103 @@
+import json
+import numpy as np
+
+class TabularPolicy:
+    """
+    A policy stored as an int8 action table over a (SOC, step) grid.
+
+    The agents' observation is only [soc, step], so any deterministic agent can
+    be tabulated once by `policy_compiler.compile_policy` and then served by a
+    lookup: the SOC is rounded to the nearest grid point and the step indexes
+    the column. `predict` mirrors the SB3 API.
+    """
+    # Actions depend only on the observation
+    is_deterministic = True
+
+    def __init__(self, actions: np.ndarray, soc_min: float = 0.0, soc_max: float = 1.0, metadata: dict = None):
+        """
+        Initializes the TabularPolicy.
+
+        Args:
+            actions (np.ndarray): The (soc_points, steps) table of action indices.
+            soc_min (float): The SOC of the first grid row.
+            soc_max (float): The SOC of the last grid row.
+            metadata (dict, optional): Provenance of the table, e.g. the source agent.
+
+        Raises:
+            ValueError: If the table is not two-dimensional or does not fit in int8.
+        """
+        actions = np.asarray(actions)
+        if actions.ndim != 2 or actions.shape[0] < 2:
+            raise ValueError("The action table must have shape (soc_points, steps) with at least two SOC points.")
+        if actions.size and (actions.min() < 0 or actions.max() > np.iinfo(np.int8).max):
+            raise ValueError("Action indices must fit in an int8 table.")
+
+        self.actions = actions.astype(np.int8)
+        self.soc_min = float(soc_min)
+        self.soc_max = float(soc_max)
+        self.metadata = dict(metadata or {})
+        self._soc_scale = (self.actions.shape[0] - 1) / (self.soc_max - self.soc_min)
+
+    @property
+    def soc_grid(self) -> np.ndarray:
+        """Returns the SOC of each row of the table."""
+        return np.linspace(self.soc_min, self.soc_max, self.actions.shape[0])
+
+    def save(self, path):
+        """Writes the table to an .npz file."""
+        np.savez_compressed(
+            path, actions=self.actions, soc_range=np.array([self.soc_min, self.soc_max]),
+            metadata=np.array(json.dumps(self.metadata))
+        )
+
+    def check_config(self, power_levels: list, soc_target: float):
+        """
+        Checks that the table was compiled for the given charger power levels
+        and SOC target. Tables without these entries in their metadata are
+        accepted as they are; the SOC target is only recorded for tables
+        compiled from a DumbAgent.
+
+        Raises:
+            ValueError: If the metadata records different power levels or SOC target.
+        """
+        compiled_levels = self.metadata.get('power_levels')
+        if compiled_levels is not None and [float(p) for p in compiled_levels] != [float(p) for p in power_levels]:
+            raise ValueError(
+                f"The action table was compiled for charger power levels {compiled_levels}, not {list(power_levels)}."
+            )
+        compiled_target = self.metadata.get('soc_target')
+        if compiled_target is not None and float(compiled_target) != float(soc_target):
+            raise ValueError(f"The action table was compiled for a SOC target of {compiled_target}, not {soc_target}.")
+
+    @classmethod
+    def load(cls, path) -> "TabularPolicy":
+        """Loads a table written by `save`."""
+        with np.load(path) as data:
+            soc_min, soc_max = data['soc_range'].tolist()
+            metadata = json.loads(str(data['metadata'])) if 'metadata' in data else {}
+            return cls(data['actions'], soc_min, soc_max, metadata)
+
+    def lookup(self, soc, step) -> np.ndarray:
+        """Returns the tabulated actions for arrays of SOCs and steps."""
+        rows = np.rint((np.asarray(soc, dtype=np.float64) - self.soc_min) * self._soc_scale)
+        rows = np.clip(rows, 0, self.actions.shape[0] - 1).astype(np.intp)
+        columns = np.clip(np.asarray(step), 0, self.actions.shape[1] - 1).astype(np.intp)
+        return self.actions[rows, columns].astype(np.int64)
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True):
+        """
+        Returns the tabulated action for an observation or a batch of observations.
+
+        Args:
+            obs (np.ndarray): A single [soc, step] observation or an (n, 2) batch.
+
+        Returns:
+            tuple: The action index (an array of indices for a batch) and None,
+                   in the shape of SB3's `predict`.
+        """
+        obs = np.asarray(obs)
+        batch = obs.reshape(-1, 2)
+        actions = self.lookup(batch[:, 0], batch[:, 1])
+        if obs.ndim == 1:
+            return int(actions[0]), None
+        return actions, None
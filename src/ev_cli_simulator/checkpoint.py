@@ -0,0 +1,317 @@
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import asdict, is_dataclass
+from typing import Dict, List
+
+from .core.price_model import _file_sha256
+from .data_logger import StreamingDataLogger, output_format
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# Run configuration keys that do not change the simulated rows
+_EXECUTION_KEYS = ('profile', 'record_trajectories', 'jit')
+
+_EXTENSIONS = {'csv': 'csv', 'parquet': 'parquet', 'arrow': 'arrow'}
+
+# Batched runs are saved together, so a checkpoint caps the runs per batch
+CHECKPOINT_BATCH_RUNS = 32
+
+def checkpoint_dir(output_path: str) -> str:
+    """Returns the default checkpoint directory of an output file."""
+    return os.path.splitext(output_path)[0] + '.parts'
+
+def load_manifest(directory: str) -> dict | None:
+    """Reads the manifest of a checkpoint directory, or returns None if there is none."""
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def config_hash(base_config: dict, agent_configs: list, content: bool = False) -> str:
+    """
+    Hashes everything that determines the rows of a run: the run
+    configuration, the agents and the size and modification time of the
+    price and agent files.
+
+    Args:
+        base_config (dict): The run configuration.
+        agent_configs (list): The AgentConfig objects of the run.
+        content (bool): Hash the contents of the price and agent files
+                        instead of their paths, sizes and modification
+                        times, so that copies on other machines hash alike.
+
+    Returns:
+        str: The hex SHA-256 digest.
+    """
+    config = {k: v for k, v in base_config.items() if k not in _EXECUTION_KEYS}
+    if content:
+        # A missing file hashes as None, like its stamp in the default hash
+        files = [base_config['price_path']] + [a.path for a in agent_configs if a.path != 'baseline']
+        digests = {path: _file_sha256(path) for path in files if os.path.exists(path)}
+        config['price_path'] = digests.get(base_config['price_path'])
+        payload = {
+            'config': config,
+            'agents': [
+                [a.name, a.path if a.path == 'baseline' else digests.get(a.path)] for a in agent_configs
+            ],
+        }
+    else:
+        files = [base_config['price_path']] + [a.path for a in agent_configs if a.path != 'baseline']
+        payload = {
+            'config': config,
+            'agents': agent_configs,
+            'files': {path: _file_stamp(path) for path in files},
+        }
+    encoded = json.dumps(payload, sort_keys=True, default=_to_json).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+class RunCheckpoint:
+    """
+    Keeps the output of every finished run on disk, so that an interrupted
+    multi-run simulation can be resumed where it stopped.
+
+    Each finished run, or batch of runs simulated together, is written to its
+    own part file in the format of the final output and recorded in a JSON
+    manifest together with the config hash, the global seed and each run's
+    RNG seed. Parts and the manifest are replaced atomically and synced to
+    disk, so a killed process loses at most the runs it was simulating.
+    `stitch` then concatenates the parts into the final output one part (or
+    row group) at a time, without loading the whole simulation into memory.
+    """
+    def __init__(self, directory: str, output_path: str, config_hash: str, seed: int, logger_class, resume: bool = False):
+        """
+        Initializes the RunCheckpoint.
+
+        Args:
+            directory (str): The directory holding the parts and the manifest.
+            output_path (str): The final output file; its format is used for the parts.
+            config_hash (str): The hash of the run configuration (see `config_hash`).
+            seed (int): The global seed that the run RNG streams are derived from.
+            logger_class (type): The logger class that runs log into before being saved.
+            resume (bool): Whether to keep the runs recorded by an earlier
+                           invocation. Otherwise the directory starts empty.
+
+        Raises:
+            ValueError: If resuming a checkpoint written with a different
+                        configuration or seed.
+        """
+        self.directory = directory
+        self.output_path = output_path
+        self.file_format = output_format(output_path)
+        self.config_hash = config_hash
+        self.seed = seed
+        self.logger_class = logger_class
+        self._runs: Dict[int, dict] = {}
+
+        os.makedirs(directory, exist_ok=True)
+        manifest = load_manifest(directory)
+        if manifest is not None and resume:
+            if manifest.get('version') != MANIFEST_VERSION:
+                raise ValueError(f"Unsupported checkpoint manifest version in {directory}: {manifest.get('version')}")
+            if manifest['config_hash'] != config_hash or manifest['seed'] != seed:
+                raise ValueError(
+                    f"The checkpoint in {directory} was written with a different configuration or seed; "
+                    f"rerun without --resume to start over."
+                )
+            if manifest['output_format'] != self.file_format:
+                raise ValueError(
+                    f"The checkpoint in {directory} holds {manifest['output_format']} parts, "
+                    f"not {self.file_format}."
+                )
+            self._runs = {int(run_id): entry for run_id, entry in manifest['runs'].items()}
+        elif manifest is not None:
+            for part in {entry['part'] for entry in manifest['runs'].values()} - {None}:
+                part_path = os.path.join(directory, part)
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+        self._write_manifest()
+
+    @property
+    def completed_run_ids(self) -> List[int]:
+        """The run_ids whose output is recorded, in ascending order."""
+        return sorted(self._runs)
+
+    def pending(self, run_ids: List[int]) -> List[int]:
+        """Returns the run_ids that still have to be simulated, in the given order."""
+        return [run_id for run_id in run_ids if run_id not in self._runs]
+
+    def new_logger(self):
+        """Creates an empty logger to collect the rows of the next runs."""
+        return self.logger_class()
+
+    def save_runs(self, run_ids: List[int], run_log):
+        """
+        Writes the rows of finished runs to a part file and records the runs.
+
+        Args:
+            run_ids (list): The run_ids whose rows `run_log` holds.
+            run_log (DataLogger | ColumnarDataLogger): The logger the runs logged into.
+        """
+        first, last = min(run_ids), max(run_ids)
+        stem = f"run_{first:06d}" if len(run_ids) == 1 else f"runs_{first:06d}-{last:06d}"
+        part = f"{stem}.{_EXTENSIONS[self.file_format]}"
+        path = os.path.join(self.directory, part)
+        tmp_path = path + '.tmp'
+
+        if self.file_format == 'csv':
+            df = run_log.get_dataframe()
+            rows = len(df)
+            if rows:
+                df.to_csv(tmp_path, index=False)
+        else:
+            writer = StreamingDataLogger(tmp_path, self.file_format)
+            writer.merge(run_log)
+            writer.close()
+            rows = writer.rows_written
+
+        if rows:
+            _fsync(tmp_path)
+            os.replace(tmp_path, path)
+        else:
+            part = None
+
+        # Imported here because the main module imports this one
+        from .main import run_seed
+
+        for run_id in run_ids:
+            self._runs[run_id] = {'part': part, 'rng_seed': run_seed(self.seed, run_id)}
+        self._write_manifest()
+
+    def stitch(self, run_ids: List[int]) -> int:
+        """
+        Concatenates the parts of the given runs into the output file, in run order.
+
+        Returns:
+            int: The number of part files stitched.
+
+        Raises:
+            ValueError: If a run has not been recorded or the parts' columns differ.
+        """
+        missing = self.pending(run_ids)
+        if missing:
+            raise ValueError(f"Runs {missing} have not finished; resume the simulation first.")
+
+        parts = []
+        for run_id in sorted(run_ids):
+            part = self._runs[run_id]['part']
+            if part is not None and part not in parts:
+                parts.append(part)
+        paths = [os.path.join(self.directory, part) for part in parts]
+
+        concat_outputs(paths, self.output_path, self.file_format)
+        return len(parts)
+
+    def _write_manifest(self):
+        """Atomically replaces the manifest with the current state."""
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'config_hash': self.config_hash,
+            'seed': self.seed,
+            'output_format': self.file_format,
+            'runs': {str(run_id): self._runs[run_id] for run_id in sorted(self._runs)},
+        }
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+def concat_outputs(paths: List[str], output_path: str, file_format: str):
+    """
+    Concatenates output files of one format into `output_path`, streaming
+    them one part (or row group) at a time. The output is replaced atomically.
+
+    Raises:
+        ValueError: If the files' columns differ.
+    """
+    tmp_path = output_path + '.tmp'
+    if file_format == 'csv':
+        _concat_csv(paths, tmp_path)
+    elif file_format == 'parquet':
+        _concat_parquet(paths, tmp_path)
+    else:
+        _concat_arrow(paths, tmp_path)
+    os.replace(tmp_path, output_path)
+
+def _concat_csv(paths: List[str], output_path: str):
+    """Concatenates CSV files that share a header, streaming their contents."""
+    header = None
+    with open(output_path, 'wb') as out:
+        for path in paths:
+            with open(path, 'rb') as part:
+                line = part.readline()
+                if header is None:
+                    header = line
+                    out.write(line)
+                elif line != header:
+                    raise ValueError(f"The columns of {path} differ from those of {paths[0]}")
+                shutil.copyfileobj(part, out)
+
+def _concat_parquet(paths: List[str], output_path: str):
+    """Concatenates Parquet files one row group at a time."""
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for path in paths:
+            part = pq.ParquetFile(path)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, part.schema_arrow)
+            elif not part.schema_arrow.equals(writer.schema):
+                raise ValueError(f"The columns of {path} differ from those of {paths[0]}")
+            for i in range(part.num_row_groups):
+                writer.write_table(part.read_row_group(i))
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        open(output_path, 'wb').close()
+
+def _concat_arrow(paths: List[str], output_path: str):
+    """Concatenates Arrow IPC streams one record batch at a time."""
+    import pyarrow as pa
+
+    sink = writer = schema = None
+    try:
+        for path in paths:
+            with pa.OSFile(path, 'rb') as source:
+                reader = pa.ipc.open_stream(source)
+                if writer is None:
+                    schema = reader.schema
+                    sink = pa.OSFile(output_path, 'wb')
+                    writer = pa.ipc.new_stream(sink, schema)
+                elif not reader.schema.equals(schema):
+                    raise ValueError(f"The columns of {path} differ from those of {paths[0]}")
+                for batch in reader:
+                    writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+        if sink is not None:
+            sink.close()
+    if writer is None:
+        open(output_path, 'wb').close()
+
+def _fsync(path: str):
+    """Flushes a written file to disk."""
+    with open(path, 'rb') as f:
+        os.fsync(f.fileno())
+
+def _file_stamp(path: str) -> list | None:
+    """Returns the size and modification time of a file, or None if it is missing."""
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def _to_json(value):
+    """Encodes the config dataclasses for hashing."""
+    if is_dataclass(value):
+        return asdict(value)
+    raise TypeError(f"Cannot hash configuration value {value!r}")
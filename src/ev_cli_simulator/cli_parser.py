@@ -1,11 +1,16 @@
 import argparse
 from typing import List, Optional
 
-def parse_args(args_list: Optional[List[str]] = None):
+def parse_args(args_list: Optional[List[str]] = None, parser_class: type = argparse.ArgumentParser):
     """
     Parses command-line arguments for the EV charging simulator.
+
+    Args:
+        args_list (list, optional): The arguments; defaults to sys.argv.
+        parser_class (type): The ArgumentParser (sub)class to parse with, e.g.
+                             one that raises instead of exiting on errors.
     """
-    parser = argparse.ArgumentParser(
+    parser = parser_class(
         description="Run a long-term EV charging simulation.",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
@@ -21,7 +26,8 @@ def parse_args(args_list: Optional[List[str]] = None):
     )
     parser.add_argument(
         "--runs", type=int, required=True,
-        help="Number of independent simulation runs to perform."
+        help="Number of independent simulation runs to perform. With --ci-tolerance, "
+             "the number of runs simulated between two convergence checks."
     )
     parser.add_argument(
         "--battery-capacity", type=float, required=True,
@@ -56,7 +62,168 @@ def parse_args(args_list: Optional[List[str]] = None):
     )
     parser.add_argument(
         "--output-path", type=str, required=True,
-        help="Directory path where the final CSV data files will be saved."
+        help="File path where the simulation data will be saved. A '.parquet' or "
+             "'.arrow' extension streams the data to that format while simulating; "
+             "anything else is written as CSV at the end. A Parquet file is only "
+             "readable once the run closes it; use '.arrow' if an interrupted run "
+             "should keep the rows written so far."
+    )
+
+    # --- Optional Arguments ---
+    parser.add_argument(
+        "--batch", action="store_true",
+        help="Advance all runs together as NumPy arrays instead of one run after another."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Number of worker processes to spread the simulation runs across."
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None,
+        help="Global random seed. Each run draws from its own stream derived from "
+             "this seed and its run_id."
+    )
+    parser.add_argument(
+        "--log-backend", type=str, choices=["records", "columnar"], default="records",
+        help="How step data is held in memory: one dict per row, or typed NumPy "
+             "column buffers with categorical string columns."
+    )
+    parser.add_argument(
+        "--flush-rows", type=int, default=100_000,
+        help="For Parquet/Arrow output, the number of buffered rows written out as one "
+             "row group. Rows are also written at the end of every run. Flushed Arrow "
+             "rows survive an interrupted run; flushed Parquet rows do not, as the "
+             "file's footer is only written when it is closed."
+    )
+    parser.add_argument(
+        "--log-level", type=str, choices=["step", "day", "run"], default="step",
+        help="Granularity of the output: one row per agent per 15-minute step, "
+             "per day (daily totals) or per run (run totals)."
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Time each phase of the simulation and print a summary at the end. "
+             "A JSON report is written next to the output file (<output>.profile.json)."
+    )
+    parser.add_argument(
+        "--sweep", type=str, nargs='+', default=None,
+        help="Evaluate every combination of the given parameter values in one batch, e.g. "
+             "'battery_capacity=40,60,80' 'soc_target=0.6:0.9:0.1' "
+             "'charger_power_levels=[0,7.4];[-11,0,11]'. Sweepable: battery_capacity, "
+             "max_charge_speed, start_soc, soc_target, charger_power_levels; the other "
+             "parameters keep their single values. Implies --batch."
+    )
+    parser.add_argument(
+        "--record-trajectories", type=str, default=None, metavar="PATH",
+        help="Also record the power and SOC of every step to a compressed .npz file, to be "
+             "re-costed under other prices and degradation settings with "
+             "'python -m src.ev_cli_simulator.recost'."
+    )
+    parser.add_argument(
+        "--price-cache", action="store_true",
+        help="Compile the price CSV into a memory-mapped binary cache (<price file>.price_cache/) "
+             "that every process maps instead of parsing the CSV. The cache is reused, also "
+             "without this flag, while the CSV's hash is unchanged."
+    )
+    parser.add_argument(
+        "--no-jit", action="store_true",
+        help="Do not run baseline and table-based agents in the numba-compiled step kernel, "
+             "even if numba is installed."
+    )
+    parser.add_argument(
+        "--ci-tolerance", type=float, default=None,
+        help="Keep adding rounds of --runs runs until the confidence interval on each agent's "
+             "mean total cost, final SOH and SOC fulfillment, and on the total cost difference "
+             "of every pair of agents, is within this tolerance relative to the mean, "
+             "e.g. 0.01 for +/-1%%. Combines with --batch and --workers."
+    )
+    parser.add_argument(
+        "--max-runs", type=int, default=1000,
+        help="With --ci-tolerance, the number of runs after which to stop even if not converged."
+    )
+    parser.add_argument(
+        "--confidence", type=float, default=0.95,
+        help="With --ci-tolerance, the confidence level of the intervals."
+    )
+    parser.add_argument(
+        "--shard", type=str, default=None, metavar="I/N",
+        help="Simulate only shard I of N: a contiguous block of the run_ids, with the run "
+             "streams derived from --seed (required), and record it in <output>.shard.json. "
+             "Combine the shards' outputs with the 'merge' subcommand."
+    )
+    parser.add_argument(
+        "--checkpoint", action="store_true",
+        help="Save every finished run to <output>.parts/ with a manifest of the completed runs, "
+             "and stitch the parts into the output at the end."
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Continue a checkpointed simulation: skip the runs recorded in <output>.parts/ "
+             "(implies --checkpoint). The configuration and seed must match."
+    )
+
+    return parser.parse_args(args_list)
+
+def parse_merge_args(args_list: Optional[List[str]] = None):
+    """
+    Parses command-line arguments for the 'merge' subcommand, which combines
+    the outputs of a sharded simulation.
+    """
+    parser = argparse.ArgumentParser(
+        prog="merge",
+        description="Combine the outputs of the shards of a simulation run with --shard "
+                    "into one file, checking that every run is present exactly once.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        "shards", type=str, nargs='+',
+        help="The shards' output files. Each shard's manifest (<output>.shard.json) must be next to it."
+    )
+    parser.add_argument(
+        "--output-path", type=str, required=True,
+        help="File path of the merged output, in the format of the shards' outputs."
+    )
+    return parser.parse_args(args_list)
+
+def parse_serve_args(args_list: Optional[List[str]] = None):
+    """
+    Parses command-line arguments for the 'serve' subcommand, which keeps
+    price data and agents loaded between evaluation jobs.
+    """
+    parser = argparse.ArgumentParser(
+        prog="serve",
+        description="Serve evaluation jobs over HTTP. POST a JSON object with the simulator's "
+                    "command-line options (e.g. {\"price_path\": ..., \"runs\": 4, \"agents\": [...]}) "
+                    "to /evaluate; the response holds the runs' summaries.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    transport = parser.add_mutually_exclusive_group(required=True)
+    transport.add_argument(
+        "--port", type=int,
+        help="TCP port to listen on (on --host)."
+    )
+    transport.add_argument(
+        "--socket", type=str, metavar="PATH",
+        help="Unix socket to listen on instead of a TCP port."
+    )
+    parser.add_argument(
+        "--host", type=str, default="127.0.0.1",
+        help="Address to bind the TCP port to."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Number of worker processes running jobs concurrently. Each keeps its own caches."
+    )
+    parser.add_argument(
+        "--max-price-models", type=int, default=4,
+        help="Number of parsed price files each worker keeps, least recently used first out."
+    )
+    parser.add_argument(
+        "--max-agents", type=int, default=16,
+        help="Number of loaded agent models each worker keeps."
+    )
+    parser.add_argument(
+        "--max-calendars", type=int, default=8,
+        help="Number of simulation calendars (price data, horizon and scenarios) each worker keeps."
     )
-    
     return parser.parse_args(args_list)
@@ -1,7 +1,10 @@
 import json
 import math
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List
+
+# The run parameters that a grid sweep can vary
+SWEEP_PARAMETERS = ('battery_capacity', 'max_charge_speed', 'start_soc', 'soc_target', 'charger_power_levels')
 
 # This dataclass is no longer needed as we have a single charger
 # @dataclass
@@ -73,3 +76,52 @@ class ConfigManager:
             except ValueError:
                 raise ValueError(f"Invalid agent format: '{agent_str}'. Expected 'Name:path/to/agent.zip'")
         return parsed_agents
+
+    def parse_sweep(self, sweep_strings: List[str]) -> Dict[str, list]:
+        """
+        Parses grid-sweep definitions of the form 'parameter=values'.
+
+        Scalar parameters take a comma-separated list ('40,60,80') or an
+        inclusive range 'start:stop:step' ('0.5:0.9:0.1'). The charger power
+        levels take semicolon-separated lists ('[0,7.4];[-11,0,11]').
+
+        Returns:
+            dict: Parameter name -> list of values, in the order given.
+        """
+        sweep = {}
+        for sweep_str in sweep_strings:
+            try:
+                name, values_str = sweep_str.split('=', 1)
+            except ValueError:
+                raise ValueError(f"Invalid sweep format: '{sweep_str}'. Expected 'parameter=values'")
+            name = name.strip().replace('-', '_')
+            if name not in SWEEP_PARAMETERS:
+                raise ValueError(f"Cannot sweep '{name}'. Sweepable parameters: {', '.join(SWEEP_PARAMETERS)}")
+            if name in sweep:
+                raise ValueError(f"Parameter '{name}' is swept more than once")
+
+            if name == 'charger_power_levels':
+                values = [self.parse_charger_power_levels(v) for v in values_str.split(';')]
+            else:
+                try:
+                    values = self._parse_sweep_values(values_str)
+                except ValueError as e:
+                    raise ValueError(f"Invalid sweep values for '{name}': '{values_str}'. Error: {e}")
+            if not values:
+                raise ValueError(f"Sweep of '{name}' has no values")
+            sweep[name] = values
+        return sweep
+
+    def _parse_sweep_values(self, values_str: str) -> List[float]:
+        """Parses a comma-separated list or an inclusive 'start:stop:step' range of numbers."""
+        if ':' not in values_str:
+            return [float(v) for v in values_str.split(',')]
+
+        start, stop, step = (float(v) for v in values_str.split(':'))
+        if step <= 0:
+            raise ValueError("The step of a range must be positive.")
+        count = math.floor((stop - start) / step + 1e-9) + 1
+        if count < 1:
+            raise ValueError("The range is empty.")
+        # Rounding keeps values such as 0.7 from picking up float noise
+        return [round(start + i * step, 12) for i in range(count)]
@@ -0,0 +1,147 @@
+import math
+from statistics import NormalDist
+from typing import Dict, List
+import numpy as np
+
+# Per-run summary quantities (see MetricsAccumulator.summaries) whose means are estimated
+MONITORED_FIELDS = ('total_cost', 'final_soh', 'soc_fulfillment')
+
+# Confidence intervals are only checked from this many runs on
+MIN_RUNS = 5
+
+def t_quantile(p: float, dof: int) -> float:
+    """
+    Approximates a quantile of Student's t distribution by the Cornish-Fisher
+    expansion around the normal quantile (Abramowitz & Stegun 26.7.5). From
+    4 degrees of freedom on, the error is below 0.3%.
+    """
+    z = NormalDist().inv_cdf(p)
+    return (
+        z
+        + (z**3 + z) / (4 * dof)
+        + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * dof**2)
+        + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * dof**3)
+        + (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z) / (92160 * dof**4)
+    )
+
+class RunningStats:
+    """
+    Streaming mean and variance of a vector of quantities, updated with
+    Welford's algorithm one observation at a time.
+    """
+    def __init__(self, size: int):
+        """
+        Initializes empty statistics.
+
+        Args:
+            size (int): The number of quantities observed together.
+        """
+        self.count = 0
+        self.mean = np.zeros(size, dtype=np.float64)
+        self._m2 = np.zeros(size, dtype=np.float64)
+
+    def add(self, values: np.ndarray):
+        """Adds one observation of every quantity."""
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (values - self.mean)
+
+    @property
+    def variance(self) -> np.ndarray:
+        """The sample variance of every quantity, infinite before two observations."""
+        if self.count < 2:
+            return np.full(len(self.mean), np.inf)
+        return self._m2 / (self.count - 1)
+
+    def half_width(self, confidence: float) -> np.ndarray:
+        """Returns the half-width of the t confidence interval on every mean."""
+        if self.count < 2:
+            return np.full(len(self.mean), np.inf)
+        return t_quantile((1 + confidence) / 2, self.count - 1) * np.sqrt(self.variance / self.count)
+
+class ConvergenceMonitor:
+    """
+    Decides when a multi-run simulation has run long enough.
+
+    Every finished run adds one observation of each agent's total cost, final
+    SOH and mean SOC fulfillment, and of the total cost difference of every
+    pair of agents. Runs draw the same scenarios for every agent, so the
+    paired differences vary much less than the costs themselves. The
+    simulation has converged once the confidence interval on each of these
+    means is narrower than `tolerance` relative to the mean, i.e. its
+    half-width is at most tolerance * |mean|. A clear-cut difference between
+    two agents thus needs few runs, while two agents that perform alike keep
+    the simulation going until the run cap.
+    """
+    def __init__(self, agent_names: List[str], tolerance: float, confidence: float = 0.95, min_runs: int = MIN_RUNS):
+        """
+        Initializes the ConvergenceMonitor.
+
+        Args:
+            agent_names (list): The names of the simulated agents.
+            tolerance (float): The largest relative half-width of a converged interval.
+            confidence (float): The confidence level of the intervals.
+            min_runs (int): The runs needed before the intervals are checked.
+
+        Raises:
+            ValueError: If the tolerance is not positive or the confidence not in (0, 1).
+        """
+        if not tolerance > 0:
+            raise ValueError(f"The convergence tolerance must be positive, got {tolerance}.")
+        if not 0 < confidence < 1:
+            raise ValueError(f"The confidence level must be between 0 and 1, got {confidence}.")
+        self.agent_names = list(agent_names)
+        self.tolerance = tolerance
+        self.confidence = confidence
+        self.min_runs = max(min_runs, 2)
+
+        self.labels = [f"{agent} {field}" for field in MONITORED_FIELDS for agent in self.agent_names]
+        self._pairs = [
+            (a, b) for a in range(len(self.agent_names)) for b in range(a + 1, len(self.agent_names))
+        ]
+        self.labels += [
+            f"{self.agent_names[a]} - {self.agent_names[b]} total_cost" for a, b in self._pairs
+        ]
+        self.stats = RunningStats(len(self.labels))
+
+    @property
+    def runs(self) -> int:
+        """The number of runs observed."""
+        return self.stats.count
+
+    def add_runs(self, summaries: Dict[int, Dict[str, dict]]):
+        """
+        Adds finished runs, in run_id order so that the statistics do not
+        depend on the order in which the runs finished.
+
+        Args:
+            summaries (dict): run_id -> agent name -> summary of the run.
+        """
+        for run_id in sorted(summaries):
+            run = summaries[run_id]
+            values = [run[agent][field] for field in MONITORED_FIELDS for agent in self.agent_names]
+            costs = [run[agent]['total_cost'] for agent in self.agent_names]
+            values += [costs[a] - costs[b] for a, b in self._pairs]
+            self.stats.add(np.array(values, dtype=np.float64))
+
+    def unconverged(self) -> List[str]:
+        """Returns the labels of the means whose intervals are still too wide."""
+        if self.runs < self.min_runs:
+            return list(self.labels)
+        wide = self.stats.half_width(self.confidence) > self.tolerance * np.abs(self.stats.mean)
+        return [label for label, is_wide in zip(self.labels, wide) if is_wide]
+
+    def converged(self) -> bool:
+        """Checks whether every interval is within the tolerance."""
+        return not self.unconverged()
+
+    def format_summary(self) -> str:
+        """Formats the estimated means and their confidence intervals as a table."""
+        half_width = self.stats.half_width(self.confidence)
+        width = max(len(label) for label in self.labels)
+        lines = [f"{'':<{width}} {'mean':>14} {'+/-':>12} {'rel.':>9}"]
+        for label, mean, half in zip(self.labels, self.stats.mean, half_width):
+            relative = half / abs(mean) if mean != 0 else (0.0 if half == 0 else math.inf)
+            lines.append(f"{label:<{width}} {mean:>14.6g} {half:>12.4g} {relative:>9.2%}")
+        return "\n".join(lines)
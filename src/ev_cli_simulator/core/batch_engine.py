@@ -0,0 +1,90 @@
+from datetime import datetime
+import numpy as np
+from .battery import BatteryBank
+from .cost_calculator import CostCalculator
+
+class BatchSimulationEngine:
+    """
+    Orchestrates a single time step for a whole bank of batteries at once.
+
+    This is the array counterpart of `SimulationEngine`: the state of every
+    (run, agent) battery lives in NumPy arrays and each step is advanced with
+    one pass of the battery, cost and degradation math over those arrays.
+    """
+    def __init__(self, battery_bank: BatteryBank, cost_calculator: CostCalculator, battery_eol_cost: float):
+        """
+        Initializes the BatchSimulationEngine.
+
+        Args:
+            battery_bank (BatteryBank): The bank of batteries to simulate.
+            cost_calculator (CostCalculator): An instance of the CostCalculator.
+            battery_eol_cost (float): The total monetary cost (€) that corresponds
+                                      to the battery reaching its End of Life (EOL),
+                                      defined as a 20% loss in SOH.
+        """
+        self.battery_bank = battery_bank
+        self.cost_calculator = cost_calculator
+        self.battery_eol_cost = battery_eol_cost
+        # EOL is defined as a 20% loss of SOH (from 1.0 to 0.8)
+        self.EOL_SOH_LOSS = 0.20
+
+        shape = battery_bank.soc.shape
+        self.kwh_charged = np.zeros(shape, dtype=np.float64)
+        self.cycle_counts = np.ones(shape, dtype=np.int64)
+
+    def run_step(
+        self,
+        power_kw: np.ndarray,
+        duration_h: float,
+        timestamp: datetime,
+        active: np.ndarray,
+        price: float | None = None
+    ) -> dict:
+        """
+        Executes one time step for every active battery in the bank.
+
+        Args:
+            power_kw (np.ndarray): The power applied to each battery in kW.
+            duration_h (float): The duration of this step in hours.
+            timestamp (datetime): The timestamp of the beginning of the step.
+            active (np.ndarray): Boolean mask of the batteries that take part in
+                                 this step. Inactive batteries keep their state.
+            price (float, optional): The electricity price of the step, if already
+                                     known. Looked up from `timestamp` otherwise.
+
+        Returns:
+            dict: A dictionary containing the cost arrays of the step and the
+                  final SOC and SOH arrays of the bank.
+        """
+        bank = self.battery_bank
+
+        # 1. Calculate all costs for the proposed actions
+        costs = self.cost_calculator.calculate_batch_costs(
+            power_kw=power_kw,
+            duration_h=duration_h,
+            timestamp=timestamp,
+            battery_capacity_kwh=bank.capacity_kwh,
+            soc=bank.soc,
+            price=price
+        )
+
+        # 2. Convert the physical degradation cost to physical SOH loss
+        physical_degradation_cost = costs['calendar_cost'] + costs['cyclic_cost']
+        soh_loss = (physical_degradation_cost / self.battery_eol_cost) * self.EOL_SOH_LOSS
+
+        # 3. Update the state of the active batteries
+        bank.update_soc(power_kw, duration_h, where=active)
+        bank.degrade(soh_loss, where=active)
+
+        # 4. Advance the charged-energy and cycle counters
+        charged = active & (power_kw > 0)
+        self.kwh_charged = np.where(charged, self.kwh_charged + power_kw * duration_h, self.kwh_charged)
+        completed = active & (self.kwh_charged >= bank.capacity_kwh)
+        self.cycle_counts = np.where(completed, self.cycle_counts + 1, self.cycle_counts)
+        self.kwh_charged = np.where(completed, 0.0, self.kwh_charged)
+
+        return {
+            "costs": costs,
+            "final_soc": bank.soc,
+            "final_soh": bank.soh
+        }
@@ -1,3 +1,5 @@
+import numpy as np
+
 class Battery:
     """
     Models the physical state of an EV battery, tracking its state of charge (SOC).
@@ -36,4 +38,55 @@ class Battery:
 
         The final SOH is clamped at 0.0.
         """
-        self.soh = max(0.0, self.soh - soh_loss)
\ No newline at end of file
+        self.soh = max(0.0, self.soh - soh_loss)
+
+
+class BatteryBank:
+    """
+    Models a bank of independent EV batteries whose SOC and SOH are held in
+    NumPy arrays, so that many batteries can be advanced in a single operation.
+
+    The arithmetic mirrors `Battery` exactly, element by element.
+    """
+    def __init__(self, capacity_kwh, shape, initial_soc: float = 0.0, initial_soh: float = 1.0):
+        """
+        Initializes the BatteryBank.
+
+        Args:
+            capacity_kwh (float | np.ndarray): The energy capacity of the batteries in kWh.
+                                               Either a scalar or an array broadcastable to `shape`.
+            shape (tuple): The shape of the bank, e.g. (runs, agents).
+            initial_soc (float): The starting state of charge, from 0.0 to 1.0.
+            initial_soh (float): The starting state of health, from 0.0 to 1.0.
+        """
+        self.capacity_kwh = np.broadcast_to(np.asarray(capacity_kwh, dtype=np.float64), shape)
+        self.soc = np.full(shape, max(0.0, min(1.0, float(initial_soc))), dtype=np.float64)
+        self.soh = np.full(shape, max(0.0, min(1.0, float(initial_soh))), dtype=np.float64)
+
+    def update_soc(self, power_kw: np.ndarray, duration_h: float, where=None):
+        """
+        Updates the SOC of every battery based on the power applied to it.
+
+        Args:
+            power_kw (np.ndarray): The power applied to each battery in kW.
+            duration_h (float): The duration of the power application in hours.
+            where (np.ndarray, optional): Boolean mask selecting the batteries to
+                                          update. All batteries are updated if omitted.
+        """
+        energy_kwh = power_kw * duration_h
+        soc_delta = energy_kwh / self.capacity_kwh
+        new_soc = np.clip(self.soc + soc_delta, 0.0, 1.0)
+        if where is None:
+            self.soc = new_soc
+        else:
+            self.soc = np.where(where, new_soc, self.soc)
+
+    def degrade(self, soh_loss: np.ndarray, where=None):
+        """
+        Reduces the SOH of every battery by the given amounts, clamped at 0.0.
+        """
+        new_soh = np.maximum(0.0, self.soh - soh_loss)
+        if where is None:
+            self.soh = new_soh
+        else:
+            self.soh = np.where(where, new_soh, self.soh)
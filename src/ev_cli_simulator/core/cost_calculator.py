@@ -1,22 +1,151 @@
 from datetime import datetime
+import numpy as np
 from .price_model import PriceModel
 from .degradation_model import DegradationModel
 
+class CostTables:
+    """
+    Precomputed degradation costs for a battery with a fixed set of power levels.
+
+    The cyclic ageing cost of each power level is computed once, and the
+    calendar ageing rate is served from a dense table over SOC that maps each
+    SOC cell to its interpolation segment. The results are identical to the
+    DegradationModel's `np.interp` calls, without their per-call overhead.
+    """
+    def __init__(
+        self,
+        degradation_model: DegradationModel,
+        power_levels: list,
+        battery_capacity_kwh: float,
+        duration_h: float,
+        soc_cells: int = 1024
+    ):
+        """
+        Initializes the CostTables.
+
+        Args:
+            degradation_model (DegradationModel): The model whose costs are tabulated.
+            power_levels (list): The power values in kW that can be applied in a step.
+            battery_capacity_kwh (float): The total capacity of the battery.
+            duration_h (float): The duration of a step in hours.
+            soc_cells (int): The number of cells of the SOC lookup table.
+        """
+        self.battery_capacity_kwh = battery_capacity_kwh
+        self.duration_h = duration_h
+
+        # 1. Cyclic ageing cost per charging power level
+        powers = sorted({float(p) for p in power_levels if p > 0})
+        self._cyclic_by_power = {
+            p: float(degradation_model.get_cyclic_ageing_cost(
+                p / battery_capacity_kwh, p * duration_h / battery_capacity_kwh
+            ))
+            for p in powers
+        }
+        self._powers = np.array(powers, dtype=np.float64)
+        self._cyclic_costs = np.array([self._cyclic_by_power[p] for p in powers], dtype=np.float64)
+
+        # 2. Calendar ageing rate segments, as evaluated by np.interp. A final
+        # flat segment returns the last rate exactly at and above the last point.
+        soc_points = [float(x) for x in degradation_model._calendar_soc_points]
+        rates = [float(y) for y in degradation_model._calendar_cost_rates]
+        slopes = [(rates[j + 1] - rates[j]) / (soc_points[j + 1] - soc_points[j]) for j in range(len(rates) - 1)]
+        self._segment_start = soc_points
+        self._segment_end = soc_points[1:] + [np.inf]
+        self._segment_slope = slopes + [0.0]
+        self._segment_rate = rates
+        self._soc_min, self._soc_max = soc_points[0], soc_points[-1]
+
+        # 3. Dense SOC table: the segment containing the lower edge of each cell
+        self._soc_cells = soc_cells
+        self._cell_scale = soc_cells / (self._soc_max - self._soc_min)
+        cell_edges = self._soc_min + np.arange(soc_cells + 1) / self._cell_scale
+        cell_segments = np.searchsorted(soc_points, cell_edges, side='right') - 1
+        self._cell_segment = cell_segments.tolist()
+        self._cell_segment_array = cell_segments.astype(np.int64)
+        self._segment_arrays = tuple(
+            np.array(v, dtype=np.float64)
+            for v in (self._segment_start, self._segment_end, self._segment_slope, self._segment_rate)
+        )
+
+    def applies_to(self, battery_capacity_kwh, duration_h: float) -> bool:
+        """Checks whether the tables were built for this battery and step duration."""
+        if duration_h != self.duration_h:
+            return False
+        if np.ndim(battery_capacity_kwh) == 0:
+            return battery_capacity_kwh == self.battery_capacity_kwh
+        return bool(np.all(battery_capacity_kwh == self.battery_capacity_kwh))
+
+    def cyclic_cost(self, power_kw: float) -> float | None:
+        """Returns the cyclic cost of a charging power level, or None if it is not tabulated."""
+        return self._cyclic_by_power.get(power_kw)
+
+    def cyclic_costs(self, power_kw: np.ndarray) -> np.ndarray | None:
+        """
+        Array counterpart of `cyclic_cost`: zero where the battery is not
+        charging. Returns None if any charging power is not tabulated.
+        """
+        charging = power_kw > 0
+        if not charging.any():
+            return np.zeros(np.shape(power_kw))
+        if len(self._powers) == 0:
+            return None
+        index = np.minimum(np.searchsorted(self._powers, power_kw), len(self._powers) - 1)
+        if not np.all(~charging | (self._powers[index] == power_kw)):
+            return None
+        return np.where(charging, self._cyclic_costs[index], 0.0)
+
+    def calendar_cost(self, soc: float) -> float:
+        """Returns the calendar ageing cost of one step at the given SOC."""
+        soc = min(max(soc, self._soc_min), self._soc_max)
+        segment = self._cell_segment[int((soc - self._soc_min) * self._cell_scale)]
+        # Rounding can put an SOC just below a point into the cell that starts at it
+        if soc < self._segment_start[segment]:
+            segment -= 1
+        elif soc >= self._segment_end[segment]:
+            segment += 1
+        rate = self._segment_slope[segment] * (soc - self._segment_start[segment]) + self._segment_rate[segment]
+        return rate * self.duration_h
+
+    def calendar_costs(self, soc: np.ndarray) -> np.ndarray:
+        """Array counterpart of `calendar_cost`."""
+        start, end, slope, rate = self._segment_arrays
+        soc = np.clip(soc, self._soc_min, self._soc_max)
+        segment = self._cell_segment_array[((soc - self._soc_min) * self._cell_scale).astype(np.int64)]
+        segment = segment - (soc < start[segment]) + (soc >= end[segment])
+        return (slope[segment] * (soc - start[segment]) + rate[segment]) * self.duration_h
+
 class CostCalculator:
     """
     Orchestrates various models to calculate all costs associated with a
     single charging/discharging step.
     """
-    def __init__(self, price_model: PriceModel, degradation_model: DegradationModel):
+    def __init__(
+        self,
+        price_model: PriceModel,
+        degradation_model: DegradationModel,
+        power_levels: list | None = None,
+        battery_capacity_kwh: float | None = None,
+        duration_h: float = 0.25
+    ):
         """
         Initializes the CostCalculator with the necessary subordinate models.
 
+        Given the power levels and battery capacity, the degradation costs are
+        compiled into CostTables and served by indexing for steps of
+        `duration_h`; other steps fall back to the DegradationModel.
+
         Args:
             price_model (PriceModel): An instance of the PriceModel.
             degradation_model (DegradationModel): An instance of the DegradationModel.
+            power_levels (list, optional): The power values in kW that can be applied.
+            battery_capacity_kwh (float, optional): The total capacity of the battery.
+            duration_h (float): The step duration the cost tables are compiled for.
         """
         self.price_model = price_model
         self.degradation_model = degradation_model
+        self.tables = None
+        if power_levels is not None and battery_capacity_kwh is not None:
+            self.tables = CostTables(degradation_model, power_levels, battery_capacity_kwh, duration_h)
 
     def calculate_step_costs(
         self,
@@ -25,7 +154,8 @@ class CostCalculator:
         timestamp: datetime,
         battery_capacity_kwh: float,
         soc: float,
-        cycle_number: int
+        cycle_number: int,
+        price: float | None = None
     ) -> dict:
         """
         Calculates all cost components for a single time step.
@@ -37,12 +167,15 @@ class CostCalculator:
             battery_capacity_kwh (float): The total capacity of the battery.
             soc (float): The battery's state of charge at the beginning of the step.
             cycle_number (int): The current cycle number of the battery.
+            price (float, optional): The electricity price of the step, if already
+                                     known. Looked up from `timestamp` otherwise.
 
         Returns:
             dict: A dictionary containing all individual costs and the total cost.
         """
         # 1. Calculate Electricity Cost
-        price = self.price_model.get_price(timestamp)
+        if price is None:
+            price = self.price_model.get_price(timestamp)
         if price is None:
             # Handle cases where price data might be missing
             raise ValueError(f"Price not found for timestamp: {timestamp}")
@@ -50,6 +183,19 @@ class CostCalculator:
         energy_kwh = power_kw * duration_h
         electricity_cost = energy_kwh * price
 
+        tables = self.tables
+        if tables is not None and tables.applies_to(battery_capacity_kwh, duration_h):
+            calendar_cost = tables.calendar_cost(soc)
+            cyclic_cost = tables.cyclic_cost(power_kw) if power_kw > 0 else 0.0
+            if cyclic_cost is not None:
+                total_cost = electricity_cost + calendar_cost + cyclic_cost
+                return {
+                    "electricity_cost": electricity_cost,
+                    "calendar_cost": calendar_cost,
+                    "cyclic_cost": cyclic_cost,
+                    "total_cost": total_cost,
+                }
+
         # For degradation, only positive power (charging) should incur cost
         if power_kw <= 0:
             calendar_cost = self.degradation_model.get_calendar_ageing_cost(soc, duration_h)
@@ -71,4 +217,70 @@ class CostCalculator:
             "calendar_cost": calendar_cost,
             "cyclic_cost": cyclic_cost,
             "total_cost": total_cost,
-        }
\ No newline at end of file
+        }
+
+    def calculate_batch_costs(
+        self,
+        power_kw: np.ndarray,
+        duration_h: float,
+        timestamp: datetime,
+        battery_capacity_kwh,
+        soc: np.ndarray,
+        price: float | None = None
+    ) -> dict:
+        """
+        Calculates all cost components for a time step shared by many batteries.
+
+        This is the array counterpart of `calculate_step_costs`: every battery is
+        charged at the same price, and the per-element results are identical to
+        calling the scalar method once per battery.
+
+        Args:
+            power_kw (np.ndarray): The power applied to each battery in kW.
+            duration_h (float): The duration of the step in hours.
+            timestamp (datetime): The timestamp of the step.
+            battery_capacity_kwh (float | np.ndarray): The capacity of each battery.
+            soc (np.ndarray): Each battery's state of charge at the beginning of the step.
+            price (float, optional): The electricity price of the step, if already
+                                     known. Looked up from `timestamp` otherwise.
+
+        Returns:
+            dict: A dictionary of arrays with the individual costs and the total cost.
+        """
+        if price is None:
+            price = self.price_model.get_price(timestamp)
+        if price is None:
+            raise ValueError(f"Price not found for timestamp: {timestamp}")
+
+        energy_kwh = power_kw * duration_h
+        electricity_cost = energy_kwh * price
+
+        tables = self.tables
+        cyclic_cost = None
+        if tables is not None and tables.duration_h == duration_h:
+            # Calendar ageing does not depend on the capacity, so batteries of
+            # other capacities (e.g. in a sweep) still use the SOC table
+            calendar_cost = tables.calendar_costs(soc)
+            if tables.applies_to(battery_capacity_kwh, duration_h):
+                cyclic_cost = tables.cyclic_costs(power_kw)
+        else:
+            calendar_cost = self.degradation_model.get_calendar_ageing_cost(soc, duration_h)
+
+        if cyclic_cost is None:
+            # Cyclic ageing only applies to batteries that are charging
+            c_rate = power_kw / battery_capacity_kwh
+            cycle_portion = energy_kwh / battery_capacity_kwh
+            cyclic_cost = np.where(
+                power_kw > 0,
+                self.degradation_model.get_cyclic_ageing_cost(c_rate, cycle_portion),
+                0.0
+            )
+
+        total_cost = electricity_cost + calendar_cost + cyclic_cost
+
+        return {
+            "electricity_cost": electricity_cost,
+            "calendar_cost": calendar_cost,
+            "cyclic_cost": cyclic_cost,
+            "total_cost": total_cost,
+        }
@@ -1,6 +1,33 @@
 import csv
+import hashlib
 import io
+import json
+import os
+import warnings
+from collections import OrderedDict
 from datetime import datetime, timezone, timedelta
+from zoneinfo import ZoneInfo
+import numpy as np
+
+_UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Day-of-year offset of each month's first day in a leap year
+_LEAP_MONTH_OFFSETS = [0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335]
+
+# Sentinels used in the per-time-zone index tables
+_NO_PRICE = -1
+_RESOLVE_PER_CALL = -2
+_DEFERRED = object()
+
+PRICE_CACHE_VERSION = 1
+
+# The time zone whose index table is precompiled into price caches; the
+# simulation calendar's local time
+CACHED_INDEX_ZONE = "Europe/Riga"
+
+def _epoch_seconds(timestamp: datetime) -> int:
+    """Converts a tz-aware datetime into whole seconds since the Unix epoch."""
+    return (timestamp - _UNIX_EPOCH) // timedelta(seconds=1)
 
 class PriceModel:
     """
@@ -19,11 +46,13 @@ class PriceModel:
         self._base_year_map = {}
         min_year = 9999
         max_year = 0
+        num_rows = 0
 
         csv_file = io.StringIO(price_data_csv)
         reader = csv.DictReader(csv_file)
 
         for row in reader:
+            num_rows += 1
             timestamp_str = row['ts_start']
             price = float(row['price'])
             
@@ -42,8 +71,111 @@ class PriceModel:
             min_year = min(min_year, timestamp.year)
             max_year = max(max_year, timestamp.year)
 
-        # Create a map for looping data. For each day of a leap year,
-        # it stores the corresponding date in a year that exists in the data.
+        self._min_year = min_year
+        self._max_year = max_year
+        self._build_year_map()
+        self.num_duplicates = num_rows - len(self._prices)
+
+        # Array-backed store for integer-indexed lookups
+        self._build_price_array()
+        self._index_tables = {}
+
+    @classmethod
+    def from_csv(cls, price_path: str) -> "PriceModel":
+        """
+        Loads a price CSV file with array operations instead of row by row.
+
+        The 'ts_start' and 'price' columns are read in one pass and the ISO
+        timestamps are decoded from their characters, without creating a
+        datetime per row. Duplicate timestamps keep the last price, as in the
+        row-by-row parser. Files with timestamp layouts that are not handled
+        here (e.g. fractional seconds) are parsed by the constructor instead.
+
+        Args:
+            price_path (str): The file path to the price CSV.
+        """
+        parsed = _read_price_columns(price_path)
+        if parsed is None:
+            with open(price_path, 'r') as f:
+                return cls(f.read())
+        epochs, prices, years = parsed
+
+        # A stable sort keeps equal timestamps in file order; the last one wins
+        order = np.argsort(epochs, kind='stable')
+        epochs, prices = epochs[order], prices[order]
+        last = np.ones(len(epochs), dtype=bool)
+        last[:-1] = epochs[1:] != epochs[:-1]
+        epochs, prices = epochs[last], prices[last]
+
+        start_epoch = int(epochs[0]) if len(epochs) else 0
+        resolution_s = int(np.gcd.reduce(np.diff(epochs))) if len(epochs) > 1 else 3600
+        length = int(epochs[-1] - start_epoch) // resolution_s + 1 if len(epochs) else 0
+        price_array = np.full(length, np.nan, dtype=np.float64)
+        price_array[(epochs - start_epoch) // resolution_s] = prices
+
+        min_year, max_year = (int(years.min()), int(years.max())) if len(years) else (9999, 0)
+        return cls._from_arrays(
+            price_array, start_epoch, resolution_s, min_year, max_year, int(len(order) - len(epochs))
+        )
+
+    @classmethod
+    def _from_arrays(
+        cls, price_array: np.ndarray, start_epoch: int, resolution_s: int,
+        min_year: int, max_year: int, num_duplicates: int
+    ) -> "PriceModel":
+        """Builds a model without a price dictionary from its price array and year range."""
+        model = cls.__new__(cls)
+        model._prices = None
+        model._min_year = min_year
+        model._max_year = max_year
+        model._base_year_map = {}
+        model._build_year_map()
+        model.num_duplicates = num_duplicates
+        model._start_epoch = start_epoch
+        model._resolution_s = resolution_s
+        model._price_array = price_array
+        model._index_tables = {}
+        return model
+
+    @property
+    def num_gaps(self) -> int:
+        """The number of time slots without a price between the first and the last timestamp."""
+        return int(np.isnan(self._price_array).sum())
+
+    @classmethod
+    def from_cache(cls, cache_dir: str) -> "PriceModel":
+        """
+        Loads a PriceModel from a binary cache written by `compile_price_cache`.
+
+        The price array and the precompiled index table are memory-mapped
+        read-only, so processes loading the same cache share their pages
+        instead of each parsing the CSV into a dictionary.
+
+        Args:
+            cache_dir (str): The cache directory.
+
+        Raises:
+            ValueError: If the cache was written by an unsupported version.
+        """
+        header = _read_cache_header(cache_dir)
+        if header is None or header.get('version') != PRICE_CACHE_VERSION:
+            raise ValueError(f"No supported price cache in {cache_dir}")
+
+        price_array = np.load(os.path.join(cache_dir, 'prices.npy'), mmap_mode='r').view(np.ndarray)
+        model = cls._from_arrays(
+            price_array, header['start_epoch'], header['resolution_s'],
+            header['min_year'], header['max_year'], header.get('num_duplicates', 0)
+        )
+        table = np.load(os.path.join(cache_dir, 'index.npy'), mmap_mode='r').view(np.ndarray)
+        model._index_tables = {ZoneInfo(header['index_zone']): (table, model._slot_prices(table))}
+        return model
+
+    def _build_year_map(self):
+        """
+        Creates a map for looping data. For each day of a leap year,
+        it stores the corresponding date in a year that exists in the data.
+        """
+        min_year, max_year = self._min_year, self._max_year
         if min_year <= max_year:
             for day_of_year in range(1, 367):
                 try:
@@ -54,10 +186,30 @@ class PriceModel:
                 except ValueError:
                     continue # Skip Feb 29 if target year is not a leap year
 
+    def _has_price(self, timestamp: datetime) -> bool:
+        """
+        Checks whether the data holds a price for exactly this timestamp.
 
-    def get_price(self, timestamp: datetime) -> float | None:
+        A model loaded from a cache has no dictionary; it answers from the
+        price array, with the semantics of the dictionary lookup: the data's
+        timestamps have fixed UTC offsets, and a datetime whose offset depends
+        on its fold (a DST gap or repeated hour) never equals a datetime of
+        another time zone.
         """
-        Gets the electricity price for the hour corresponding to the given timestamp.
+        if self._prices is not None:
+            return timestamp in self._prices
+        if timestamp.utcoffset() != timestamp.replace(fold=1 - timestamp.fold).utcoffset():
+            return False
+        offset, remainder = divmod(_epoch_seconds(timestamp) - self._start_epoch, self._resolution_s)
+        return (
+            remainder == 0 and 0 <= offset < len(self._price_array)
+            and not np.isnan(self._price_array[offset])
+        )
+
+
+    def _resolve_key(self, timestamp: datetime) -> datetime | None:
+        """
+        Resolves a timestamp to the key of `_prices` holding its price.
         Handles data looping for long simulations and DST gaps.
         """
         lookup_time = timestamp.replace(minute=0, second=0, microsecond=0)
@@ -70,13 +222,411 @@ class PriceModel:
         except ValueError: # Handle Feb 29 in non-leap years
             looped_lookup_time = lookup_time.replace(year=year, month=month, day=28)
 
-        price = self._prices.get(looped_lookup_time)
+        if self._has_price(looped_lookup_time):
+            return looped_lookup_time
 
         # --- DST Handling ---
         # If price is not found (e.g., during DST spring forward),
         # use the price from the previous hour.
-        if price is None:
-            previous_hour = looped_lookup_time - timedelta(hours=1)
-            return self._prices.get(previous_hour)
+        previous_hour = looped_lookup_time - timedelta(hours=1)
+        if self._has_price(previous_hour):
+            return previous_hour
+
+        return None
+
+    def _resolve_index(self, timestamp: datetime) -> int:
+        """Resolves a timestamp to its position in `_price_array`, or _NO_PRICE."""
+        key = self._resolve_key(timestamp)
+        if key is None:
+            return _NO_PRICE
+        return (_epoch_seconds(key) - self._start_epoch) // self._resolution_s
+
+    def _build_price_array(self):
+        """
+        Lays the parsed prices out in a contiguous float64 array on a regular
+        time grid. The grid step is the largest one that fits every timestamp,
+        so hourly data gets an hourly grid; gaps are filled with NaN.
+        """
+        epochs = sorted(_epoch_seconds(ts) for ts in self._prices)
+        self._start_epoch = epochs[0] if epochs else 0
+        self._resolution_s = 3600
+        if len(epochs) > 1:
+            self._resolution_s = int(np.gcd.reduce(np.diff(epochs)))
+
+        length = (epochs[-1] - self._start_epoch) // self._resolution_s + 1 if epochs else 0
+        self._price_array = np.full(length, np.nan, dtype=np.float64)
+        for ts, price in self._prices.items():
+            self._price_array[(_epoch_seconds(ts) - self._start_epoch) // self._resolution_s] = price
+
+    def _index_table(self, tz) -> tuple:
+        """
+        Returns the lookup tables for timestamps in a given time zone, building
+        them on first use.
+
+        The index table maps each (day of a leap year, hour) slot to a position
+        in `_price_array`, with the year looping and the DST fill-forward
+        already applied. Slots whose answer depends on the calendar year
+        (Feb 29 when the looped year is not a leap year) hold _RESOLVE_PER_CALL.
+        The second table holds the slot prices as Python floats for scalar lookups.
+        """
+        tables = self._index_tables.get(tz)
+        if tables is not None:
+            return tables
+
+        table = np.full(366 * 24, _NO_PRICE, dtype=np.int64)
+        if len(self._price_array):
+            for day_of_year in range(366):
+                base_date = datetime(2024, 1, 1) + timedelta(days=day_of_year) # 2024 is a leap year
+                slot = day_of_year * 24
+                if (base_date.month, base_date.day) not in self._base_year_map:
+                    table[slot:slot + 24] = _RESOLVE_PER_CALL
+                    continue
+                for hour in range(24):
+                    table[slot + hour] = self._resolve_index(base_date.replace(hour=hour, tzinfo=tz))
+
+        tables = (table, self._slot_prices(table))
+        self._index_tables[tz] = tables
+        return tables
+
+    def _slot_prices(self, table: np.ndarray) -> list:
+        """Reads the prices of an index table's slots as Python floats."""
+        return [
+            None if index == _NO_PRICE else _DEFERRED if index == _RESOLVE_PER_CALL
+            else float(self._price_array[index])
+            for index in table.tolist()
+        ]
 
+    def get_price(self, timestamp: datetime) -> float | None:
+        """
+        Gets the electricity price for the hour corresponding to the given timestamp.
+        Handles data looping for long simulations and DST gaps.
+        """
+        if timestamp.fold:
+            return self._price_at(self._resolve_index(timestamp))
+
+        _, slot_prices = self._index_table(timestamp.tzinfo)
+        price = slot_prices[(_LEAP_MONTH_OFFSETS[timestamp.month - 1] + timestamp.day - 1) * 24 + timestamp.hour]
+        if price is _DEFERRED:
+            return self._price_at(self._resolve_index(timestamp))
         return price
+
+    def _price_at(self, index: int) -> float | None:
+        """Reads one price from the array, mapping _NO_PRICE to None."""
+        return None if index == _NO_PRICE else float(self._price_array[index])
+
+    def get_price_indices(self, timestamps) -> np.ndarray:
+        """
+        Resolves many timestamps to positions in the price array at once.
+
+        Args:
+            timestamps (Iterable[datetime]): The timestamps to look up.
+
+        Returns:
+            np.ndarray: An int64 array of positions, -1 where no price exists.
+        """
+        timestamps = list(timestamps)
+        indices = np.full(len(timestamps), _NO_PRICE, dtype=np.int64)
+
+        # Group by time zone so each group is served by one fancy-indexing read
+        groups = {}
+        for position, ts in enumerate(timestamps):
+            if ts.fold:
+                indices[position] = self._resolve_index(ts)
+                continue
+            slots = groups.setdefault(ts.tzinfo, ([], []))
+            slots[0].append(position)
+            slots[1].append((_LEAP_MONTH_OFFSETS[ts.month - 1] + ts.day - 1) * 24 + ts.hour)
+
+        for tz, (positions, slots) in groups.items():
+            table, _ = self._index_table(tz)
+            positions = np.asarray(positions, dtype=np.int64)
+            resolved = table[np.asarray(slots, dtype=np.int64)]
+            indices[positions] = resolved
+            for position in positions[resolved == _RESOLVE_PER_CALL].tolist():
+                indices[position] = self._resolve_index(timestamps[position])
+
+        return indices
+
+    def get_day_price_indices(self, dates, tz) -> np.ndarray:
+        """
+        Resolves every local hour of the given calendar dates at once.
+
+        Args:
+            dates (Sequence[date]): The local calendar dates.
+            tz (tzinfo): The time zone the dates are expressed in.
+
+        Returns:
+            np.ndarray: An int64 array of shape (len(dates), 24) with positions
+                        in the price array, -1 where no price exists.
+        """
+        table, _ = self._index_table(tz)
+        day_slots = np.array(
+            [_LEAP_MONTH_OFFSETS[d.month - 1] + d.day - 1 for d in dates], dtype=np.int64
+        ).reshape(-1, 1)
+        indices = table[day_slots * 24 + np.arange(24)]
+        for row, hour in zip(*np.nonzero(indices == _RESOLVE_PER_CALL)):
+            d = dates[row]
+            indices[row, hour] = self._resolve_index(datetime(d.year, d.month, d.day, hour, tzinfo=tz))
+        return indices
+
+    def get_prices(self, timestamps) -> np.ndarray:
+        """
+        Gets the electricity prices for many timestamps in one call, e.g. every
+        step of a day or a year.
+
+        Args:
+            timestamps (Iterable[datetime]): The timestamps to look up.
+
+        Returns:
+            np.ndarray: A float64 array of prices, NaN where no price exists.
+        """
+        return self.prices_at(self.get_price_indices(timestamps))
+
+    def prices_at(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Reads prices for positions returned by `get_price_indices`.
+
+        Returns:
+            np.ndarray: A float64 array of prices, NaN for position -1.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        prices = np.full(indices.shape, np.nan, dtype=np.float64)
+        found = indices != _NO_PRICE
+        prices[found] = self._price_array[indices[found]]
+        return prices
+
+
+def price_cache_dir(price_path: str) -> str:
+    """Returns the binary cache directory of a price CSV."""
+    return os.path.splitext(price_path)[0] + '.price_cache'
+
+def compile_price_cache(price_path: str, cache_dir: str = None) -> str:
+    """
+    Compiles a price CSV into a binary cache that `PriceModel.from_cache`
+    memory-maps: the price array as .npy, the index table of the simulation
+    time zone (year looping and DST fill-forward applied) as .npy, and a JSON
+    header with the start epoch, resolution, year range and the SHA-256 of
+    the CSV. The header is written last, so an interrupted compile leaves no
+    valid cache. A cache whose hash matches the CSV is kept as it is.
+
+    Args:
+        price_path (str): The file path to the price CSV.
+        cache_dir (str, optional): The cache directory. Defaults to
+                                   `price_cache_dir(price_path)`.
+
+    Returns:
+        str: The cache directory.
+    """
+    if cache_dir is None:
+        cache_dir = price_cache_dir(price_path)
+    source_hash = _file_sha256(price_path)
+    header = _read_cache_header(cache_dir)
+    if header is not None and header.get('version') == PRICE_CACHE_VERSION and header['source_sha256'] == source_hash:
+        return cache_dir
+
+    price_model = PriceModel.from_csv(price_path)
+    table, _ = price_model._index_table(ZoneInfo(CACHED_INDEX_ZONE))
+
+    os.makedirs(cache_dir, exist_ok=True)
+    header_path = os.path.join(cache_dir, 'header.json')
+    if os.path.exists(header_path):
+        os.remove(header_path)
+    for name, array in (('prices.npy', price_model._price_array), ('index.npy', table)):
+        tmp_path = os.path.join(cache_dir, name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.save(f, array)
+        os.replace(tmp_path, os.path.join(cache_dir, name))
+
+    header = {
+        'version': PRICE_CACHE_VERSION,
+        'source_sha256': source_hash,
+        'start_epoch': price_model._start_epoch,
+        'resolution_s': price_model._resolution_s,
+        'min_year': price_model._min_year,
+        'max_year': price_model._max_year,
+        'num_duplicates': price_model.num_duplicates,
+        'index_zone': CACHED_INDEX_ZONE,
+    }
+    tmp_path = header_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(header, f, indent=2)
+    os.replace(tmp_path, header_path)
+    return cache_dir
+
+def _read_price_columns(price_path: str) -> tuple | None:
+    """
+    Reads the 'ts_start' and 'price' columns of a price CSV into arrays.
+
+    Timestamps are decoded from the code points of a fixed-width string
+    array. The layouts handled are 'YYYY-MM-DD[T ]HH:MM[:SS]' followed by
+    nothing, 'Z' or a '+HH:MM'/'-HH:MM' offset, interpreted like the
+    row-by-row parser: timestamps without a '+' offset or 'Z' (including
+    negative offsets) are read as UTC wall-clock times.
+
+    Returns:
+        tuple | None: The epoch seconds, prices and (local) years of the
+                      rows, or None if the file needs the row-by-row parser.
+    """
+    with open(price_path, 'r', newline='') as f:
+        header = next(csv.reader(f), None)
+    if header is None or 'ts_start' not in header or 'price' not in header:
+        return None
+    # Like csv.DictReader, a repeated column name refers to its last occurrence
+    columns = tuple(len(header) - 1 - header[::-1].index(name) for name in ('ts_start', 'price'))
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning) # Empty files and blank lines
+            table = np.loadtxt(
+                price_path, delimiter=',', skiprows=1, usecols=columns, dtype=str,
+                quotechar='"', comments=None, ndmin=2, encoding='utf-8'
+            )
+        prices = table[:, 1].astype(np.float64)
+    except ValueError:
+        return None
+
+    stamps = np.ascontiguousarray(table[:, 0])
+    num_rows = len(stamps)
+    if num_rows == 0:
+        return np.zeros(0, dtype=np.int64), prices, np.zeros(0, dtype=np.int64)
+    width = stamps.dtype.itemsize // 4
+    if width < 16:
+        return None
+    # Pad the codes so that the fields after the shortest layout can always be indexed
+    codes = np.zeros((num_rows, max(width, 19) + 6), dtype=np.int64)
+    codes[:, :width] = stamps.view(np.uint32).reshape(num_rows, width)
+    lengths = np.count_nonzero(codes, axis=1)
+    digits = codes - ord('0')
+    rows = np.arange(num_rows)
+
+    def number(positions):
+        """Decodes the digits at the given (per-row) positions; -1 if any is not a digit."""
+        values = np.zeros(num_rows, dtype=np.int64)
+        valid = np.ones(num_rows, dtype=bool)
+        for position in positions:
+            digit = digits[rows, position]
+            valid &= (digit >= 0) & (digit <= 9)
+            values = values * 10 + digit
+        return np.where(valid, values, -1)
+
+    layout = (
+        (codes[:, 4] == ord('-')) & (codes[:, 7] == ord('-')) & (codes[:, 13] == ord(':'))
+        & ((codes[:, 10] == ord('T')) | (codes[:, 10] == ord(' ')))
+    )
+    has_seconds = (lengths >= 19) & (codes[:, 16] == ord(':'))
+    rest = np.where(has_seconds, 19, 16)
+    suffix_length = lengths - rest
+    sign = codes[rows, rest]
+    is_utc = (suffix_length == 0) | ((suffix_length == 1) & (sign == ord('Z')))
+    has_offset = (
+        (suffix_length == 6) & ((sign == ord('+')) | (sign == ord('-'))) & (codes[rows, rest + 3] == ord(':'))
+    )
+    if not np.all(layout & (is_utc | has_offset)):
+        return None
+
+    year, month, day = number([0, 1, 2, 3]), number([5, 6]), number([8, 9])
+    hour, minute = number([11, 12]), number([14, 15])
+    second = np.where(has_seconds, number([17, 18]), 0)
+    offset_hours = np.where(has_offset, number([rest + 1, rest + 2]), 0)
+    offset_minutes = np.where(has_offset, number([rest + 4, rest + 5]), 0)
+
+    months = (year - 1970) * 12 + (month - 1)
+    first_day = months.astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+    month_days = (months + 1).astype('datetime64[M]').astype('datetime64[D]').astype(np.int64) - first_day
+    valid = (
+        (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days)
+        & (hour >= 0) & (hour <= 23) & (minute >= 0) & (minute <= 59) & (second >= 0) & (second <= 59)
+        & (offset_hours >= 0) & (offset_hours <= 23) & (offset_minutes >= 0) & (offset_minutes <= 59)
+    )
+    if not valid.all():
+        return None
+
+    # Only '+' offsets are applied; the row-by-row parser reads other timestamps as UTC
+    offset = np.where(has_offset & (sign == ord('+')), offset_hours * 3600 + offset_minutes * 60, 0)
+    epochs = (first_day + day - 1) * 86400 + hour * 3600 + minute * 60 + second - offset
+    return epochs, prices, year
+
+def _read_cache_header(cache_dir: str) -> dict | None:
+    """Reads the header of a price cache, or returns None if there is none."""
+    path = os.path.join(cache_dir, 'header.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def _file_sha256(path: str) -> str:
+    """Returns the hex SHA-256 digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PriceModelCache:
+    """
+    Caches parsed PriceModels by file path, so that a price CSV is only read and
+    parsed once per process. An entry is rebuilt when the file's modification
+    time or size changes. If the CSV has been compiled into a binary cache
+    (see `compile_price_cache`) whose hash still matches, the model is mapped
+    from it instead of parsing the CSV. A cache with a `max_models` bound
+    drops the least recently used model once it is full.
+    """
+    def __init__(self, max_models: int = None):
+        """
+        Initializes an empty cache.
+
+        Args:
+            max_models (int, optional): The number of models to keep. Unbounded by default.
+        """
+        self.max_models = max_models
+        self._models = OrderedDict()
+
+    def get(self, price_path: str) -> PriceModel:
+        """
+        Returns the PriceModel for a CSV file, parsing it only if needed.
+
+        Args:
+            price_path (str): The file path to the price CSV.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        path = os.path.abspath(price_path)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        cached = self._models.get(path)
+        if cached is not None and cached[0] == signature:
+            self._models.move_to_end(path)
+            return cached[1]
+
+        cache_dir = price_cache_dir(path)
+        header = _read_cache_header(cache_dir)
+        if (
+            header is not None and header.get('version') == PRICE_CACHE_VERSION
+            and header['source_sha256'] == _file_sha256(path)
+        ):
+            price_model = PriceModel.from_cache(cache_dir)
+        else:
+            price_model = PriceModel.from_csv(path)
+        self._models[path] = (signature, price_model)
+        self._models.move_to_end(path)
+        if self.max_models is not None and len(self._models) > self.max_models:
+            self._models.popitem(last=False)
+        return price_model
+
+    def __len__(self) -> int:
+        """Returns the number of cached models."""
+        return len(self._models)
+
+    def clear(self):
+        """Drops all cached models."""
+        self._models.clear()
+
+
+_default_cache = PriceModelCache()
+
+def load_price_model(price_path: str) -> PriceModel:
+    """Loads a PriceModel from a CSV file through the process-wide cache."""
+    return _default_cache.get(price_path)
@@ -0,0 +1,99 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+import numpy as np
+from .price_model import PriceModel
+
+class SimulationCalendar:
+    """
+    Precomputes the time axis of a simulation horizon.
+
+    The simulation walks 96 fifteen-minute steps per day starting on
+    2025-01-01 in local Latvian time. Everything the run loop used to derive
+    from a fresh datetime on every step (local hour, charging-window
+    membership, price) is computed here once, as arrays indexed by
+    (day, step), so the loop only walks integer indices.
+    """
+    STEPS_PER_DAY = 96
+    STEP_MINUTES = 15
+
+    def __init__(
+        self,
+        num_days: int,
+        scenarios: list,
+        price_model: Optional[PriceModel] = None,
+        start_date: date = date(2025, 1, 1),
+        tz=ZoneInfo("Europe/Riga")
+    ):
+        """
+        Initializes the SimulationCalendar.
+
+        Args:
+            num_days (int): The number of simulated days.
+            scenarios (list): The ScenarioConfig objects whose windows to precompute.
+            price_model (PriceModel, optional): The model to resolve prices from.
+                                                Prices are left empty if omitted.
+            start_date (date): The local date of the first simulated day.
+            tz (tzinfo): The local time zone of the simulation.
+        """
+        self.num_days = num_days
+        self.tz = tz
+        self.start = datetime(start_date.year, start_date.month, start_date.day, tzinfo=tz)
+        self.dates = [start_date + timedelta(days=day) for day in range(num_days)]
+
+        # Datetime arithmetic on aware datetimes is wall-clock arithmetic, so the
+        # local hour of a step is the same on every day, DST days included.
+        self.step_hours = np.arange(self.STEPS_PER_DAY) * self.STEP_MINUTES // 60
+
+        # In-window masks and the in-window step indices, one per scenario
+        self.window_masks = np.array(
+            [[in_window(s, hour) for hour in self.step_hours] for s in scenarios], dtype=bool
+        ).reshape(len(scenarios), self.STEPS_PER_DAY)
+        self.window_steps = [np.flatnonzero(mask).tolist() for mask in self.window_masks]
+
+        self.step_epochs = self._compute_step_epochs()
+
+        # Hourly price positions and values; the value lists serve scalar reads
+        self.price_indices = None
+        self.hourly_prices = None
+        self._price_lists = None
+        if price_model is not None:
+            self.price_indices = price_model.get_day_price_indices(self.dates, tz)
+            self.hourly_prices = price_model.prices_at(self.price_indices)
+            self._price_lists = [
+                [None if np.isnan(p) else p for p in day_prices]
+                for day_prices in self.hourly_prices.tolist()
+            ]
+
+    def _compute_step_epochs(self) -> np.ndarray:
+        """Computes the Unix epoch seconds of every (day, step) as an int64 array."""
+        offsets = np.empty((self.num_days, 24), dtype=np.int64)
+        for day, d in enumerate(self.dates):
+            first = datetime(d.year, d.month, d.day, 0, tzinfo=self.tz).utcoffset()
+            last = datetime(d.year, d.month, d.day, 23, tzinfo=self.tz).utcoffset()
+            if first == last:
+                offsets[day] = first.total_seconds()
+            else: # A DST transition day
+                offsets[day] = [
+                    datetime(d.year, d.month, d.day, hour, tzinfo=self.tz).utcoffset().total_seconds()
+                    for hour in range(24)
+                ]
+
+        day_epochs = np.array([(d - date(1970, 1, 1)).days for d in self.dates], dtype=np.int64) * 86400
+        step_seconds = np.arange(self.STEPS_PER_DAY, dtype=np.int64) * self.STEP_MINUTES * 60
+        return day_epochs[:, None] + step_seconds - offsets[:, self.step_hours]
+
+    def timestamp(self, day: int, step: int) -> datetime:
+        """Builds the local timestamp of a step, for consumers that need a datetime."""
+        return self.start + timedelta(days=day, minutes=self.STEP_MINUTES * step)
+
+    def day_prices(self, day: int) -> List[Optional[float]]:
+        """Returns the 24 hourly prices of a day, None where no price exists."""
+        return self._price_lists[day] if self._price_lists is not None else [None] * 24
+
+def in_window(scenario, hour: int) -> bool:
+    """Checks whether an hour of the day falls inside a scenario's charging window."""
+    start, end = scenario.start_hour, scenario.end_hour
+    if start > end:
+        return hour >= start or hour < end
+    return start <= hour < end
@@ -31,7 +31,8 @@ class SimulationEngine:
         power_kw: float,
         duration_h: float,
         timestamp: datetime,
-        cycle_number: int
+        cycle_number: int,
+        price: float | None = None
     ) -> dict:
         """
         Executes one full time step of the simulation.
@@ -41,6 +42,8 @@ class SimulationEngine:
             duration_h (float): The duration of this step in hours.
             timestamp (datetime): The timestamp of the beginning of the step.
             cycle_number (int): The current cycle number of the battery.
+            price (float, optional): The electricity price of the step, if already
+                                     known. Looked up from `timestamp` otherwise.
 
         Returns:
             dict: A dictionary containing the detailed results of the step,
@@ -55,7 +58,8 @@ class SimulationEngine:
             timestamp=timestamp,
             battery_capacity_kwh=self.battery.capacity_kwh,
             soc=initial_soc,
-            cycle_number=cycle_number
+            cycle_number=cycle_number,
+            price=price
         )
         
         # **FIX: Calculate physical degradation cost separately from economic cost.**
@@ -63,7 +67,7 @@ class SimulationEngine:
         physical_degradation_cost = costs['calendar_cost'] + costs['cyclic_cost']
 
         # 2. Convert the physical degradation cost to physical SOH loss
-        soh_loss = (physical_degradation_cost / self.battery_eol_cost) * self.EOL_SOH_LOSS
+        soh_loss = self.get_soh_loss(physical_degradation_cost)
 
         # 3. Update the battery's state
         self.battery.update_soc(power_kw, duration_h)
@@ -75,3 +79,7 @@ class SimulationEngine:
             "final_soc": self.battery.soc,
             "final_soh": self.battery.soh
         }
+
+    def get_soh_loss(self, physical_degradation_cost: float) -> float:
+        """Converts a physical degradation cost (€) into the SOH it costs the battery."""
+        return (physical_degradation_cost / self.battery_eol_cost) * self.EOL_SOH_LOSS
@@ -1,5 +1,39 @@
-import pandas as pd
-from typing import List, Dict, Any
+import os
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, List, Dict, Any
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+_UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+class Timestamps:
+    """
+    A column of timestamps given as Unix epoch seconds in a time zone, e.g. a
+    slice of `SimulationCalendar.step_epochs`. ColumnarDataLogger stores the
+    epochs as they are, without building a datetime per row; DataLogger
+    converts them into aware datetimes.
+    """
+    def __init__(self, epochs, tz):
+        """
+        Initializes the Timestamps.
+
+        Args:
+            epochs (array-like): The Unix epoch seconds of each row.
+            tz (tzinfo): The time zone the timestamps are shown in.
+        """
+        self.epochs = np.asarray(epochs, dtype=np.int64)
+        self.tz = tz
+
+    def __len__(self) -> int:
+        return len(self.epochs)
+
+    def to_datetimes(self) -> List[datetime]:
+        """Returns the timestamps as aware datetimes in the time zone."""
+        return [datetime.fromtimestamp(epoch, self.tz) for epoch in self.epochs.tolist()]
+
 
 class DataLogger:
     """
@@ -19,7 +53,35 @@ class DataLogger:
         """
         self._log_entries.append(kwargs)
 
-    def get_dataframe(self) -> pd.DataFrame:
+    def log_columns(self, **columns):
+        """
+        Logs several steps at once, given as equally long columns.
+
+        Args:
+            **columns: Column name to array-like of values. Scalars are
+                       repeated for every row.
+        """
+        num_rows = _num_rows(columns)
+        names = list(columns)
+        values = [
+            v.to_datetimes() if isinstance(v, Timestamps)
+            else np.asarray(v).tolist() if _is_array_like(v) else [v] * num_rows
+            for v in columns.values()
+        ]
+        for row in zip(*values):
+            self._log_entries.append(dict(zip(names, row)))
+
+    def merge(self, other: "DataLogger"):
+        """
+        Appends all entries collected by another DataLogger, e.g. one filled
+        by a worker process, preserving their order.
+        """
+        self._log_entries.extend(other._log_entries)
+
+    def end_run(self):
+        """Marks the end of a simulation run. In-memory loggers have nothing to do."""
+
+    def get_dataframe(self) -> "pd.DataFrame":
         """
         Converts all logged entries into a single pandas DataFrame.
 
@@ -27,7 +89,480 @@ class DataLogger:
             pd.DataFrame: A DataFrame containing all the simulation data,
                           ready for analysis or export.
         """
+        import pandas as pd
         if not self._log_entries:
             return pd.DataFrame() # Return an empty DataFrame if no data was logged
 
-        return pd.DataFrame(self._log_entries)
\ No newline at end of file
+        return pd.DataFrame(self._log_entries)
+
+
+class ColumnarDataLogger:
+    """
+    Collects simulation data into typed NumPy column buffers instead of one
+    dictionary per step.
+
+    The schema is taken from the first logged step: floats and integers are
+    stored as float64/int64, strings as int32 category codes, and datetimes
+    as int64 microseconds since the Unix epoch. Buffers grow in chunks, and
+    `get_dataframe` wraps them without copying the numeric data.
+    """
+    def __init__(self, chunk_rows: int = 65536):
+        """
+        Initializes an empty ColumnarDataLogger.
+
+        Args:
+            chunk_rows (int): The initial buffer size in rows. Buffers double
+                              in size whenever they fill up.
+        """
+        self._chunk_rows = chunk_rows
+        self._size = 0
+        self._capacity = 0
+        self._kinds: Dict[str, str] = {}
+        self._buffers: Dict[str, Any] = {}
+        self._category_codes: Dict[str, Dict[str, int]] = {}
+        self._timezones: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        """Returns the number of logged rows."""
+        return self._size
+
+    def _init_schema(self, sample: Dict[str, Any]):
+        """Derives the column kinds from one row of values."""
+        for name, value in sample.items():
+            if isinstance(value, (bool, np.bool_)):
+                kind = 'bool'
+            elif isinstance(value, (int, np.integer)):
+                kind = 'int'
+            elif isinstance(value, (float, np.floating)):
+                kind = 'float'
+            elif isinstance(value, str):
+                kind = 'category'
+                self._category_codes[name] = {}
+            elif isinstance(value, datetime):
+                kind = 'datetime'
+                self._timezones[name] = value.tzinfo
+            elif isinstance(value, Timestamps):
+                kind = 'datetime'
+                self._timezones[name] = value.tz
+            else:
+                kind = 'object'
+            self._kinds[name] = kind
+            self._buffers[name] = [] if kind == 'object' else np.empty(0, dtype=_KIND_DTYPES[kind])
+
+    def _reserve(self, num_rows: int):
+        """Grows every buffer so that `num_rows` more rows fit."""
+        needed = self._size + num_rows
+        if needed <= self._capacity:
+            return
+        capacity = max(self._capacity, self._chunk_rows)
+        while capacity < needed:
+            capacity *= 2
+        for name, kind in self._kinds.items():
+            if kind != 'object':
+                buffer = np.empty(capacity, dtype=_KIND_DTYPES[kind])
+                buffer[:self._size] = self._buffers[name][:self._size]
+                self._buffers[name] = buffer
+        self._capacity = capacity
+
+    def _check_schema(self, names):
+        """Ensures a logged step carries exactly the known columns."""
+        if not self._kinds:
+            return False
+        if names != self._kinds.keys():
+            raise ValueError(
+                f"Logged columns {sorted(names)} do not match the logger's columns {sorted(self._kinds)}"
+            )
+        return True
+
+    def _promote_to_float(self, name: str):
+        """Turns an integer column into a float column once a float arrives."""
+        self._kinds[name] = 'float'
+        self._buffers[name] = self._buffers[name].astype(np.float64)
+
+    def _encode(self, name: str, value):
+        """Converts one value into its stored representation."""
+        kind = self._kinds[name]
+        if kind == 'category':
+            codes = self._category_codes[name]
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(codes)
+            return code
+        if kind == 'datetime':
+            return _epoch_microseconds(value)
+        if kind == 'int' and isinstance(value, (float, np.floating)):
+            self._promote_to_float(name)
+        return value
+
+    def log_step(self, **kwargs):
+        """
+        Logs the data of a single simulation step.
+
+        Args:
+            **kwargs: Column name to value. Every step must log the same columns.
+        """
+        if not self._check_schema(kwargs.keys()):
+            self._init_schema(kwargs)
+        self._reserve(1)
+        row = self._size
+        for name, value in kwargs.items():
+            encoded = self._encode(name, value)
+            if self._kinds[name] == 'object':
+                self._buffers[name].append(encoded)
+            else:
+                self._buffers[name][row] = encoded
+        self._size += 1
+
+    def log_columns(self, **columns):
+        """
+        Logs several steps at once, given as equally long columns.
+
+        Args:
+            **columns: Column name to array-like of values. Scalars are
+                       repeated for every row.
+        """
+        num_rows = _num_rows(columns)
+        if num_rows == 0:
+            return
+        if not self._check_schema(columns.keys()):
+            self._init_schema({
+                name: (v[0] if _is_array_like(v) and not isinstance(v, Timestamps) else v)
+                for name, v in columns.items()
+            })
+        self._reserve(num_rows)
+        start, end = self._size, self._size + num_rows
+        for name, values in columns.items():
+            kind = self._kinds[name]
+            if not _is_array_like(values):
+                values = self._encode(name, values)
+                if self._kinds[name] == 'object':
+                    self._buffers[name].extend([values] * num_rows)
+                else:
+                    self._buffers[name][start:end] = values
+                continue
+            if isinstance(values, Timestamps):
+                values = values.epochs * 1_000_000
+            elif kind in ('category', 'datetime'):
+                values = [self._encode(name, v) for v in values]
+            elif kind == 'int' and np.asarray(values).dtype.kind == 'f':
+                self._promote_to_float(name)
+            if kind == 'object':
+                self._buffers[name].extend(values)
+            else:
+                self._buffers[name][start:end] = values
+        self._size = end
+
+    def merge(self, other: "ColumnarDataLogger"):
+        """
+        Appends all rows collected by another ColumnarDataLogger, e.g. one
+        filled by a worker process, preserving their order.
+        """
+        if len(other) == 0:
+            return
+        if not self._check_schema(other._kinds.keys()):
+            # Adopt the other logger's schema
+            self._kinds = dict(other._kinds)
+            self._category_codes = {name: {} for name in other._category_codes}
+            self._timezones = dict(other._timezones)
+            self._buffers = {
+                name: [] if kind == 'object' else np.empty(0, dtype=_KIND_DTYPES[kind])
+                for name, kind in self._kinds.items()
+            }
+
+        for name, kind in other._kinds.items():
+            if kind == 'float' and self._kinds[name] == 'int':
+                self._promote_to_float(name)
+
+        self._reserve(len(other))
+        start, end = self._size, self._size + len(other)
+        for name, kind in self._kinds.items():
+            values = other._buffers[name][:len(other)]
+            if kind == 'category':
+                # Translate the other logger's codes into this logger's codes
+                remap = np.array(
+                    [self._encode(name, value) for value in other._category_codes[name]], dtype=np.int32
+                )
+                values = remap[values]
+            if kind == 'object':
+                self._buffers[name].extend(values)
+            else:
+                self._buffers[name][start:end] = values
+        self._size = end
+
+    def end_run(self):
+        """Marks the end of a simulation run. In-memory loggers have nothing to do."""
+
+    def get_dataframe(self) -> "pd.DataFrame":
+        """
+        Builds a pandas DataFrame on top of the column buffers.
+
+        Returns:
+            pd.DataFrame: A DataFrame containing all the simulation data. String
+                          columns are categorical and datetime columns are
+                          time-zone aware in the zone of the first logged value.
+        """
+        import pandas as pd
+        if self._size == 0:
+            return pd.DataFrame() # Return an empty DataFrame if no data was logged
+
+        data = {}
+        for name, kind in self._kinds.items():
+            values = self._buffers[name][:self._size]
+            if kind == 'category':
+                data[name] = pd.Categorical.from_codes(values, categories=list(self._category_codes[name]))
+            elif kind == 'datetime':
+                stamps = pd.DatetimeIndex(values.view('datetime64[us]'))
+                tz = self._timezones[name]
+                data[name] = stamps.tz_localize('UTC').tz_convert(tz) if tz is not None else stamps
+            else:
+                data[name] = values
+        return pd.DataFrame(data, copy=False)
+
+
+class StreamingDataLogger(ColumnarDataLogger):
+    """
+    A ColumnarDataLogger that streams its rows to a Parquet or Arrow IPC file
+    instead of holding the whole simulation in memory.
+
+    Rows are buffered in the column buffers and written out as one row group
+    (Parquet) or record batch (Arrow) every `flush_rows` rows and at the end
+    of every run, so memory stays flat as `--runs` and `--years` grow. A
+    Parquet file is only readable once `close` has written its footer; an
+    Arrow IPC stream stays readable up to the last flushed batch even if the
+    process is killed.
+
+    Requires the optional `pyarrow` dependency.
+    """
+    # Pool workers collect a run in memory and the parent streams it out
+    worker_logger_class = ColumnarDataLogger
+
+    def __init__(self, path: str, file_format: str | None = None, flush_rows: int = 100_000):
+        """
+        Initializes the StreamingDataLogger.
+
+        Args:
+            path (str): The output file path.
+            file_format (str, optional): 'parquet' or 'arrow'. Derived from the
+                                         file extension if omitted.
+            flush_rows (int): The number of buffered rows that triggers a write.
+        """
+        super().__init__(chunk_rows=min(flush_rows, 65536))
+        self.path = path
+        self.file_format = file_format or output_format(path)
+        if self.file_format not in STREAMING_FORMATS:
+            raise ValueError(f"Unsupported streaming format: '{self.file_format}'")
+        self._flush_rows = flush_rows
+        self._writer = None
+        self._sink = None
+        self._schema = None
+        self.rows_written = 0
+
+    def log_step(self, **kwargs):
+        """Logs the data of a single step, flushing once enough rows are buffered."""
+        super().log_step(**kwargs)
+        if self._size >= self._flush_rows:
+            self.flush()
+
+    def log_columns(self, **columns):
+        """Logs several steps at once, flushing once enough rows are buffered."""
+        super().log_columns(**columns)
+        if self._size >= self._flush_rows:
+            self.flush()
+
+    def merge(self, other: ColumnarDataLogger):
+        """Appends the rows of another logger, flushing once enough rows are buffered."""
+        super().merge(other)
+        if self._size >= self._flush_rows:
+            self.flush()
+
+    def end_run(self):
+        """Writes out the rows of the finished run."""
+        self.flush()
+
+    def _to_arrow_table(self):
+        """Converts the buffered rows into a pyarrow Table."""
+        import pyarrow as pa
+
+        arrays = {}
+        for name, kind in self._kinds.items():
+            values = self._buffers[name][:self._size]
+            if kind == 'category':
+                arrays[name] = pa.DictionaryArray.from_arrays(
+                    pa.array(values, type=pa.int32()),
+                    pa.array(list(self._category_codes[name]), type=pa.string())
+                )
+            elif kind == 'datetime':
+                arrays[name] = pa.array(values, type=pa.timestamp('us', tz=_tz_name(self._timezones[name])))
+            else:
+                arrays[name] = pa.array(values)
+        return pa.table(arrays)
+
+    def flush(self):
+        """Writes all buffered rows to the output file and empties the buffers."""
+        if self._size == 0:
+            return
+        table = self._to_arrow_table()
+        if self._writer is None:
+            self._open_writer(table.schema)
+        elif not table.schema.equals(self._schema):
+            self._rewrite_with_schema(table.schema)
+
+        self._writer.write_table(table)
+        self.rows_written += self._size
+        self._size = 0
+
+    def _open_writer(self, schema):
+        """Creates the output file for rows of the given schema."""
+        import pyarrow as pa
+
+        self._schema = schema
+        if self.file_format == 'parquet':
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(self.path, schema)
+        else:
+            self._sink = pa.OSFile(self.path, 'wb')
+            self._writer = pa.ipc.new_stream(self._sink, schema)
+
+    def _close_writer(self):
+        """Finalizes the output file written so far."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def _rewrite_with_schema(self, schema):
+        """
+        Rewrites the rows written so far with the column types of `schema`,
+        after integer columns were promoted to float. The written rows are
+        moved aside and streamed back one row group (or record batch) at a
+        time, so memory stays flat.
+
+        Raises:
+            ValueError: If the columns changed in any other way.
+        """
+        import pyarrow as pa
+
+        promoted = len(schema) == len(self._schema) and all(
+            new.name == old.name and (
+                new.type.equals(old.type) or (pa.types.is_int64(old.type) and pa.types.is_float64(new.type))
+            )
+            for old, new in zip(self._schema, schema)
+        )
+        if not promoted:
+            raise ValueError(
+                f"Column types changed after rows were written to {self.path}: "
+                f"{schema} != {self._schema}"
+            )
+        self._close_writer()
+        written_path = f"{self.path}.{os.getpid()}.tmp"
+        os.replace(self.path, written_path)
+        try:
+            self._open_writer(schema)
+            for table in _read_tables(written_path, self.file_format):
+                self._writer.write_table(table.cast(schema))
+        finally:
+            os.remove(written_path)
+
+    def close(self):
+        """Flushes the remaining rows and finalizes the output file."""
+        self.flush()
+        self._close_writer()
+
+    def __len__(self) -> int:
+        """Returns the number of rows logged so far, written or buffered."""
+        return self.rows_written + self._size
+
+    def get_dataframe(self) -> "pd.DataFrame":
+        """
+        Closes the output file and reads it back into a DataFrame.
+
+        Returns:
+            pd.DataFrame: All rows written by this logger.
+        """
+        self.close()
+        if self.rows_written == 0:
+            import pandas as pd
+            return pd.DataFrame()
+        return read_output(self.path)
+
+STREAMING_FORMATS = ('parquet', 'arrow')
+
+def output_format(path: str) -> str:
+    """Derives the output file format ('csv', 'parquet' or 'arrow') from a path."""
+    extension = path.rsplit('.', 1)[-1].lower() if '.' in path else ''
+    if extension in ('parquet', 'pq'):
+        return 'parquet'
+    if extension in ('arrow', 'arrows', 'ipc'):
+        return 'arrow'
+    return 'csv'
+
+def read_output(path: str) -> "pd.DataFrame":
+    """Reads a simulation output file written in any supported format."""
+    import pandas as pd
+    file_format = output_format(path)
+    if file_format == 'parquet':
+        return pd.read_parquet(path)
+    if file_format == 'arrow':
+        import pyarrow as pa
+        with pa.OSFile(path, 'rb') as source:
+            return pa.ipc.open_stream(source).read_all().to_pandas()
+    return pd.read_csv(path)
+
+def _read_tables(path: str, file_format: str):
+    """Yields the row groups of a Parquet file or the record batches of an Arrow stream as Tables."""
+    import pyarrow as pa
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+        with pq.ParquetFile(path) as parquet_file:
+            for index in range(parquet_file.num_row_groups):
+                yield parquet_file.read_row_group(index)
+    else:
+        with pa.OSFile(path, 'rb') as source:
+            for batch in pa.ipc.open_stream(source):
+                yield pa.Table.from_batches([batch])
+
+def _tz_name(tz) -> str | None:
+    """Returns the Arrow time zone name of a tzinfo."""
+    if tz is None:
+        return None
+    key = getattr(tz, 'key', None)
+    if key is not None:
+        return key
+    offset = tz.utcoffset(None)
+    if not offset:
+        return 'UTC'
+    sign = '-' if offset < timedelta(0) else '+'
+    minutes = abs(int(offset.total_seconds())) // 60
+    return f"{sign}{minutes // 60:02d}:{minutes % 60:02d}"
+
+_KIND_DTYPES = {
+    'bool': np.bool_,
+    'int': np.int64,
+    'float': np.float64,
+    'category': np.int32,
+    'datetime': np.int64,
+}
+
+LOG_BACKENDS = {
+    'records': DataLogger,
+    'columnar': ColumnarDataLogger,
+}
+
+def _is_array_like(value) -> bool:
+    """Checks whether a logged column value holds one entry per row."""
+    return isinstance(value, (list, tuple, np.ndarray, Timestamps))
+
+def _num_rows(columns: Dict[str, Any]) -> int:
+    """Returns the common length of the array-like columns."""
+    lengths = {len(v) for v in columns.values() if _is_array_like(v)}
+    if len(lengths) > 1:
+        raise ValueError(f"Logged columns have different lengths: {sorted(lengths)}")
+    return lengths.pop() if lengths else 1
+
+def _epoch_microseconds(value: datetime) -> int:
+    """Converts a datetime into microseconds since the Unix epoch (naive as UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _UNIX_EPOCH) // _MICROSECOND
@@ -0,0 +1,108 @@
+import numpy as np
+from .agents.baseline_agent import DumbAgent
+
+class BatchInference:
+    """
+    Selects the charger power of a whole (runs, agents) bank of batteries with
+    one policy call per model and step.
+
+    Batteries whose agents share a model object are queried together: their
+    observations are stacked into a single (n, 2) batch, the policy is called
+    once and the resulting actions are spread back over the bank.
+
+    For a grid sweep, the rows of the bank belong to grid points with their
+    own power levels, charge speed and SOC target; actions are then mapped
+    to power with the parameters of each row's grid point.
+    """
+    def __init__(self, agents_to_run: dict, config, grid=None, num_runs: int = None):
+        """
+        Initializes the BatchInference.
+
+        Args:
+            agents_to_run (dict): Agent name -> agent, in the column order of the bank.
+            config (dict): The simulation configuration.
+            grid (ParameterGrid, optional): The grid points of a point-major bank.
+            num_runs (int, optional): The number of bank rows per grid point.
+                                      Required with a grid.
+        """
+        self.power_levels = list(config['charger_power_levels'])
+        self.soc_target = config['soc_target']
+        points = grid.points if grid is not None else [config]
+        self._runs_per_point = num_runs if grid is not None else None
+
+        # Per grid point: the power levels (padded with idle), their number,
+        # the idle action, the charge speed and the SOC target
+        self._point_levels = [list(point['charger_power_levels']) for point in points]
+        width = max(len(levels) for levels in self._point_levels)
+        self._level_table = np.zeros((len(points), width), dtype=np.float64)
+        for p, levels in enumerate(self._point_levels):
+            self._level_table[p, :len(levels)] = levels
+        self._num_levels = np.array([len(levels) for levels in self._point_levels], dtype=np.int64)
+        self._idle_index = np.array(
+            [levels.index(0) if 0 in levels else 0 for levels in self._point_levels], dtype=np.int64
+        )
+        self._max_charge_speed = np.array([point['max_charge_speed'] for point in points], dtype=np.float64)
+        self._soc_targets = [point['soc_target'] for point in points]
+
+        # Group the bank's columns by model object
+        groups = {}
+        for column, agent in enumerate(agents_to_run.values()):
+            groups.setdefault(id(agent), (agent, []))[1].append(column)
+        self.groups = [(agent, np.array(columns)) for agent, columns in groups.values()]
+
+    def predict_actions(self, agent, obs: np.ndarray, points: np.ndarray = None) -> np.ndarray:
+        """
+        Returns the action index chosen by `agent` for each row of `obs`.
+
+        Args:
+            agent: The agent to query.
+            obs (np.ndarray): The (n, 2) array of [soc, step] observations.
+            points (np.ndarray, optional): The grid point of each observation.
+        """
+        if not isinstance(agent, DumbAgent):
+            actions, _ = agent.predict(obs)
+            return np.asarray(actions, dtype=np.int64).reshape(len(obs))
+        if points is None:
+            return agent.predict_batch(obs, self.power_levels, self.soc_target).astype(np.int64)
+
+        # The baseline's actions depend on the power levels and SOC target
+        actions = np.empty(len(obs), dtype=np.int64)
+        for p in np.unique(points).tolist():
+            rows = points == p
+            actions[rows] = agent.predict_batch(obs[rows], self._point_levels[p], self._soc_targets[p])
+        return actions
+
+    def select_power(self, soc: np.ndarray, step: int, active_runs: np.ndarray) -> np.ndarray:
+        """
+        Asks every agent for its actions and converts them into charger power.
+
+        Args:
+            soc (np.ndarray): The (runs, agents) SOC array of the bank.
+            step (int): The 15-minute step of the day.
+            active_runs (np.ndarray): The indices of the runs that are in their
+                                      charging window at this step.
+
+        Returns:
+            np.ndarray: The (runs, agents) power array in kW; zero for inactive runs.
+        """
+        power_kw = np.zeros(soc.shape, dtype=np.float64)
+        if len(active_runs) == 0:
+            return power_kw
+
+        if self._runs_per_point is None:
+            run_points = np.zeros(len(active_runs), dtype=np.int64)
+        else:
+            run_points = active_runs // self._runs_per_point
+
+        for agent, columns in self.groups:
+            group_soc = soc[np.ix_(active_runs, columns)]
+            obs = np.empty((group_soc.size, 2), dtype=np.float32)
+            obs[:, 0] = group_soc.ravel()
+            obs[:, 1] = step
+            points = np.repeat(run_points, len(columns))
+
+            actions = self.predict_actions(agent, obs, points if self._runs_per_point is not None else None)
+            actions = np.where(actions >= self._num_levels[points], self._idle_index[points], actions)
+            group_power = np.minimum(self._level_table[points, actions], self._max_charge_speed[points])
+            power_kw[np.ix_(active_runs, columns)] = group_power.reshape(group_soc.shape)
+        return power_kw
@@ -1,166 +1,986 @@
+import contextlib
 import os
 import random
-import pandas as pd
+import sys
+from time import perf_counter
 import numpy as np
-from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
 
 # Import all our components
-from .cli_parser import parse_args
+from .cli_parser import parse_args, parse_merge_args
 from .config_manager import ConfigManager, AgentConfig, ScenarioConfig
-from .agent_loader import load_agent
-from .data_logger import DataLogger
-from .core.battery import Battery
-from .core.price_model import PriceModel
+from .agent_loader import export_agent, load_policy
+from .agents.baseline_agent import DumbAgent
+from .agents.tabular_policy import TabularPolicy
+from .data_logger import LOG_BACKENDS, StreamingDataLogger, Timestamps, output_format
+from .inference import BatchInference
+from .metrics import MetricsAccumulator
+from .checkpoint import CHECKPOINT_BATCH_RUNS, RunCheckpoint, checkpoint_dir, config_hash, load_manifest
+from .convergence import ConvergenceMonitor
+from .parallel import run_parallel, worker_pool
+from .profiling import Profiler
+from .recording import TrajectoryRecorder
+from .sharding import merge_shards, parse_shard, shard_run_ids, write_shard_manifest
+from .step_kernel import StepKernel
+from .sweep import ParameterGrid
+from .trajectory_cache import DayTrajectoryCache, DayTrajectoryTable
+from .core.battery import Battery, BatteryBank
+from .core.price_model import compile_price_cache, load_price_model
 from .core.degradation_model import DegradationModel
 from .core.cost_calculator import CostCalculator
 from .core.simulation_engine import SimulationEngine
+from .core.batch_engine import BatchSimulationEngine
+from .core.simulation_calendar import SimulationCalendar
 
-class DumbAgent:
-    """A simple baseline agent that charges at max power if below target SOC."""
-    def predict(self, obs, power_levels: list, target_soc: float, deterministic=True):
-        soc = obs[0]
-        max_power = max(power_levels)
-        max_power_index = power_levels.index(max_power)
-        idle_power_index = power_levels.index(0) if 0 in power_levels else 0
-        action_index = max_power_index if soc < target_soc else idle_power_index
-        return (action_index, None)
-
-def run_simulation_run(config, agents_to_run: dict, logger, engine_override=None):
-    """Executes a single, full simulation run for multiple agents."""
+def _select_power(agent, soc: float, step: int, config) -> float:
+    """Asks an agent for its action and converts it into the charger power in kW."""
+    obs = np.array([soc, step], dtype=np.float32)
+
+    if isinstance(agent, DumbAgent):
+        action_index, _ = agent.predict(obs, config['charger_power_levels'], config['soc_target'])
+    else:
+        action_index, _ = agent.predict(obs)
+
+    if action_index >= len(config['charger_power_levels']):
+        action_index = config['charger_power_levels'].index(0) if 0 in config['charger_power_levels'] else 0
+
+    power_kw = config['charger_power_levels'][action_index]
+    return min(power_kw, config['max_charge_speed'])
+
+def _build_cost_calculator(config, price_model, grid=None) -> CostCalculator:
+    """
+    Creates a CostCalculator with cost tables compiled for the configured
+    charger, or for the power levels of every point of a sweep grid.
+    """
+    if grid is not None:
+        power_levels = grid.capped_power_levels()
+        battery_capacity = grid.points[0]['battery_capacity']
+    else:
+        power_levels = [min(p, config['max_charge_speed']) for p in config['charger_power_levels']]
+        battery_capacity = config['battery_capacity']
+    return CostCalculator(
+        price_model, DegradationModel(),
+        power_levels=power_levels, battery_capacity_kwh=battery_capacity
+    )
+
+def run_seed(seed: int, run_id: int) -> int:
+    """Derives the seed of a single run's RNG from the global seed and the run_id."""
+    return int(np.random.SeedSequence(seed, spawn_key=(run_id,)).generate_state(1)[0])
+
+def make_run_rng(seed: int, run_id: int) -> random.Random:
+    """
+    Creates the random number generator of a single run.
+
+    The stream depends only on the global seed and the run_id, so a run draws
+    the same scenarios no matter which process or in which order it executes.
+    """
+    return random.Random(run_seed(seed, run_id))
+
+def _run_rng(config, run_id: int):
+    """Returns the RNG for a run: a derived stream if seeded, else the global one."""
+    if config.get('seed') is None:
+        return random
+    return make_run_rng(config['seed'], run_id)
+
+def run_simulation_run(
+    config, agents_to_run: dict, logger, engine_override=None, price_model=None, calendar=None,
+    profiler=None, recorder=None
+):
+    """
+    Executes a single, full simulation run for multiple agents.
+
+    A prebuilt `price_model` can be passed to skip reading `config['price_path']`;
+    otherwise the model is taken from the process-wide price model cache.
+    A prebuilt `calendar` for the same horizon and scenarios can be shared
+    between runs; otherwise one is computed for this run.
+
+    `config['log_level']` selects whether one row is logged per agent per
+    step (default), per day or per run. Agents that declare `is_deterministic`
+    are simulated once per scenario; later days replay their trajectory.
+
+    If a `profiler` is given, the time spent in each phase of the loop and the
+    run's throughput are recorded on it. A `recorder` (TrajectoryRecorder)
+    receives the power and SOC of every step.
+
+    Returns:
+        dict: agent name -> summary of the run (see MetricsAccumulator.summaries).
+    """
+    profiling = profiler is not None
+    if profiling:
+        run_started = t = perf_counter()
+        rows_logged = 0
+    recording = recorder is not None
     
     batteries = {name: Battery(config['battery_capacity']) for name in agents_to_run}
     engines = {}
-    
-    latvia_tz = ZoneInfo("Europe/Riga")
+    cost_calculator = None
 
     if engine_override:
         engines = {name: engine_override for name in agents_to_run}
     else:
-        with open(config['price_path'], 'r') as f:
-            price_csv_data = f.read()
-        price_model = PriceModel(price_csv_data)
-        degradation_model = DegradationModel()
-        cost_calculator = CostCalculator(price_model, degradation_model)
+        if price_model is None:
+            price_model = load_price_model(config['price_path'])
+        cost_calculator = _build_cost_calculator(config, price_model)
         for name, battery in batteries.items():
             engines[name] = SimulationEngine(battery, cost_calculator, 8000)
 
     num_days = int(config['years'] * 365)
     scenarios = config['scenarios']
-    scenario_choices = [s for s in scenarios]
+    scenario_indices = range(len(scenarios))
     scenario_probabilities = [s.probability for s in scenarios]
+
+    if calendar is None:
+        calendar = SimulationCalendar(num_days, scenarios, price_model)
+    step_hours = calendar.step_hours.tolist()
     
     kwh_charged = {name: 0 for name in agents_to_run}
     cycle_counts = {name: 1 for name in agents_to_run}
+    rng = _run_rng(config, config['run_id'])
+
+    log_level = config.get('log_level', 'step')
+    metrics = MetricsAccumulator([config['run_id']], list(agents_to_run), config['soc_target'])
+
+    # Deterministic agents repeat the same day for the same scenario; replay their
+    # cached trajectories against each day's prices instead of re-simulating
+    trajectories = None
+    if engine_override is None and calendar.hourly_prices is not None:
+        trajectories = DayTrajectoryCache(config, cost_calculator, 8000)
+    memoized = {
+        name: trajectories is not None and trajectories.is_cacheable(agent)
+        for name, agent in agents_to_run.items()
+    }
+    replay_whole_days = log_level != 'step' and all(memoized.values())
+
+    # Baseline and table-based agents can run whole years in the compiled kernel
+    kernel = None
+    if replay_whole_days and not recording and config.get('jit', True):
+        kernel = StepKernel(config, cost_calculator, 8000)
+        if not kernel.applies_to(agents_to_run.values()):
+            kernel = None
+    if profiling:
+        t = profiler.lap('setup', t)
 
-    for day in range(num_days):
-        daily_scenario = random.choices(scenario_choices, scenario_probabilities)[0]
+    days_to_simulate = range(num_days)
+    if kernel is not None:
+        day_scenarios = np.array(
+            [rng.choices(scenario_indices, scenario_probabilities)[0] for _ in range(num_days)], dtype=np.int64
+        )
+        _run_kernel(
+            [kernel], agents_to_run, calendar, scenarios, day_scenarios[None], metrics,
+            logger if log_level == 'day' else None
+        )
+        days_to_simulate = range(0)
+        if profiling:
+            t = profiler.lap('kernel', t)
+            rows_logged += num_days * len(agents_to_run) if log_level == 'day' else 0
+
+    for day in days_to_simulate:
+        scenario_index = rng.choices(scenario_indices, scenario_probabilities)[0]
+        daily_scenario = scenarios[scenario_index]
+        day_prices = calendar.day_prices(day)
+        window_steps = calendar.window_steps[scenario_index]
         
         for battery in batteries.values():
             battery.soc = config['start_soc']
+        if profiling:
+            t = profiler.lap('day_setup', t)
+
+        day_trajectories = {
+            name: trajectories.get(agent, scenario_index, window_steps, config['start_soc'])
+            for name, agent in agents_to_run.items() if memoized[name]
+        }
+        if profiling:
+            t = profiler.lap('trajectory_cache', t)
+
+        if replay_whole_days:
+            step_prices = calendar.hourly_prices[day, calendar.step_hours[window_steps]]
+            if np.isnan(step_prices).any():
+                missing = window_steps[int(np.flatnonzero(np.isnan(step_prices))[0])]
+                raise ValueError(f"Price not found for timestamp: {calendar.timestamp(day, missing)}")
+            for agent_index, name in enumerate(agents_to_run):
+                trajectory = day_trajectories[name]
+                battery = batteries[name]
+                metrics.add_steps(0, agent_index, trajectory.day_costs(step_prices), trajectory.power_array, 0.25)
+                if recording:
+                    recorder.add_steps(
+                        config['run_id'], agent_index, day, window_steps, trajectory.power_array, trajectory.soc
+                    )
+                battery.soc = trajectory.final_soc
+                battery.soh = trajectory.final_soh(battery.soh)
+            window_steps = []
+            if profiling:
+                t = profiler.lap('day_replay', t)
         
-        for step in range(96):
-            timestamp = datetime(2025, 1, 1, tzinfo=latvia_tz) + timedelta(days=day, minutes=15*step)
-            current_hour = timestamp.hour
-
-            in_window = False
-            start, end = daily_scenario.start_hour, daily_scenario.end_hour
-            if start > end:
-                if current_hour >= start or current_hour < end: in_window = True
-            else:
-                if start <= current_hour < end: in_window = True
-
-            if in_window:
-                for name, agent in agents_to_run.items():
-                    battery = batteries[name]
-                    engine = engines[name]
-                    
-                    obs = np.array([battery.soc, step], dtype=np.float32)
-                    
-                    if isinstance(agent, DumbAgent):
-                        action_index, _ = agent.predict(obs, config['charger_power_levels'], config['soc_target'])
-                    else:
-                        action_index, _ = agent.predict(obs)
-
-                    if action_index >= len(config['charger_power_levels']):
-                        action_index = config['charger_power_levels'].index(0) if 0 in config['charger_power_levels'] else 0
-                    
-                    power_kw = config['charger_power_levels'][action_index]
-                    power_kw = min(power_kw, config['max_charge_speed'])
-
-                    results = engine.run_step(power_kw, 0.25, timestamp, cycle_counts[name])
-                    
-                    # **FIX: Log every step directly and explicitly**
-                    soc_fulfillment = battery.soc / config['soc_target']
-                    logger.log_step(
-                        run_id=config['run_id'], day=day, timestamp=timestamp,
-                        agent_type=name, charging_scenario=daily_scenario.name,
-                        power_kw=power_kw,
-                        electricity_cost=results['costs']['electricity_cost'],
-                        calendar_cost=results['costs']['calendar_cost'],
-                        cyclic_cost=results['costs']['cyclic_cost'],
-                        total_cost=results['costs']['total_cost'],
-                        soc=results['final_soc'],
-                        soh=results['final_soh'],
-                        soc_fulfillment=soc_fulfillment
+        # Step rows are collected over the day and logged as columns at its end
+        step_rows = []
+        for step_position, step in enumerate(window_steps):
+            price = day_prices[step_hours[step]]
+            # A datetime is only needed to look up or report a missing price
+            timestamp = calendar.timestamp(day, step) if price is None else None
+            if profiling:
+                t = profiler.lap('price_lookup', t)
+
+            for agent_index, (name, agent) in enumerate(agents_to_run.items()):
+                battery = batteries[name]
+                engine = engines[name]
+                
+                trajectory = day_trajectories.get(name)
+                if trajectory is None:
+                    power_kw = _select_power(agent, battery.soc, step, config)
+                    if profiling:
+                        t = profiler.lap('inference', t)
+                    results = engine.run_step(power_kw, 0.25, timestamp, cycle_counts[name], price=price)
+                    if profiling:
+                        t = profiler.lap('costs', t)
+                else:
+                    power_kw, results = trajectory.replay_step(step_position, price, timestamp, battery)
+                    if profiling:
+                        t = profiler.lap('step_replay', t)
+                metrics.add_step(0, agent_index, results['costs'], power_kw, 0.25)
+                if profiling:
+                    t = profiler.lap('metrics', t)
+                if recording:
+                    recorder.add_step(config['run_id'], agent_index, day, step, power_kw, results['final_soc'])
+                
+                if log_level == 'step':
+                    costs = results['costs']
+                    step_rows.append((
+                        step, name, power_kw, costs['electricity_cost'], costs['calendar_cost'],
+                        costs['cyclic_cost'], costs['total_cost'], results['final_soc'], results['final_soh'],
+                        battery.soc / config['soc_target']
+                    ))
+                    if profiling:
+                        t = profiler.lap('logging', t)
+                
+                if power_kw > 0:
+                    kwh_charged[name] += power_kw * 0.25
+                if kwh_charged[name] >= config['battery_capacity']:
+                    cycle_counts[name] += 1
+                    kwh_charged[name] = 0
+
+        if step_rows:
+            (steps, names, power_kw, electricity_cost, calendar_cost, cyclic_cost, total_cost,
+             soc, soh, soc_fulfillment) = (list(column) for column in zip(*step_rows))
+            logger.log_columns(
+                run_id=config['run_id'], day=day,
+                timestamp=Timestamps(calendar.step_epochs[day, steps], calendar.tz),
+                agent_type=names, charging_scenario=daily_scenario.name,
+                power_kw=power_kw,
+                electricity_cost=electricity_cost,
+                calendar_cost=calendar_cost,
+                cyclic_cost=cyclic_cost,
+                total_cost=total_cost,
+                soc=soc,
+                soh=soh,
+                soc_fulfillment=soc_fulfillment
+            )
+            if profiling:
+                t = profiler.lap('logging', t)
+                rows_logged += len(step_rows)
+
+        metrics.end_day(
+            day, [b.soc for b in batteries.values()], [b.soh for b in batteries.values()],
+            [daily_scenario.name], logger if log_level == 'day' else None
+        )
+        if profiling:
+            t = profiler.lap('day_end', t)
+            rows_logged += len(agents_to_run) if log_level == 'day' else 0
+
+    if log_level == 'run':
+        metrics.log_runs(logger)
+    summaries = metrics.summaries()[config['run_id']]
+    if profiling:
+        profiler.lap('run_end', t)
+        rows_logged += len(agents_to_run) if log_level == 'run' else 0
+        profiler.add_rows(rows_logged)
+        steps = sum(summary['steps'] for summary in summaries.values())
+        profiler.record_run([config['run_id']], perf_counter() - run_started, steps, rows_logged)
+    return summaries
+
+def _run_kernel(
+    kernels: list, agents_to_run: dict, calendar: SimulationCalendar, scenarios: list,
+    day_scenarios: np.ndarray, metrics, logger=None
+):
+    """
+    Simulates every day of one or more runs in the compiled step kernel and
+    closes the days on the metrics accumulator.
+
+    Args:
+        kernels (list): The StepKernel of each of the accumulator's rows.
+        day_scenarios (np.ndarray): The (rows, days) scenario index of each row on each day.
+
+    Raises:
+        ValueError: If a step inside a charging window has no price.
+    """
+    step_prices = calendar.hourly_prices[:, calendar.step_hours]
+    _check_step_prices(calendar, day_scenarios)
+
+    results = [
+        [kernel.run(agent, row_scenarios, calendar.window_masks, step_prices) for agent in agents_to_run.values()]
+        for kernel, row_scenarios in zip(kernels, day_scenarios)
+    ]
+    day_totals = np.stack([np.stack([totals for totals, _, _ in row], axis=-1) for row in results], axis=2)
+    soc = np.stack([np.stack([soc for _, soc, _ in row], axis=-1) for row in results], axis=1)
+    soh = np.stack([np.stack([soh for _, _, soh in row], axis=-1) for row in results], axis=1)
+    scenario_names = [[scenarios[i].name for i in names] for names in day_scenarios.T.tolist()]
+    metrics.end_days(0, day_totals, soc, soh, scenario_names, logger)
+
+def _check_step_prices(calendar: SimulationCalendar, day_scenarios: np.ndarray):
+    """
+    Checks that every step inside the charging windows of the simulated days
+    has a price.
+
+    Args:
+        calendar (SimulationCalendar): The calendar holding the prices.
+        day_scenarios (np.ndarray): The (rows, days) scenario index of each row on each day.
+
+    Raises:
+        ValueError: If a step inside a charging window has no price.
+    """
+    num_days = day_scenarios.shape[1]
+    used_scenarios = np.zeros((num_days, len(calendar.window_masks)), dtype=bool)
+    used_scenarios[np.arange(num_days), day_scenarios] = True
+    day_windows = (used_scenarios[:, :, None] & calendar.window_masks).any(axis=1)
+    missing = np.argwhere(day_windows & np.isnan(calendar.hourly_prices[:num_days, calendar.step_hours]))
+    if len(missing):
+        day, step = missing[0].tolist()
+        raise ValueError(f"Price not found for timestamp: {calendar.timestamp(day, step)}")
+
+def _trajectory_table(
+    config, agents_to_run: dict, calendar: SimulationCalendar, cost_calculator: CostCalculator, grid=None
+) -> DayTrajectoryTable:
+    """Simulates the day trajectory of every grid point, scenario and agent once."""
+    points = grid.points if grid is not None else [{}]
+    trajectories = []
+    for point in points:
+        point_config = {**config, **point}
+        cache = DayTrajectoryCache(point_config, cost_calculator, 8000)
+        trajectories.append([
+            [cache.get(agent, s, steps, point_config['start_soc']) for agent in agents_to_run.values()]
+            for s, steps in enumerate(calendar.window_steps)
+        ])
+    return DayTrajectoryTable(trajectories, calendar.window_steps, calendar.STEPS_PER_DAY)
+
+def _log_batch_steps(
+    logger, calendar: SimulationCalendar, day: int, steps: np.ndarray, rows: np.ndarray, step_columns: dict,
+    agent_names: list, run_ids: np.ndarray, scenario_names: list, soc_target, grid=None, row_points=None
+):
+    """
+    Logs one day of step rows of a battery bank in a single call.
+
+    Args:
+        logger (DataLogger): The logger to receive the rows.
+        calendar (SimulationCalendar): The calendar of the simulation.
+        day (int): The index of the day.
+        steps (np.ndarray): The step of each entry, ordered by step, then by bank row.
+        rows (np.ndarray): The bank row of each entry.
+        step_columns (dict): Column name -> (entries, agents) values of the steps.
+        agent_names (list): The agent names of the bank's columns.
+        run_ids (np.ndarray): The run_id of each bank row.
+        scenario_names (list): The charging scenario of each bank row on the day.
+        soc_target (float | np.ndarray): The SOC target, or a (rows, 1) array of them.
+        grid (ParameterGrid, optional): The grid of a sweep.
+        row_points (np.ndarray, optional): The grid point of each bank row.
+    """
+    num_agents = len(agent_names)
+    grid_columns = grid.log_columns(row_points[rows].repeat(num_agents)) if grid is not None else {}
+    row_targets = soc_target[rows] if isinstance(soc_target, np.ndarray) else soc_target
+    logger.log_columns(
+        run_id=run_ids[rows].repeat(num_agents), **grid_columns,
+        day=day,
+        timestamp=Timestamps(calendar.step_epochs[day, steps].repeat(num_agents), calendar.tz),
+        agent_type=agent_names * len(rows),
+        charging_scenario=[scenario_names[row] for row in rows.tolist() for _ in agent_names],
+        **{name: values.ravel() for name, values in step_columns.items()},
+        soc_fulfillment=(step_columns['soc'] / row_targets).ravel()
+    )
+
+def run_simulation_batch(
+    config, agents_to_run: dict, logger, run_ids: list, price_model=None, calendar=None,
+    profiler=None, recorder=None
+):
+    """
+    Executes several simulation runs together, advancing the batteries of all
+    runs and agents as one bank of NumPy arrays.
+
+    Each run draws its daily scenarios in the same order as consecutive calls to
+    `run_simulation_run` would, so a seeded batch reproduces the serial results.
+    Step rows are logged day by day across runs rather than run by run, and each
+    model is queried once per step for all of the batteries that use it. If
+    every agent declares `is_deterministic`, each (grid point, scenario, agent)
+    day is simulated once and the days of the batch are replayed from those
+    trajectories; without step rows or a recording, baseline and table-based
+    agents run in the compiled step kernel instead, as in `run_simulation_run`.
+    A `profiler` and a `recorder` work as in `run_simulation_run`.
+
+    If the config holds a 'sweep' of parameter values, every run is simulated
+    at every point of the parameter grid (see ParameterGrid) within the same
+    bank, with the same daily scenarios at each point. The logged rows then
+    carry the grid point and the swept parameter values.
+
+    Returns:
+        dict: run_id -> agent name -> summary of the run. Keyed by
+              (grid point, run_id) for a sweep.
+    """
+    profiling = profiler is not None
+    if profiling:
+        run_started = t = perf_counter()
+        rows_logged = 0
+
+    agent_names = list(agents_to_run)
+    num_runs, num_agents = len(run_ids), len(agent_names)
+    grid = ParameterGrid(config) if config.get('sweep') else None
+    num_points = len(grid) if grid is not None else 1
+    # Bank rows are point-major: row p * num_runs + r is run r at grid point p
+    num_rows = num_points * num_runs
+    row_points = np.repeat(np.arange(num_points), num_runs)
+
+    if price_model is None:
+        price_model = load_price_model(config['price_path'])
+    cost_calculator = _build_cost_calculator(config, price_model, grid)
+    if grid is not None:
+        capacity = grid.row_values('battery_capacity', num_runs)
+        start_soc = grid.row_values('start_soc', num_runs)
+        soc_target = grid.row_values('soc_target', num_runs)
+    else:
+        capacity, start_soc, soc_target = config['battery_capacity'], config['start_soc'], config['soc_target']
+    bank = BatteryBank(capacity, (num_rows, num_agents))
+    engine = BatchSimulationEngine(bank, cost_calculator, 8000)
+
+    num_days = int(config['years'] * 365)
+    scenarios = config['scenarios']
+    scenario_probabilities = [s.probability for s in scenarios]
+
+    # Draw every run's scenario sequence up front, run by run
+    daily_scenarios = [
+        _run_rng(config, run_id).choices(range(len(scenarios)), scenario_probabilities, k=num_days)
+        for run_id in run_ids
+    ]
+    scenario_index = np.array(daily_scenarios, dtype=np.int64).reshape(num_runs, num_days)
+    scenario_index = np.tile(scenario_index, (num_points, 1))
+    scenario_names = [s.name for s in scenarios]
+    run_id_array = np.tile(np.asarray(run_ids), num_points)
+
+    if calendar is None:
+        calendar = SimulationCalendar(num_days, scenarios, price_model)
+    step_hours = calendar.step_hours.tolist()
+
+    log_level = config.get('log_level', 'step')
+    if grid is not None:
+        metrics = MetricsAccumulator(
+            run_id_array, agent_names, soc_target, row_columns=grid.log_columns(row_points),
+            row_keys=[(p, run_id) for p in range(num_points) for run_id in run_ids]
+        )
+    else:
+        metrics = MetricsAccumulator(run_ids, agent_names, soc_target)
+
+    # Deterministic agents repeat the same day for the same scenario and grid
+    # point; replay their cached trajectories instead of stepping the bank
+    table = kernels = None
+    if calendar.hourly_prices is not None and all(map(DayTrajectoryCache.is_cacheable, agents_to_run.values())):
+        # Without step rows, baseline and table-based agents run in the compiled kernel, row by row
+        if log_level != 'step' and recorder is None and config.get('jit', True):
+            points = grid.points if grid is not None else [{}]
+            point_kernels = [StepKernel({**config, **point}, cost_calculator, 8000) for point in points]
+            if all(kernel.applies_to(agents_to_run.values()) for kernel in point_kernels):
+                kernels = [point_kernels[p] for p in row_points.tolist()]
+        if kernels is None:
+            table = _trajectory_table(config, agents_to_run, calendar, cost_calculator, grid)
+            _check_step_prices(calendar, scenario_index)
+    elif grid is not None:
+        inference = BatchInference(agents_to_run, config, grid=grid, num_runs=num_runs)
+    else:
+        inference = BatchInference(agents_to_run, config)
+    if profiling:
+        t = profiler.lap('setup', t)
+
+    days_to_step = range(num_days)
+    if kernels is not None:
+        _run_kernel(
+            kernels, agents_to_run, calendar, scenarios, scenario_index, metrics,
+            logger if log_level == 'day' else None
+        )
+        days_to_step = range(0)
+        if profiling:
+            t = profiler.lap('kernel', t)
+            rows_logged += num_days * num_rows * num_agents if log_level == 'day' else 0
+    elif table is not None:
+        # Bound the (rows, agents, days, positions) arrays of a block of days to about 16 MiB
+        num_positions = table.soh_loss.shape[-1]
+        block_days = max(1, 2**21 // (max(num_rows, num_points * len(scenarios)) * num_agents * num_positions))
+        for first_day in range(0, num_days, block_days):
+            days = range(first_day, min(first_day + block_days, num_days))
+            block_scenarios = scenario_index[:, days.start:days.stop]
+            replay = table.replay_days(
+                calendar.hourly_prices[days.start:days.stop][:, calendar.step_hours], row_points, block_scenarios, bank.soh
+            )
+            bank.soc[:] = replay['soc'][-1]
+            bank.soh[:] = replay['soh'][-1]
+            metrics.end_days(
+                first_day, replay['day_totals'], replay['soc'], replay['soh'],
+                [[scenario_names[i] for i in day_scenarios] for day_scenarios in block_scenarios.T.tolist()],
+                logger if log_level == 'day' else None
+            )
+            if profiling:
+                t = profiler.lap('day_replay', t)
+                rows_logged += len(days) * num_rows * num_agents if log_level == 'day' else 0
+            if recorder is None and log_level != 'step':
+                continue
+
+            for position, day in enumerate(days):
+                day_scenarios = block_scenarios[:, position]
+                # Step rows in the order of the stepped loop: by step, then by bank row
+                steps, rows = np.nonzero(calendar.window_masks[day_scenarios].T)
+                step_columns = table.step_columns(replay, position, rows, row_points[rows], day_scenarios[rows], steps)
+                if recorder is not None:
+                    recorder.add_batch(run_id_array[rows], day, steps, step_columns['power_kw'], step_columns['soc'])
+                if log_level == 'step':
+                    _log_batch_steps(
+                        logger, calendar, day, steps, rows, step_columns, agent_names, run_id_array,
+                        [scenario_names[i] for i in day_scenarios], soc_target, grid, row_points
                     )
-                    
-                    if power_kw > 0:
-                        kwh_charged[name] += power_kw * 0.25
-                    if kwh_charged[name] >= config['battery_capacity']:
-                        cycle_counts[name] += 1
-                        kwh_charged[name] = 0
+                    if profiling:
+                        rows_logged += len(rows) * num_agents
+            if profiling:
+                t = profiler.lap('logging', t)
+        days_to_step = range(0)
+
+    for day in days_to_step:
+        day_scenarios = scenario_index[:, day]
+        day_windows = calendar.window_masks[day_scenarios]
+        day_prices = calendar.day_prices(day)
+        bank.soc[:] = start_soc
+        if profiling:
+            t = profiler.lap('day_setup', t)
+
+        step_log = []
+        for step in np.flatnonzero(day_windows.any(axis=0)).tolist():
+            runs_in_window = day_windows[:, step]
+            active_runs = np.flatnonzero(runs_in_window)
+            price = day_prices[step_hours[step]]
+            # A datetime is only needed to look up or report a missing price
+            timestamp = calendar.timestamp(day, step) if price is None else None
+            if profiling:
+                t = profiler.lap('price_lookup', t)
+            power_kw = inference.select_power(bank.soc, step, active_runs)
+            if profiling:
+                t = profiler.lap('inference', t)
+
+            active = np.broadcast_to(runs_in_window[:, None], (num_rows, num_agents))
+            results = engine.run_step(power_kw, 0.25, timestamp, active, price=price)
+            if profiling:
+                t = profiler.lap('costs', t)
+
+            costs = results['costs']
+            metrics.add_batch(costs, power_kw, 0.25, active)
+            if profiling:
+                t = profiler.lap('metrics', t)
+            if recorder is not None:
+                recorder.add_batch(
+                    run_id_array[active_runs], day, step, power_kw[active_runs], results['final_soc'][active_runs]
+                )
+            if log_level == 'step':
+                step_log.append((step, active_runs, {
+                    'power_kw': power_kw[active_runs],
+                    'electricity_cost': costs['electricity_cost'][active_runs],
+                    'calendar_cost': costs['calendar_cost'][active_runs],
+                    'cyclic_cost': costs['cyclic_cost'][active_runs],
+                    'total_cost': costs['total_cost'][active_runs],
+                    'soc': results['final_soc'][active_runs],
+                    'soh': results['final_soh'][active_runs],
+                }))
+
+        if step_log:
+            _log_batch_steps(
+                logger, calendar, day,
+                np.concatenate([np.full(len(active_runs), step) for step, active_runs, _ in step_log]),
+                np.concatenate([active_runs for _, active_runs, _ in step_log]),
+                {name: np.concatenate([columns[name] for _, _, columns in step_log]) for name in step_log[0][2]},
+                agent_names, run_id_array, [scenario_names[i] for i in day_scenarios], soc_target, grid, row_points
+            )
+            if profiling:
+                t = profiler.lap('logging', t)
+                rows_logged += sum(len(active_runs) for _, active_runs, _ in step_log) * num_agents
+
+        metrics.end_day(
+            day, bank.soc, bank.soh, [scenario_names[i] for i in day_scenarios],
+            logger if log_level == 'day' else None
+        )
+        if profiling:
+            t = profiler.lap('day_end', t)
+            rows_logged += num_rows * num_agents if log_level == 'day' else 0
+
+    if log_level == 'run':
+        metrics.log_runs(logger)
+    summaries = metrics.summaries()
+    if profiling:
+        profiler.lap('run_end', t)
+        rows_logged += num_rows * num_agents if log_level == 'run' else 0
+        profiler.add_rows(rows_logged)
+        steps = sum(summary['steps'] for run in summaries.values() for summary in run.values())
+        profiler.record_run(run_ids, perf_counter() - run_started, steps, rows_logged)
+    return summaries
+
+def build_agents(agent_configs: list) -> dict:
+    """Instantiates the agents described by a list of AgentConfig objects."""
+    agents_to_run = {}
+    models = {}
+    for agent_config in agent_configs:
+        if agent_config.path == 'baseline':
+            agents_to_run[agent_config.name] = DumbAgent()
+        else:
+            # Agents trained into the same file share one model, so that batched
+            # inference can query them together
+            if agent_config.path not in models:
+                models[agent_config.path] = load_policy(agent_config.path)
+            agents_to_run[agent_config.name] = models[agent_config.path]
+    return agents_to_run
+
+def check_agent_tables(agents_to_run: dict, base_config: dict):
+    """
+    Checks that every compiled action table among the agents was compiled for
+    the charger power levels and SOC target of the run configuration and of
+    each point of its sweep.
+
+    Raises:
+        ValueError: If a table was compiled for another configuration.
+    """
+    points = ParameterGrid(base_config).points
+    for name, agent in agents_to_run.items():
+        if not isinstance(agent, TabularPolicy):
+            continue
+        for point in points:
+            try:
+                agent.check_config(point['charger_power_levels'], point['soc_target'])
+            except ValueError as e:
+                raise ValueError(f"Agent '{name}': {e}")
+
+def build_base_config(raw_args, power_levels: list, scenarios: list, sweep: dict, seed: int) -> dict:
+    """Assembles the run configuration shared by all runs from the parsed command line."""
+    return {
+        'years': raw_args.years,
+        'battery_capacity': raw_args.battery_capacity,
+        'max_charge_speed': raw_args.max_charge_speed,
+        'start_soc': raw_args.start_soc,
+        'soc_target': raw_args.soc_target,
+        'charger_power_levels': power_levels,
+        'price_path': raw_args.price_path,
+        'scenarios': scenarios,
+        'seed': seed,
+        'log_level': raw_args.log_level,
+        'profile': raw_args.profile,
+        'sweep': sweep,
+        'record_trajectories': raw_args.record_trajectories is not None,
+        'jit': not raw_args.no_jit
+    }
 
 def main():
     """Main entry point for the CLI application."""
+    if sys.argv[1:2] == ['merge']:
+        merge_main(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ['serve']:
+        # Imported here so that plain simulations do not load the HTTP server modules
+        from .server import serve_main
+        serve_main(sys.argv[2:])
+        return
     raw_args = parse_args()
+    profiler = Profiler() if raw_args.profile else None
     
     config_manager = ConfigManager()
     power_levels = config_manager.parse_charger_power_levels(raw_args.charger_power_levels)
     scenarios = config_manager.parse_scenarios(raw_args.scenarios)
     agent_configs = config_manager.parse_agents(raw_args.agents)
+    sweep = config_manager.parse_sweep(raw_args.sweep) if raw_args.sweep else None
     
-    agents_to_run = {}
     for agent_config in agent_configs:
-        if agent_config.path == 'baseline':
-            agents_to_run[agent_config.name] = DumbAgent()
-        else:
-            if not os.path.exists(agent_config.path):
-                print(f"Error: Agent file not found at {agent_config.path}")
-                return
-            agents_to_run[agent_config.name] = load_agent(agent_config.path)
+        if agent_config.path != 'baseline' and not os.path.exists(agent_config.path):
+            print(f"Error: Agent file not found at {agent_config.path}")
+            return
             
     if not hasattr(raw_args, 'price_path') or not os.path.exists(raw_args.price_path):
         print(f"Error: Price data file not found. Please provide a valid path using --price-path.")
         return
 
-    full_log = DataLogger()
+    # Compile prices and export SB3 agents to NumPy once, before any worker process loads them
+    if raw_args.price_cache:
+        if profiler is not None:
+            t = perf_counter()
+        compile_price_cache(raw_args.price_path)
+        if profiler is not None:
+            profiler.lap('compile_prices', t)
+    if profiler is not None:
+        t = perf_counter()
+    for agent_config in agent_configs:
+        if agent_config.path != 'baseline' and not agent_config.path.endswith('.npz'):
+            try:
+                export_agent(agent_config.path)
+            except ValueError as e:
+                print(f"Error: Cannot export agent '{agent_config.name}' for NumPy inference: {e}")
+                return
+    if profiler is not None:
+        profiler.lap('export_agents', t)
+
+    checkpointing = raw_args.checkpoint or raw_args.resume
+    checkpoint_path = checkpoint_dir(raw_args.output_path)
+    if raw_args.record_trajectories and (checkpointing or raw_args.sweep):
+        print("Error: --record-trajectories cannot be combined with --checkpoint, --resume or --sweep.")
+        return
+    adaptive = raw_args.ci_tolerance is not None
+    if adaptive and (checkpointing or raw_args.sweep):
+        print("Error: --ci-tolerance cannot be combined with --checkpoint, --resume or --sweep.")
+        return
+    shard = None
+    if raw_args.shard is not None:
+        try:
+            shard = parse_shard(raw_args.shard)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        if adaptive:
+            print("Error: --shard cannot be combined with --ci-tolerance.")
+            return
+    if adaptive and (raw_args.ci_tolerance <= 0 or raw_args.max_runs < 1 or not 0 < raw_args.confidence < 1):
+        print("Error: --ci-tolerance and --max-runs must be positive and --confidence between 0 and 1.")
+        return
+
+    seed = raw_args.seed
+    if seed is None and raw_args.resume:
+        manifest = load_manifest(checkpoint_path)
+        seed = manifest['seed'] if manifest is not None else None
+    if seed is None and shard is not None:
+        print("Error: --shard requires --seed, so that every shard derives its run streams from the same global seed.")
+        return
+    if seed is None and (raw_args.workers > 1 or checkpointing):
+        # Parallel and checkpointed runs always use derived per-run streams; record the seed used
+        seed = random.SystemRandom().randrange(2**32)
+        print(f"Using random seed {seed}")
+
+    base_config = build_base_config(raw_args, power_levels, scenarios, sweep, seed)
+    try:
+        # Tables are small; the agents are loaded again by the runs themselves
+        check_agent_tables(build_agents([a for a in agent_configs if a.path.endswith('.npz')]), base_config)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    run_ids = list(range(1, raw_args.runs + 1))
+    if shard is not None:
+        run_ids = shard_run_ids(run_ids, *shard)
+        label = f"runs {run_ids[0]}-{run_ids[-1]}" if run_ids else "no runs"
+        print(f"--- Shard {shard[0]}/{shard[1]}: {label} of {raw_args.runs} ---")
+
+    if sweep is not None:
+        # The grid points of a run are advanced together in one bank
+        raw_args.batch = True
+        print(f"--- Sweeping {len(ParameterGrid(base_config))} grid points: {', '.join(sweep)} ---")
 
-    for i in range(raw_args.runs):
-        print(f"--- Starting Simulation Run {i+1} of {raw_args.runs} ---")
-        config = {
-            'run_id': i + 1, 'years': raw_args.years,
+    output_dir = os.path.dirname(raw_args.output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    streaming = output_format(raw_args.output_path) != 'csv'
+    checkpoint = None
+    pending_run_ids = run_ids
+    if checkpointing:
+        # Runs are saved to part files as they finish and stitched together at the end
+        logger_class = StreamingDataLogger.worker_logger_class if streaming else LOG_BACKENDS[raw_args.log_backend]
+        try:
+            checkpoint = RunCheckpoint(
+                checkpoint_path, raw_args.output_path, config_hash(base_config, agent_configs),
+                seed, logger_class, resume=raw_args.resume
+            )
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        pending_run_ids = checkpoint.pending(run_ids)
+        if len(pending_run_ids) < len(run_ids):
+            print(f"Resuming: {len(run_ids) - len(pending_run_ids)} of {len(run_ids)} runs already completed")
+        full_log = None
+    elif streaming:
+        full_log = StreamingDataLogger(raw_args.output_path, flush_rows=raw_args.flush_rows)
+    else:
+        full_log = LOG_BACKENDS[raw_args.log_backend]()
+
+    recorder = TrajectoryRecorder([a.name for a in agent_configs]) if raw_args.record_trajectories else None
+    try:
+        if adaptive:
+            _execute_adaptive_runs(raw_args, base_config, agent_configs, full_log, profiler, recorder)
+        else:
+            _execute_runs(raw_args, base_config, agent_configs, full_log, pending_run_ids, profiler, checkpoint, recorder)
+    finally:
+        if streaming and checkpoint is None:
+            # Finalize the file so the rows written so far stay readable
+            full_log.close()
+
+    print("\n--- All simulations complete ---")
+
+    if profiler is not None:
+        t = perf_counter()
+    if checkpoint is not None:
+        checkpoint.stitch(run_ids)
+    elif not streaming:
+        df = full_log.get_dataframe()
+        df.to_csv(raw_args.output_path, index=False)
+    print(f"Results saved to {raw_args.output_path}")
+    if shard is not None:
+        write_shard_manifest(
+            raw_args.output_path, shard, raw_args.runs, run_ids,
+            config_hash(base_config, agent_configs, content=True), seed
+        )
+
+    if recorder is not None:
+        recorder.save(raw_args.record_trajectories, {
             'battery_capacity': raw_args.battery_capacity,
-            'max_charge_speed': raw_args.max_charge_speed,
             'start_soc': raw_args.start_soc,
-            'soc_target': raw_args.soc_target,
-            'charger_power_levels': power_levels,
+            'duration_h': 0.25,
+            'num_days': int(raw_args.years * 365),
             'price_path': raw_args.price_path,
-            'scenarios': scenarios
-        }
-        run_simulation_run(config, agents_to_run, full_log)
+            'seed': seed,
+        })
+        print(f"Trajectories of {len(recorder)} battery steps saved to {raw_args.record_trajectories}")
 
-    print("\n--- All simulations complete ---")
-    
-    df = full_log.get_dataframe()
-    
-    output_dir = os.path.dirname(raw_args.output_path)
+    if profiler is not None:
+        profiler.lap('write_output', t)
+        report = profiler.report()
+        report_path = os.path.splitext(raw_args.output_path)[0] + '.profile.json'
+        profiler.write_report(report_path, report)
+        print("\n--- Profile ---")
+        print(profiler.format_summary(report))
+        print(f"Profile report saved to {report_path}")
+
+def merge_main(args_list: list = None):
+    """Entry point of the 'merge' subcommand: combines the outputs of a sharded simulation."""
+    args = parse_merge_args(args_list)
+    for path in args.shards:
+        if not os.path.exists(path):
+            print(f"Error: File not found at {path}")
+            return
+    output_dir = os.path.dirname(args.output_path)
     if output_dir:
         os.makedirs(output_dir, exist_ok=True)
-        
-    df.to_csv(raw_args.output_path, index=False)
-    print(f"Results saved to {raw_args.output_path}")
+    try:
+        manifest = merge_shards(args.shards, args.output_path)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    print(f"Merged {len(args.shards)} shard(s) holding runs 1-{manifest['num_runs']} into {args.output_path}")
+
+def _execute_runs(
+    raw_args, base_config: dict, agent_configs: list, logger, run_ids: list,
+    profiler=None, checkpoint=None, recorder=None, inputs: dict = None, pool=None
+) -> dict:
+    """
+    Runs the simulations in the execution mode selected on the command line.
+
+    With a checkpoint, every finished run (or batch) logs into a fresh logger
+    that is saved to the checkpoint instead of into `logger`. An `inputs`
+    dict keeps the price model, calendar and agents loaded by the first call
+    for later calls in the same process. With `--workers`, a `pool` from
+    `worker_pool` is used instead of starting one for this call.
+
+    Returns:
+        dict: run_id -> agent name -> summary of the run.
+    """
+    if not run_ids:
+        return {}
+    if raw_args.workers > 1:
+        print(f"--- Starting {len(run_ids)} Simulation Runs on {raw_args.workers} workers ---")
+        return run_parallel(
+            base_config, agent_configs, logger, run_ids, raw_args.workers,
+            batch=raw_args.batch, profiler=profiler, checkpoint=checkpoint, recorder=recorder, pool=pool
+        )
+
+    if inputs is None:
+        inputs = {}
+    if not inputs:
+        if profiler is not None:
+            t = perf_counter()
+        inputs['price_model'] = load_price_model(base_config['price_path'])
+        inputs['calendar'] = SimulationCalendar(
+            int(base_config['years'] * 365), base_config['scenarios'], inputs['price_model']
+        )
+        inputs['agents'] = build_agents(agent_configs)
+        if profiler is not None:
+            profiler.lap('load_inputs', t)
+    price_model, calendar, agents_to_run = inputs['price_model'], inputs['calendar'], inputs['agents']
+
+    summaries = {}
+    if raw_args.batch:
+        batch_size = CHECKPOINT_BATCH_RUNS if checkpoint is not None else len(run_ids)
+        for start in range(0, len(run_ids), batch_size):
+            batch_run_ids = run_ids[start:start + batch_size]
+            print(f"--- Starting {len(batch_run_ids)} Simulation Runs as one batch ---")
+            run_log = checkpoint.new_logger() if checkpoint is not None else logger
+            summaries.update(run_simulation_batch(
+                base_config, agents_to_run, run_log, batch_run_ids,
+                price_model=price_model, calendar=calendar, profiler=profiler, recorder=recorder
+            ))
+            _end_runs(batch_run_ids, run_log, checkpoint)
+    else:
+        for run_id in run_ids:
+            print(f"--- Starting Simulation Run {run_id} of {len(run_ids)} ---")
+            config = {'run_id': run_id, **base_config}
+            run_log = checkpoint.new_logger() if checkpoint is not None else logger
+            summaries[run_id] = run_simulation_run(
+                config, agents_to_run, run_log, price_model=price_model, calendar=calendar,
+                profiler=profiler, recorder=recorder
+            )
+            _end_runs([run_id], run_log, checkpoint)
+    return summaries
+
+def _execute_adaptive_runs(
+    raw_args, base_config: dict, agent_configs: list, logger, profiler=None, recorder=None, inputs: dict = None
+) -> dict:
+    """
+    Simulates rounds of `--runs` runs until the confidence intervals of the
+    agents' metrics and of their pairwise cost differences are within
+    `--ci-tolerance` (see ConvergenceMonitor), or `--max-runs` runs are done.
+
+    Run i always draws from the same RNG stream, so the output equals that of
+    a fixed `--runs` simulation with the number of runs the adaptive one took.
+    `inputs` works as in `_execute_runs`; with `--workers`, all rounds share
+    one worker pool.
+
+    Returns:
+        dict: run_id -> agent name -> summary of every run simulated.
+    """
+    monitor = ConvergenceMonitor(
+        [a.name for a in agent_configs], raw_args.ci_tolerance, raw_args.confidence
+    )
+    if inputs is None:
+        inputs = {}
+    summaries = {}
+    num_runs = 0
+    parallel = raw_args.workers > 1
+    with worker_pool(base_config, agent_configs, raw_args.workers) if parallel else contextlib.nullcontext() as pool:
+        while num_runs < raw_args.max_runs:
+            run_ids = list(range(num_runs + 1, min(num_runs + raw_args.runs, raw_args.max_runs) + 1))
+            round_summaries = _execute_runs(
+                raw_args, base_config, agent_configs, logger, run_ids, profiler,
+                recorder=recorder, inputs=inputs, pool=pool
+            )
+            monitor.add_runs(round_summaries)
+            summaries.update(round_summaries)
+            num_runs = run_ids[-1]
+            if monitor.converged():
+                break
+            print(f"--- {len(monitor.unconverged())} confidence interval(s) wider than the tolerance after {num_runs} runs ---")
+
+    unconverged = monitor.unconverged()
+    print(f"\n--- {raw_args.confidence:.0%} confidence intervals after {num_runs} runs ---")
+    print(monitor.format_summary())
+    if unconverged:
+        print(f"Stopped at --max-runs {raw_args.max_runs}; still wider than the tolerance: {', '.join(unconverged)}")
+    else:
+        print(f"Converged to a relative tolerance of {raw_args.ci_tolerance:g} after {num_runs} runs")
+    return summaries
+
+def _end_runs(run_ids: list, run_log, checkpoint=None):
+    """Closes finished runs: saves them to the checkpoint or ends the run in the logger."""
+    if checkpoint is not None:
+        checkpoint.save_runs(run_ids, run_log)
+    else:
+        run_log.end_run()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,236 @@
+import numpy as np
+from typing import Any, Dict, List
+
+LOG_LEVELS = ('step', 'day', 'run')
+
+# Quantities summed over the steps of a day and a run
+SUM_FIELDS = (
+    'electricity_cost', 'calendar_cost', 'cyclic_cost', 'total_cost',
+    'kwh_charged', 'steps'
+)
+
+class MetricsAccumulator:
+    """
+    Accumulates per-agent totals inside the run loop, so that a simulation can
+    log one row per agent per day or per run instead of one row per step.
+
+    The accumulator covers a (runs, agents) grid of batteries; the serial run
+    loop uses a single run. It also provides the per-run summary that the run
+    functions return regardless of the log level.
+    """
+    def __init__(
+        self,
+        run_ids: List[int],
+        agent_names: List[str],
+        soc_target,
+        row_columns: Dict[str, Any] = None,
+        row_keys: list = None
+    ):
+        """
+        Initializes the MetricsAccumulator.
+
+        Args:
+            run_ids (list): The run_ids of the accumulator's rows.
+            agent_names (list): The agent names of the accumulator's columns.
+            soc_target (float | np.ndarray): The SOC to be reached by the end of
+                                             each day, or an array of them
+                                             broadcastable to (rows, agents).
+            row_columns (dict, optional): Extra columns logged after the run_id,
+                                          as column name -> one value per row.
+            row_keys (list, optional): The keys of the rows in `summaries`.
+                                       Defaults to the run_ids.
+        """
+        self.run_ids = list(run_ids)
+        self.agent_names = list(agent_names)
+        self.soc_target = soc_target
+        self.row_columns = row_columns or {}
+        self.row_keys = list(row_keys) if row_keys is not None else self.run_ids
+
+        shape = (len(SUM_FIELDS), len(self.run_ids), len(self.agent_names))
+        self._day_totals = np.zeros(shape, dtype=np.float64)
+        self._run_totals = np.zeros(shape, dtype=np.float64)
+        self._fulfillment_sum = np.zeros(shape[1:], dtype=np.float64)
+        self._target_met_days = np.zeros(shape[1:], dtype=np.int64)
+        self._final_soc = np.zeros(shape[1:], dtype=np.float64)
+        self._final_soh = np.ones(shape[1:], dtype=np.float64)
+        self._days = 0
+
+    def add_step(self, run_index: int, agent_index: int, costs: dict, power_kw: float, duration_h: float):
+        """Adds the results of one battery's step."""
+        self._day_totals[:, run_index, agent_index] += (
+            costs['electricity_cost'], costs['calendar_cost'], costs['cyclic_cost'],
+            costs['total_cost'], power_kw * duration_h if power_kw > 0 else 0.0, 1.0
+        )
+
+    def add_steps(self, run_index: int, agent_index: int, costs: dict, power_kw: np.ndarray, duration_h: float):
+        """
+        Adds the results of a sequence of one battery's steps, given as arrays.
+
+        The values are summed in step order, so the totals equal those of
+        calling `add_step` once per step.
+        """
+        if len(power_kw) == 0:
+            return
+        kwh = np.where(power_kw > 0, power_kw * duration_h, 0.0)
+        values = (
+            costs['electricity_cost'], costs['calendar_cost'], costs['cyclic_cost'],
+            costs['total_cost'], kwh, np.ones(len(kwh))
+        )
+        for field, value in enumerate(values):
+            self._day_totals[field, run_index, agent_index] += np.cumsum(value)[-1]
+
+    def add_batch(self, costs: dict, power_kw: np.ndarray, duration_h: float, active: np.ndarray):
+        """Adds the results of one step for every active battery of the grid."""
+        kwh = np.where(power_kw > 0, power_kw * duration_h, 0.0)
+        values = (
+            costs['electricity_cost'], costs['calendar_cost'], costs['cyclic_cost'],
+            costs['total_cost'], kwh, 1.0
+        )
+        for field, value in enumerate(values):
+            self._day_totals[field] += np.where(active, value, 0.0)
+
+    def end_day(self, day: int, soc, soh, scenario_names: List[str], logger=None):
+        """
+        Closes a day: folds the day's totals into the run totals and, if a
+        logger is given, logs one row per run and agent.
+
+        Args:
+            day (int): The index of the finished day.
+            soc (float | np.ndarray): The SOC of each battery at the end of the day.
+            soh (float | np.ndarray): The SOH of each battery at the end of the day.
+            scenario_names (list): The charging scenario of each run on this day.
+            logger (DataLogger, optional): The logger to receive the daily rows.
+        """
+        soc = np.broadcast_to(np.asarray(soc, dtype=np.float64), self._final_soc.shape)
+        fulfillment = soc / self.soc_target
+
+        self._run_totals += self._day_totals
+        self._fulfillment_sum += fulfillment
+        self._target_met_days += soc >= self.soc_target
+        self._final_soc = soc.copy()
+        self._final_soh = np.broadcast_to(np.asarray(soh, dtype=np.float64), soc.shape).copy()
+        self._days += 1
+
+        if logger is not None:
+            num_agents = len(self.agent_names)
+            columns = {field: self._day_totals[i].ravel() for i, field in enumerate(SUM_FIELDS)}
+            columns['steps'] = columns['steps'].astype(np.int64)
+            logger.log_columns(
+                run_id=np.repeat(self.run_ids, num_agents), **self._repeated_row_columns(), day=day,
+                agent_type=self.agent_names * len(self.run_ids),
+                charging_scenario=[name for name in scenario_names for _ in self.agent_names],
+                **columns,
+                soc=self._final_soc.ravel(),
+                soh=self._final_soh.ravel(),
+                soc_fulfillment=fulfillment.ravel()
+            )
+        self._day_totals[:] = 0.0
+
+    def end_days(self, first_day: int, day_totals: np.ndarray, soc: np.ndarray, soh: np.ndarray, scenario_names: list, logger=None):
+        """
+        Closes consecutive days whose totals were computed elsewhere, e.g. by
+        the compiled step kernel. The results, and the rows logged, are
+        identical to those of calling `end_day` once per day: the run totals
+        are accumulated day by day in order.
+
+        Args:
+            first_day (int): The index of the first of the days.
+            day_totals (np.ndarray): The (days, len(SUM_FIELDS), runs, agents) totals.
+            soc (np.ndarray): The (days, runs, agents) SOC at the end of each day.
+            soh (np.ndarray): The (days, runs, agents) SOH at the end of each day.
+            scenario_names (list): For each day, the charging scenario of each run.
+            logger (DataLogger, optional): The logger to receive the daily rows.
+        """
+        num_days = len(day_totals)
+        if num_days == 0:
+            return
+        soc = np.asarray(soc, dtype=np.float64)
+        soh = np.asarray(soh, dtype=np.float64)
+        fulfillment = soc / self.soc_target
+
+        # Cumulative sums run in order, so they add the days exactly like `+=` would
+        self._run_totals = np.cumsum(np.concatenate((self._run_totals[None], day_totals)), axis=0)[-1]
+        self._fulfillment_sum = np.cumsum(np.concatenate((self._fulfillment_sum[None], fulfillment)), axis=0)[-1]
+        self._target_met_days += (soc >= self.soc_target).sum(axis=0)
+        self._final_soc = soc[-1].copy()
+        self._final_soh = soh[-1].copy()
+        self._days += num_days
+
+        if logger is not None:
+            num_agents = len(self.agent_names)
+            rows_per_day = len(self.run_ids) * num_agents
+            columns = {field: day_totals[:, i].ravel() for i, field in enumerate(SUM_FIELDS)}
+            columns['steps'] = columns['steps'].astype(np.int64)
+            row_columns = {
+                name: values * num_days if isinstance(values, list) else np.tile(values, num_days)
+                for name, values in self._repeated_row_columns().items()
+            }
+            logger.log_columns(
+                run_id=np.tile(np.repeat(self.run_ids, num_agents), num_days), **row_columns,
+                day=np.repeat(np.arange(first_day, first_day + num_days), rows_per_day),
+                agent_type=self.agent_names * (len(self.run_ids) * num_days),
+                charging_scenario=[name for names in scenario_names for name in names for _ in self.agent_names],
+                **columns,
+                soc=soc.ravel(),
+                soh=soh.ravel(),
+                soc_fulfillment=fulfillment.ravel()
+            )
+
+    def log_runs(self, logger):
+        """Logs one row per run and agent with the run's totals."""
+        num_agents = len(self.agent_names)
+        columns = {field: self._run_totals[i].ravel() for i, field in enumerate(SUM_FIELDS)}
+        columns['steps'] = columns['steps'].astype(np.int64)
+        logger.log_columns(
+            run_id=np.repeat(self.run_ids, num_agents), **self._repeated_row_columns(), days=self._days,
+            agent_type=self.agent_names * len(self.run_ids),
+            **columns,
+            final_soc=self._final_soc.ravel(),
+            final_soh=self._final_soh.ravel(),
+            mean_soc_fulfillment=self._mean_fulfillment().ravel(),
+            target_met_share=self._target_met_share().ravel()
+        )
+
+    def _repeated_row_columns(self) -> Dict[str, Any]:
+        """Repeats the extra row columns for every agent of a row."""
+        num_agents = len(self.agent_names)
+        return {
+            name: [v for v in values for _ in range(num_agents)] if isinstance(values, list)
+            else np.repeat(values, num_agents)
+            for name, values in self.row_columns.items()
+        }
+
+    def _mean_fulfillment(self) -> np.ndarray:
+        """Returns the mean end-of-day SOC fulfillment of each battery."""
+        return self._fulfillment_sum / max(self._days, 1)
+
+    def _target_met_share(self) -> np.ndarray:
+        """Returns the share of days on which each battery reached the SOC target."""
+        return self._target_met_days / max(self._days, 1)
+
+    def summaries(self) -> Dict[int, Dict[str, dict]]:
+        """
+        Returns the per-run summary of every agent.
+
+        Returns:
+            dict: run_id (or row key) -> agent name -> dict with 'total_cost',
+                  'kwh_charged', 'steps', 'final_soh' and 'soc_fulfillment'
+                  (mean over the days).
+        """
+        total_cost = self._run_totals[SUM_FIELDS.index('total_cost')]
+        kwh_charged = self._run_totals[SUM_FIELDS.index('kwh_charged')]
+        steps = self._run_totals[SUM_FIELDS.index('steps')]
+        fulfillment = self._mean_fulfillment()
+        return {
+            key: {
+                name: {
+                    'total_cost': float(total_cost[r, a]),
+                    'kwh_charged': float(kwh_charged[r, a]),
+                    'steps': int(steps[r, a]),
+                    'final_soh': float(self._final_soh[r, a]),
+                    'soc_fulfillment': float(fulfillment[r, a]),
+                }
+                for a, name in enumerate(self.agent_names)
+            }
+            for r, key in enumerate(self.row_keys)
+        }
@@ -0,0 +1,161 @@
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List
+
+from .core.price_model import load_price_model
+from .checkpoint import CHECKPOINT_BATCH_RUNS
+from .core.simulation_calendar import SimulationCalendar
+from .profiling import Profiler
+from .recording import TrajectoryRecorder
+
+# Per-process state, populated once by the pool initializer
+_worker_state = {}
+
+def _init_worker(base_config: dict, agent_configs: list):
+    """Loads the price data and agents once per worker process."""
+    # Imported here because the main module imports this one
+    from .main import build_agents
+
+    price_model = load_price_model(base_config['price_path'])
+    _worker_state['config'] = base_config
+    _worker_state['price_model'] = price_model
+    _worker_state['calendar'] = SimulationCalendar(
+        int(base_config['years'] * 365), base_config['scenarios'], price_model
+    )
+    _worker_state['agents'] = build_agents(agent_configs)
+
+def _run_task(task: tuple):
+    """
+    Simulates one chunk of run_ids in a worker and returns its log and the
+    runs' summaries, along with a profiling report and a TrajectoryRecorder
+    if the run configuration enables 'profile' and 'record_trajectories'.
+    """
+    from .main import run_simulation_run, run_simulation_batch
+
+    run_ids, batch, logger_class = task
+    config = _worker_state['config']
+    agents_to_run = _worker_state['agents']
+    price_model = _worker_state['price_model']
+    calendar = _worker_state['calendar']
+
+    logger = logger_class()
+    profiler = Profiler() if config.get('profile') else None
+    recorder = TrajectoryRecorder(list(agents_to_run)) if config.get('record_trajectories') else None
+    if batch:
+        summaries = run_simulation_batch(
+            config, agents_to_run, logger, run_ids, price_model=price_model, calendar=calendar,
+            profiler=profiler, recorder=recorder
+        )
+    else:
+        summaries = {
+            run_id: run_simulation_run(
+                {'run_id': run_id, **config}, agents_to_run, logger,
+                price_model=price_model, calendar=calendar, profiler=profiler, recorder=recorder
+            )
+            for run_id in run_ids
+        }
+    return logger, summaries, profiler.report() if profiler is not None else None, recorder
+
+def worker_pool(base_config: dict, agent_configs: list, workers: int) -> ProcessPoolExecutor:
+    """
+    Starts a pool of worker processes for `run_parallel`. Each worker parses
+    the price data, builds the simulation calendar and loads the agents once,
+    so a pool can serve several calls with the same configuration.
+    """
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(base_config, agent_configs))
+
+def _chunk_run_ids(run_ids: List[int], workers: int, batch: bool, max_size: int = None) -> List[List[int]]:
+    """
+    Splits run_ids into tasks: one run each, or one contiguous batch per
+    worker of at most `max_size` runs.
+    """
+    if not batch:
+        return [[run_id] for run_id in run_ids]
+    size = -(-len(run_ids) // workers)
+    if max_size is not None:
+        size = min(size, max_size)
+    return [run_ids[i:i + size] for i in range(0, len(run_ids), size)]
+
+def run_parallel(
+    base_config: dict, agent_configs: list, logger, run_ids: List[int], workers: int,
+    batch: bool = False, profiler: Profiler = None, checkpoint=None, recorder: TrajectoryRecorder = None,
+    pool: ProcessPoolExecutor = None
+) -> dict:
+    """
+    Executes simulation runs across a pool of worker processes.
+
+    Every worker parses the price data, builds the simulation calendar and
+    loads the agents once, then simulates whole runs with the RNG stream
+    derived from `base_config['seed']` and each run_id. Tasks are collected as
+    they finish; their logs are merged into `logger` in run order as soon as
+    every earlier task has been merged, and released right after.
+
+    Args:
+        base_config (dict): The run configuration without a 'run_id'.
+        agent_configs (list): The AgentConfig objects to load in each worker.
+        logger (DataLogger): The logger receiving the merged results. Workers
+                             log into fresh instances of its class, or of its
+                             `worker_logger_class` if it defines one.
+        run_ids (list): The run_ids to simulate.
+        workers (int): The number of worker processes.
+        batch (bool): Whether each worker advances its share of runs as one batch.
+        profiler (Profiler, optional): Receives the merged profiling reports of
+                                       the workers. Requires 'profile' to be set
+                                       in `base_config`.
+        checkpoint (RunCheckpoint, optional): If given, every finished task is
+                                              saved to the checkpoint instead of
+                                              being merged into `logger`.
+        recorder (TrajectoryRecorder, optional): Receives the trajectories
+                                                 recorded by the workers.
+                                                 Requires 'record_trajectories'
+                                                 to be set in `base_config`.
+        pool (ProcessPoolExecutor, optional): A pool from `worker_pool` for the
+                                              same configuration, left running.
+                                              A pool is started for this call
+                                              if omitted.
+
+    Returns:
+        dict: run_id -> agent name -> summary of the run.
+    """
+    if checkpoint is not None:
+        logger_class = checkpoint.logger_class
+        chunks = _chunk_run_ids(run_ids, workers, batch, max_size=CHECKPOINT_BATCH_RUNS)
+    else:
+        logger_class = getattr(logger, 'worker_logger_class', type(logger))
+        chunks = _chunk_run_ids(run_ids, workers, batch)
+    summaries = {}
+    with contextlib.ExitStack() as stack:
+        if pool is None:
+            pool = stack.enter_context(worker_pool(base_config, agent_configs, workers))
+        futures = {pool.submit(_run_task, (chunk, batch, logger_class)): index for index, chunk in enumerate(chunks)}
+        finished = {}
+        next_index = 0
+        try:
+            for future in as_completed(futures):
+                index = futures.pop(future)
+                run_log, chunk_summaries, report, recording = future.result()
+                if checkpoint is not None:
+                    # Part files are stitched in run order later, so every task is saved once it finishes
+                    checkpoint.save_runs(chunks[index], run_log)
+                    run_log = None
+                finished[index] = (run_log, chunk_summaries, report, recording)
+
+                while next_index in finished:
+                    run_log, chunk_summaries, report, recording = finished.pop(next_index)
+                    chunk = chunks[next_index]
+                    next_index += 1
+                    summaries.update(chunk_summaries)
+                    if profiler is not None and report is not None:
+                        profiler.merge(report)
+                    if recorder is not None and recording is not None:
+                        recorder.merge(recording)
+                    if run_log is not None:
+                        logger.merge(run_log)
+                        logger.end_run()
+                    label = f"Run {chunk[0]}" if len(chunk) == 1 else f"Runs {chunk[0]}-{chunk[-1]}"
+                    print(f"--- Completed Simulation {label} of {len(run_ids)} ---")
+        finally:
+            # Tasks still queued after a failure must not keep a shared pool busy
+            for future in futures:
+                future.cancel()
+    return summaries
@@ -0,0 +1,149 @@
+import argparse
+import os
+import sys
+from typing import List, Optional
+import numpy as np
+from .agent_loader import load_agent, load_policy
+from .agents.baseline_agent import DumbAgent
+from .agents.tabular_policy import TabularPolicy
+from .config_manager import ConfigManager
+
+STEPS_PER_DAY = 96
+
+def query_actions(agent, obs: np.ndarray, power_levels: list, soc_target: float) -> np.ndarray:
+    """Returns the greedy action index chosen by `agent` for each row of `obs`."""
+    if isinstance(agent, DumbAgent):
+        actions = agent.predict_batch(obs, power_levels, soc_target)
+    else:
+        actions, _ = agent.predict(obs, deterministic=True)
+    return np.asarray(actions, dtype=np.int64).reshape(len(obs))
+
+def compile_policy(agent, power_levels: list, soc_target: float, soc_points: int = 1001) -> TabularPolicy:
+    """
+    Tabulates an agent's actions over a (SOC, step) grid.
+
+    The agent is queried once, with one batch holding every combination of
+    `soc_points` evenly spaced SOCs in [0, 1] and the 96 steps of a day.
+
+    Args:
+        agent: A DumbAgent or a model with an SB3-style `predict`.
+        power_levels (list): The charger power levels, used by DumbAgent.
+        soc_target (float): The target SOC, used by DumbAgent and only
+            recorded in the metadata for it.
+        soc_points (int): The number of rows of the SOC grid.
+
+    Returns:
+        TabularPolicy: The compiled policy.
+    """
+    soc_grid = np.linspace(0.0, 1.0, soc_points)
+    obs = np.empty((soc_points, STEPS_PER_DAY, 2), dtype=np.float32)
+    obs[:, :, 0] = soc_grid[:, None]
+    obs[:, :, 1] = np.arange(STEPS_PER_DAY)[None, :]
+
+    actions = query_actions(agent, obs.reshape(-1, 2), power_levels, soc_target)
+    metadata = {'power_levels': list(power_levels)}
+    if isinstance(agent, DumbAgent):
+        # Only DumbAgent reads the SOC target; a model's actions do not depend on it
+        metadata['soc_target'] = soc_target
+    return TabularPolicy(actions.reshape(soc_points, STEPS_PER_DAY), 0.0, 1.0, metadata)
+
+def disagreement_rate(
+    policy: TabularPolicy,
+    agent,
+    power_levels: list,
+    soc_target: float,
+    samples: int = 100_000,
+    seed: int = 0
+) -> float:
+    """
+    Measures how often the table and the live agent choose different actions.
+
+    Args:
+        policy (TabularPolicy): The compiled policy.
+        agent: The agent the policy was compiled from.
+        power_levels (list): The charger power levels, used by DumbAgent.
+        soc_target (float): The target SOC, used by DumbAgent.
+        samples (int): The number of random (SOC, step) observations to compare.
+        seed (int): The seed of the random observations.
+
+    Returns:
+        float: The share of observations on which the actions differ.
+    """
+    rng = np.random.default_rng(seed)
+    obs = np.empty((samples, 2), dtype=np.float32)
+    obs[:, 0] = rng.uniform(0.0, 1.0, samples)
+    obs[:, 1] = rng.integers(0, STEPS_PER_DAY, samples)
+
+    live_actions = query_actions(agent, obs, power_levels, soc_target)
+    table_actions, _ = policy.predict(obs)
+    return float(np.mean(live_actions != table_actions))
+
+def _load_source_agent(agent_path: str):
+    """Loads the agent to compile: 'baseline', an SB3 .zip or an exported .npz."""
+    if agent_path == 'baseline':
+        return DumbAgent()
+    if agent_path.endswith('.npz'):
+        return load_policy(agent_path)
+    return load_agent(agent_path)
+
+def parse_args(args_list: Optional[List[str]] = None):
+    """Parses command-line arguments for the policy compiler."""
+    parser = argparse.ArgumentParser(
+        description="Compile an agent into an int8 action table over a (SOC, step) grid.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        "--agent", type=str, required=True,
+        help="The agent to compile: 'baseline', an SB3 .zip or an exported .npz."
+    )
+    parser.add_argument(
+        "--output-path", type=str, required=True,
+        help="File path for the compiled .npz table."
+    )
+    parser.add_argument(
+        "--charger-power-levels", type=str, required=True,
+        help="Power levels as a JSON list, e.g., '[-11, 0, 11]'."
+    )
+    parser.add_argument(
+        "--soc-target", type=float, required=True,
+        help="The target SOC (0.0 to 1.0) the agents charge towards."
+    )
+    parser.add_argument(
+        "--soc-points", type=int, default=1001,
+        help="Number of evenly spaced SOC rows of the table."
+    )
+    parser.add_argument(
+        "--check-samples", type=int, default=100_000,
+        help="Random (SOC, step) observations used to compare the table with the live agent."
+    )
+    parser.add_argument(
+        "--max-disagreement", type=float, default=None,
+        help="Fail if the table disagrees with the live agent on a larger share of the samples."
+    )
+    return parser.parse_args(args_list)
+
+def main(args_list: Optional[List[str]] = None) -> int:
+    """Entry point of the policy compiler. Returns the process exit code."""
+    args = parse_args(args_list)
+    if args.agent != 'baseline' and not os.path.exists(args.agent):
+        print(f"Error: Agent file not found at {args.agent}")
+        return 1
+
+    power_levels = ConfigManager().parse_charger_power_levels(args.charger_power_levels)
+    agent = _load_source_agent(args.agent)
+    policy = compile_policy(agent, power_levels, args.soc_target, args.soc_points)
+    policy.metadata['source'] = args.agent
+
+    rate = disagreement_rate(policy, agent, power_levels, args.soc_target, args.check_samples)
+    policy.metadata['disagreement'] = rate
+    policy.save(args.output_path)
+
+    print(f"Compiled {policy.actions.shape[0]} x {policy.actions.shape[1]} action table to {args.output_path}")
+    print(f"Disagreement with the live agent: {rate:.4%} of {args.check_samples} samples")
+    if args.max_disagreement is not None and rate > args.max_disagreement:
+        print(f"Error: disagreement exceeds the allowed {args.max_disagreement:.4%}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import json
+import sys
+from time import perf_counter
+from typing import List
+
+try:
+    import resource
+except ImportError: # Not available on Windows
+    resource = None
+
+class Profiler:
+    """
+    Accumulates wall time and call counts per phase of the simulation, plus
+    per-run throughput.
+
+    Instrumented code reads the clock once per phase boundary:
+
+        t = perf_counter()
+        ...                      # the phase's work
+        t = profiler.lap('phase', t)
+
+    and guards every call with a check of whether a profiler was given, so a
+    disabled profiler costs one branch per phase.
+    """
+    def __init__(self):
+        """Initializes an empty Profiler and starts its wall clock."""
+        self.phases = {} # phase -> [seconds, calls]
+        self.runs = []
+        self.rows_logged = 0
+        self.worker_peak_rss_bytes = 0
+        self._started = perf_counter()
+
+    def lap(self, phase: str, started: float) -> float:
+        """
+        Charges the time since `started` to a phase.
+
+        Returns:
+            float: The current clock reading, to start the next phase.
+        """
+        now = perf_counter()
+        entry = self.phases.get(phase)
+        if entry is None:
+            self.phases[phase] = [now - started, 1]
+        else:
+            entry[0] += now - started
+            entry[1] += 1
+        return now
+
+    def add_rows(self, rows: int):
+        """Counts rows handed to the logger."""
+        self.rows_logged += rows
+
+    def record_run(self, run_ids: List[int], seconds: float, steps: int, rows: int):
+        """Records the throughput of one run, or of a batch of runs simulated together."""
+        self.runs.append({
+            'run_ids': list(run_ids),
+            'seconds': seconds,
+            'steps': steps,
+            'steps_per_sec': steps / seconds if seconds > 0 else None,
+            'rows_logged': rows,
+        })
+
+    def merge(self, report: dict):
+        """Adds the phases and runs of another profiler's report, e.g. from a worker."""
+        for phase, entry in report['phases'].items():
+            current = self.phases.setdefault(phase, [0.0, 0])
+            current[0] += entry['seconds']
+            current[1] += entry['calls']
+        self.runs.extend(report['runs'])
+        self.rows_logged += report['rows_logged']
+        self.worker_peak_rss_bytes = max(self.worker_peak_rss_bytes, report['peak_rss_bytes'] or 0)
+
+    def report(self) -> dict:
+        """
+        Builds the profiling report.
+
+        Returns:
+            dict: Wall time, per-phase seconds, calls and share of the phase
+                  total, per-run throughput, overall steps/sec, rows logged and
+                  the peak RSS of this process (and its workers, if any).
+        """
+        wall_seconds = perf_counter() - self._started
+        phase_total = sum(seconds for seconds, _ in self.phases.values())
+        steps = sum(run['steps'] for run in self.runs)
+        run_seconds = sum(run['seconds'] for run in self.runs)
+        return {
+            'wall_seconds': wall_seconds,
+            'phases': {
+                phase: {
+                    'seconds': seconds,
+                    'calls': calls,
+                    'share': seconds / phase_total if phase_total > 0 else 0.0,
+                }
+                for phase, (seconds, calls) in sorted(self.phases.items(), key=lambda item: -item[1][0])
+            },
+            'runs': self.runs,
+            'steps': steps,
+            'steps_per_sec': steps / run_seconds if run_seconds > 0 else None,
+            'rows_logged': self.rows_logged,
+            'peak_rss_bytes': peak_rss_bytes(),
+            'worker_peak_rss_bytes': self.worker_peak_rss_bytes or None,
+        }
+
+    def format_summary(self, report: dict = None) -> str:
+        """Formats a report as a table of phases followed by the totals."""
+        report = report or self.report()
+        lines = [f"{'phase':<20} {'seconds':>10} {'calls':>12} {'us/call':>10} {'share':>7}"]
+        for phase, entry in report['phases'].items():
+            per_call = entry['seconds'] / entry['calls'] * 1e6 if entry['calls'] else 0.0
+            lines.append(f"{phase:<20} {entry['seconds']:>10.3f} {entry['calls']:>12} "
+                         f"{per_call:>10.2f} {entry['share']:>7.1%}")
+        lines.append(f"wall time: {report['wall_seconds']:.3f}s, runs: {len(report['runs'])}, "
+                     f"battery steps: {report['steps']}, rows logged: {report['rows_logged']}")
+        if report['steps_per_sec'] is not None:
+            lines.append(f"throughput: {report['steps_per_sec']:,.0f} steps/sec")
+        for key, label in (('peak_rss_bytes', 'peak RSS'), ('worker_peak_rss_bytes', 'peak worker RSS')):
+            if report[key]:
+                lines.append(f"{label}: {report[key] / 2**20:.1f} MiB")
+        return "\n".join(lines)
+
+    def write_report(self, path: str, report: dict = None):
+        """Writes a report as JSON."""
+        with open(path, 'w') as f:
+            json.dump(report or self.report(), f, indent=2)
+            f.write("\n")
+
+def peak_rss_bytes() -> int | None:
+    """Returns the peak resident set size of this process, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
@@ -0,0 +1,204 @@
+import json
+import numpy as np
+from typing import List
+
+RECORDING_VERSION = 1
+
+class TrajectoryRecorder:
+    """
+    Records the power and SOC trajectory of every battery of a simulation.
+
+    The SOC path of a battery depends only on the agent's actions, not on
+    prices or degradation parameters, so a recorded trajectory can be
+    re-costed under other price data and degradation settings without
+    simulating again (see `recost`). Steps are appended in simulation order,
+    one at a time or in arrays, and `save` writes them grouped per
+    (run, agent) series into a compressed .npz file.
+    """
+    def __init__(self, agent_names: List[str]):
+        """
+        Initializes an empty TrajectoryRecorder.
+
+        Args:
+            agent_names (list): The agent names, in the agent index order of the run loops.
+        """
+        self.agent_names = list(agent_names)
+        self._rows = ([], [], [], [], [], []) # run_id, agent, day, step, power_kw, soc
+        self._chunks = []
+
+    def add_step(self, run_id: int, agent_index: int, day: int, step: int, power_kw: float, soc: float):
+        """Records one step of one battery: the power applied and the SOC after it."""
+        for column, value in zip(self._rows, (run_id, agent_index, day, step, power_kw, soc)):
+            column.append(value)
+
+    def add_steps(self, run_id: int, agent_index: int, day: int, steps, power_kw: np.ndarray, soc: np.ndarray):
+        """Records consecutive steps of one battery's day."""
+        count = len(power_kw)
+        self._add_chunk(
+            np.full(count, run_id), np.full(count, agent_index), np.full(count, day),
+            np.asarray(steps), power_kw, soc
+        )
+
+    def add_batch(self, run_ids: np.ndarray, day: int, step: int, power_kw: np.ndarray, soc: np.ndarray):
+        """
+        Records one step of a (runs, agents) bank of batteries.
+
+        Args:
+            run_ids (np.ndarray): The run_id of each row of `power_kw` and `soc`.
+            day (int): The index of the day.
+            step (int | np.ndarray): The step of the day, or the step of each row.
+            power_kw (np.ndarray): The (runs, agents) power applied.
+            soc (np.ndarray): The (runs, agents) SOC after the step.
+        """
+        num_runs, num_agents = power_kw.shape
+        count = num_runs * num_agents
+        self._add_chunk(
+            np.repeat(run_ids, num_agents), np.tile(np.arange(num_agents), num_runs),
+            np.full(count, day), np.repeat(np.broadcast_to(step, num_runs), num_agents), power_kw.ravel(), soc.ravel()
+        )
+
+    def merge(self, other: "TrajectoryRecorder"):
+        """Appends the steps recorded by another recorder, e.g. in a worker process."""
+        self._flush_rows()
+        other._flush_rows()
+        self._chunks.extend(other._chunks)
+
+    def __len__(self) -> int:
+        """Returns the number of recorded steps."""
+        return len(self._rows[0]) + sum(len(chunk[0]) for chunk in self._chunks)
+
+    def _add_chunk(self, *columns):
+        """Appends an array chunk, after the single steps recorded before it."""
+        self._flush_rows()
+        self._chunks.append(tuple(np.array(c) for c in columns))
+
+    def _flush_rows(self):
+        """Moves the single recorded steps into an array chunk."""
+        if self._rows[0]:
+            self._chunks.append(tuple(np.array(column) for column in self._rows))
+            self._rows = ([], [], [], [], [], [])
+
+    def save(self, path: str, metadata: dict):
+        """
+        Writes the recorded trajectories to a compressed .npz file.
+
+        Steps are grouped into one series per (run, agent), keeping their
+        order. Powers are stored as int8 indices into the table of the
+        distinct powers applied, days and steps as small integers.
+
+        Args:
+            path (str): The output path.
+            metadata (dict): Simulation parameters needed for re-costing:
+                             'battery_capacity', 'start_soc', 'duration_h',
+                             'num_days' and 'price_path' at least.
+        """
+        self._flush_rows()
+        if self._chunks:
+            run_id, agent, day, step, power_kw, soc = (
+                np.concatenate([chunk[i] for chunk in self._chunks]) for i in range(6)
+            )
+        else:
+            run_id, agent, day, step = (np.zeros(0, dtype=np.int64) for _ in range(4))
+            power_kw, soc = np.zeros(0), np.zeros(0)
+
+        order = np.lexsort((agent, run_id)) # Stable, so each series stays in order
+        series_key = np.stack([run_id[order], agent[order]])
+        starts = np.flatnonzero(np.any(np.diff(series_key, axis=1) != 0, axis=0)) + 1
+        offsets = np.concatenate(([0], starts, [len(order)])) if len(order) else np.zeros(1, dtype=np.int64)
+
+        power_levels, action = np.unique(power_kw[order], return_inverse=True)
+        if len(power_levels) > np.iinfo(np.int8).max:
+            raise ValueError(f"Too many distinct power levels to record: {len(power_levels)}")
+
+        np.savez_compressed(
+            path,
+            series_run_id=run_id[order][offsets[:-1]].astype(np.int64),
+            series_agent=agent[order][offsets[:-1]].astype(np.int16),
+            series_offsets=offsets.astype(np.int64),
+            day=day[order].astype(np.int32),
+            step=step[order].astype(np.int8),
+            action=action.astype(np.int8),
+            power_levels=power_levels.astype(np.float64),
+            soc=soc[order].astype(np.float64),
+            metadata=np.array(json.dumps({
+                'version': RECORDING_VERSION, 'agent_names': self.agent_names, **metadata
+            }))
+        )
+
+class RecordedTrajectories:
+    """The trajectories of a simulation, as written by `TrajectoryRecorder.save`."""
+    def __init__(self, arrays: dict, metadata: dict):
+        """
+        Initializes the RecordedTrajectories.
+
+        Args:
+            arrays (dict): The arrays of the recording file.
+            metadata (dict): The recording's metadata.
+        """
+        self.metadata = metadata
+        self.agent_names = metadata['agent_names']
+        self.series_run_id = arrays['series_run_id']
+        self.series_agent = arrays['series_agent']
+        self.series_offsets = arrays['series_offsets']
+        self.day = arrays['day']
+        self.step = arrays['step']
+        self.action = arrays['action']
+        self.power_levels = arrays['power_levels']
+        self.soc = arrays['soc']
+
+    @classmethod
+    def load(cls, path: str) -> "RecordedTrajectories":
+        """
+        Loads a recording file.
+
+        Raises:
+            ValueError: If the file was written by an unsupported version.
+        """
+        with np.load(path) as data:
+            metadata = json.loads(str(data['metadata']))
+            if metadata.get('version') != RECORDING_VERSION:
+                raise ValueError(f"Unsupported trajectory recording version: {metadata.get('version')}")
+            arrays = {name: data[name] for name in data.files if name != 'metadata'}
+        return cls(arrays, metadata)
+
+    @property
+    def num_series(self) -> int:
+        """The number of (run, agent) series."""
+        return len(self.series_run_id)
+
+    @property
+    def power_kw(self) -> np.ndarray:
+        """The power applied in every step."""
+        return self.power_levels[self.action]
+
+    def soc_before(self) -> np.ndarray:
+        """
+        Returns the SOC at the beginning of every step: the SOC after the
+        previous step of the same day, or the start SOC on a day's first step.
+        """
+        soc_before = np.empty_like(self.soc)
+        if len(soc_before) == 0:
+            return soc_before
+        soc_before[1:] = self.soc[:-1]
+        first_of_day = np.ones(len(self.soc), dtype=bool)
+        first_of_day[1:] = self.day[1:] != self.day[:-1]
+        first_of_day[self.series_offsets[:-1]] = True
+        soc_before[first_of_day] = self.metadata['start_soc']
+        return soc_before
+
+    def series_sums(self, values: np.ndarray) -> np.ndarray:
+        """
+        Sums per-step values over every series, in step order.
+
+        Args:
+            values (np.ndarray): A (..., steps) array.
+
+        Returns:
+            np.ndarray: A (..., series) array.
+        """
+        sums = np.zeros(values.shape[:-1] + (self.num_series,), dtype=np.float64)
+        lengths = np.diff(self.series_offsets)
+        nonempty = lengths > 0
+        if nonempty.any():
+            sums[..., nonempty] = np.add.reduceat(values, self.series_offsets[:-1][nonempty], axis=-1)
+        return sums
@@ -0,0 +1,242 @@
+import argparse
+import json
+import os
+import sys
+import numpy as np
+from typing import List, Optional, Tuple
+
+from .core.degradation_model import DegradationModel
+from .core.price_model import PriceModel, load_price_model
+from .core.simulation_calendar import SimulationCalendar
+from .recording import RecordedTrajectories
+
+# EOL is defined as a 20% loss of SOH (from 1.0 to 0.8), as in SimulationEngine
+EOL_SOH_LOSS = 0.20
+DEFAULT_BATTERY_EOL_COST = 8000.0
+
+# Upper bound on the elements of the (settings, steps) arrays built at once
+_BLOCK_ELEMENTS = 2**24
+
+class DegradationSetting:
+    """A named set of degradation parameters to re-cost trajectories under."""
+    def __init__(self, name: str, model: DegradationModel, battery_eol_cost: float = DEFAULT_BATTERY_EOL_COST):
+        """
+        Initializes the DegradationSetting.
+
+        Args:
+            name (str): The name of the setting in the results.
+            model (DegradationModel): The model with the setting's ageing tables.
+            battery_eol_cost (float): The cost that corresponds to the battery
+                                      reaching its End of Life.
+        """
+        self.name = name
+        self.model = model
+        self.battery_eol_cost = battery_eol_cost
+
+    @classmethod
+    def from_dict(cls, values: dict) -> "DegradationSetting":
+        """
+        Builds a setting from a dict with a 'name' and any of 'calendar_soc_points',
+        'calendar_cost_rates', 'cyclic_c_rate_points', 'cyclic_cost_per_cycle' and
+        'battery_eol_cost'. Missing values keep the DegradationModel defaults.
+
+        Raises:
+            ValueError: If a key is unknown or a table is malformed.
+        """
+        values = dict(values)
+        name = values.pop('name', None)
+        if name is None:
+            raise ValueError("Every degradation setting needs a 'name'.")
+        battery_eol_cost = float(values.pop('battery_eol_cost', DEFAULT_BATTERY_EOL_COST))
+
+        model = DegradationModel()
+        tables = {
+            'calendar_soc_points': '_calendar_soc_points',
+            'calendar_cost_rates': '_calendar_cost_rates',
+            'cyclic_c_rate_points': '_cyclic_c_rate_points',
+            'cyclic_cost_per_cycle': '_cyclic_cost_per_cycle',
+        }
+        for key, value in values.items():
+            if key not in tables:
+                raise ValueError(f"Unknown degradation parameter '{key}' in setting '{name}'.")
+            setattr(model, tables[key], [float(v) for v in value])
+        for points, rates in (('_calendar_soc_points', '_calendar_cost_rates'), ('_cyclic_c_rate_points', '_cyclic_cost_per_cycle')):
+            if len(getattr(model, points)) != len(getattr(model, rates)):
+                raise ValueError(f"The {points.strip('_')} and {rates.strip('_')} of setting '{name}' differ in length.")
+        return cls(name, model, battery_eol_cost)
+
+def load_degradation_settings(path: str) -> List[DegradationSetting]:
+    """Reads a JSON list of degradation settings (see `DegradationSetting.from_dict`)."""
+    with open(path) as f:
+        settings = json.load(f)
+    if not isinstance(settings, list):
+        raise ValueError("The degradation settings must be a JSON list.")
+    return [DegradationSetting.from_dict(s) for s in settings]
+
+def step_prices(trajectories: RecordedTrajectories, price_model: PriceModel) -> np.ndarray:
+    """
+    Looks up the price of every recorded step in a price model.
+
+    Raises:
+        ValueError: If a step has no price.
+    """
+    calendar = SimulationCalendar(trajectories.metadata['num_days'], [], price_model)
+    prices = calendar.hourly_prices[trajectories.day, calendar.step_hours[trajectories.step]]
+    missing = np.flatnonzero(np.isnan(prices))
+    if len(missing):
+        i = missing[0]
+        raise ValueError(f"Price not found for timestamp: {calendar.timestamp(int(trajectories.day[i]), int(trajectories.step[i]))}")
+    return prices
+
+def recost(
+    trajectories: RecordedTrajectories,
+    price_settings: List[Tuple[str, np.ndarray]],
+    degradation_settings: List[DegradationSetting]
+) -> dict:
+    """
+    Costs recorded trajectories under every combination of price data and
+    degradation setting.
+
+    Electricity costs only depend on the prices and degradation costs only
+    on the degradation setting, so each is computed once per setting as a
+    (settings, steps) array and summed per series; the totals of every
+    combination are then formed by broadcasting. The SOH starts at 1.0 and
+    loses (calendar + cyclic cost) / EOL cost * 20% per step, as in the
+    simulation.
+
+    Args:
+        trajectories (RecordedTrajectories): The recorded simulation.
+        price_settings (list): (name, step prices) pairs, with the price of
+                               every recorded step (see `step_prices`).
+        degradation_settings (list): The DegradationSettings to apply.
+
+    Returns:
+        dict: Column name -> array with one row per (price setting,
+              degradation setting, run, agent).
+    """
+    duration_h = trajectories.metadata['duration_h']
+    capacity = trajectories.metadata['battery_capacity']
+    power_kw = trajectories.power_kw
+    energy_kwh = power_kw * duration_h
+    soc_before = trajectories.soc_before()
+    num_steps = len(power_kw)
+    block = max(1, _BLOCK_ELEMENTS // max(num_steps, 1))
+
+    # (prices, series) electricity costs
+    electricity = np.concatenate([
+        trajectories.series_sums(energy_kwh * np.stack([prices for _, prices in price_settings[i:i + block]]))
+        for i in range(0, len(price_settings), block)
+    ]) if price_settings else np.zeros((0, trajectories.num_series))
+
+    # (degradations, series) calendar and cyclic costs and SOH losses
+    levels = trajectories.power_levels
+    calendar_cost, cyclic_cost, soh_loss = [], [], []
+    for i in range(0, len(degradation_settings), block):
+        settings = degradation_settings[i:i + block]
+        calendar = np.stack([
+            np.interp(soc_before, s.model._calendar_soc_points, s.model._calendar_cost_rates) * duration_h
+            for s in settings
+        ])
+        # Cyclic ageing only applies to charging steps; tabulate it per power level
+        level_costs = np.stack([
+            np.where(
+                levels > 0,
+                np.interp(levels / capacity, s.model._cyclic_c_rate_points, s.model._cyclic_cost_per_cycle)
+                * (levels * duration_h / capacity),
+                0.0
+            )
+            for s in settings
+        ])
+        cyclic = level_costs[:, trajectories.action]
+        eol_cost = np.array([s.battery_eol_cost for s in settings])[:, None]
+        calendar_cost.append(trajectories.series_sums(calendar))
+        cyclic_cost.append(trajectories.series_sums(cyclic))
+        soh_loss.append(trajectories.series_sums((calendar + cyclic) / eol_cost * EOL_SOH_LOSS))
+    empty = np.zeros((0, trajectories.num_series))
+    calendar_cost = np.concatenate(calendar_cost) if calendar_cost else empty
+    cyclic_cost = np.concatenate(cyclic_cost) if cyclic_cost else empty
+    # Losses are never negative, so clamping once at the end equals clamping every step
+    final_soh = np.maximum(0.0, 1.0 - (np.concatenate(soh_loss) if soh_loss else empty))
+
+    num_prices, num_degradations, num_series = len(price_settings), len(degradation_settings), trajectories.num_series
+    shape = (num_prices, num_degradations, num_series)
+    electricity = np.broadcast_to(electricity[:, None, :], shape)
+    calendar_cost = np.broadcast_to(calendar_cost[None], shape)
+    cyclic_cost = np.broadcast_to(cyclic_cost[None], shape)
+    kwh_charged = trajectories.series_sums(np.where(power_kw > 0, energy_kwh, 0.0))
+
+    agent_names = np.array(trajectories.agent_names, dtype=object)
+    return {
+        'price_setting': np.repeat([name for name, _ in price_settings], num_degradations * num_series),
+        'degradation_setting': np.tile(np.repeat([s.name for s in degradation_settings], num_series), num_prices),
+        'run_id': np.tile(trajectories.series_run_id, num_prices * num_degradations),
+        'agent_type': np.tile(agent_names[trajectories.series_agent], num_prices * num_degradations),
+        'steps': np.tile(np.diff(trajectories.series_offsets), num_prices * num_degradations),
+        'kwh_charged': np.tile(kwh_charged, num_prices * num_degradations),
+        'electricity_cost': electricity.ravel(),
+        'calendar_cost': calendar_cost.ravel(),
+        'cyclic_cost': cyclic_cost.ravel(),
+        'total_cost': (electricity + calendar_cost + cyclic_cost).ravel(),
+        'final_soh': np.broadcast_to(final_soh[None], shape).ravel(),
+    }
+
+def parse_args(args_list: Optional[List[str]] = None):
+    """Parses the command-line arguments of the re-costing tool."""
+    parser = argparse.ArgumentParser(
+        description="Re-cost recorded charging trajectories under other price data and "
+                    "degradation parameters without re-simulating.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument(
+        "trajectories", type=str,
+        help="A trajectory recording written by the simulator's --record-trajectories."
+    )
+    parser.add_argument(
+        "--output-path", type=str, required=True,
+        help="CSV file receiving one row per price file, degradation setting, run and agent."
+    )
+    parser.add_argument(
+        "--price-paths", type=str, nargs='+', default=None,
+        help="Price CSV files to cost the trajectories with. Defaults to the recorded price file."
+    )
+    parser.add_argument(
+        "--degradation-settings", type=str, default=None,
+        help="JSON list of degradation settings, each with a 'name' and any of "
+             "'calendar_soc_points', 'calendar_cost_rates', 'cyclic_c_rate_points', "
+             "'cyclic_cost_per_cycle' and 'battery_eol_cost'. Defaults to the simulator's model."
+    )
+    return parser.parse_args(args_list)
+
+def main(args_list: Optional[List[str]] = None) -> int:
+    """
+    Entry point of the re-costing tool.
+
+    Returns:
+        int: The process exit code.
+    """
+    args = parse_args(args_list)
+    for path in [args.trajectories] + (args.price_paths or []):
+        if not os.path.exists(path):
+            print(f"Error: File not found at {path}")
+            return 1
+
+    trajectories = RecordedTrajectories.load(args.trajectories)
+    price_paths = args.price_paths or [trajectories.metadata['price_path']]
+    if args.degradation_settings:
+        degradation_settings = load_degradation_settings(args.degradation_settings)
+    else:
+        degradation_settings = [DegradationSetting('default', DegradationModel())]
+
+    price_settings = [(path, step_prices(trajectories, load_price_model(path))) for path in price_paths]
+    results = recost(trajectories, price_settings, degradation_settings)
+
+    import pandas as pd
+    pd.DataFrame(results).to_csv(args.output_path, index=False)
+    print(
+        f"Re-costed {trajectories.num_series} trajectories under {len(price_settings)} price file(s) "
+        f"and {len(degradation_settings)} degradation setting(s); results saved to {args.output_path}"
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,347 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import socketserver
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import astuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, List
+
+from .cli_parser import parse_args, parse_serve_args
+from .config_manager import ConfigManager
+from .core.price_model import PriceModelCache
+
+# Options of the command line that jobs cannot use: every job runs in a single
+# worker process and returns its results instead of keeping files on the side
+_UNSUPPORTED_OPTIONS = ('checkpoint', 'resume', 'shard', 'profile', 'record_trajectories', 'price_cache')
+
+# Summary quantities averaged per agent in a job's response
+_MEAN_FIELDS = ('total_cost', 'kwh_charged', 'final_soh', 'soc_fulfillment')
+
+# Per-process caches, populated by the pool initializer
+_worker_state = {}
+
+class LRUCache:
+    """A bounded mapping that drops its least recently used entry once it is full."""
+    def __init__(self, max_entries: int):
+        """
+        Initializes an empty cache.
+
+        Args:
+            max_entries (int): The number of entries to keep.
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key, load: Callable[[], Any]):
+        """Returns the entry for a key, calling `load` to create it if it is not cached."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        value = load()
+        self._entries[key] = value
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def __len__(self) -> int:
+        """Returns the number of cached entries."""
+        return len(self._entries)
+
+def job_argv(job: dict) -> List[str]:
+    """
+    Converts an evaluation job into the equivalent command line.
+
+    The job's keys are the simulator's options without the leading dashes,
+    e.g. 'price_path' or 'price-path'. True adds a flag, False and None leave
+    an option out, lists give the values of options like 'agents' and
+    'scenarios'. 'charger_power_levels' may also be given as a JSON list.
+
+    Raises:
+        ValueError: If the job is not a JSON object.
+    """
+    if not isinstance(job, dict):
+        raise ValueError("A job must be a JSON object of command-line options.")
+    argv = []
+    for key, value in job.items():
+        option = '--' + key.replace('_', '-')
+        if key.replace('-', '_') == 'charger_power_levels' and isinstance(value, list):
+            value = json.dumps(value)
+        if value is None or value is False:
+            continue
+        if value is True:
+            argv.append(option)
+        elif isinstance(value, list):
+            argv += [option] + [str(v) for v in value]
+        else:
+            argv += [option, str(value)]
+    if 'output_path' not in {key.replace('-', '_') for key in job}:
+        # Without an output file only the summaries are returned; the parser still needs a path
+        argv += ['--output-path', os.devnull]
+    return argv
+
+class _JobArgumentParser(argparse.ArgumentParser):
+    """An ArgumentParser that raises ValueError instead of printing to stderr and exiting."""
+    def error(self, message: str):
+        raise ValueError(message)
+
+    def exit(self, status: int = 0, message: str = None):
+        raise ValueError(message.strip() if message else "Invalid job.")
+
+def parse_job(job: dict) -> argparse.Namespace:
+    """
+    Parses and checks an evaluation job like the command line would.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+
+    Raises:
+        ValueError: If the job is malformed or uses an option the server does not support.
+    """
+    raw_args = parse_args(job_argv(job), parser_class=_JobArgumentParser)
+    unsupported = [option for option in _UNSUPPORTED_OPTIONS if getattr(raw_args, option)]
+    if raw_args.workers > 1:
+        unsupported.append('workers')
+    if unsupported:
+        raise ValueError(f"Options not supported by the server: {', '.join(unsupported)}")
+    return raw_args
+
+def _init_worker(max_price_models: int, max_agents: int, max_calendars: int):
+    """Creates the caches of a worker process."""
+    _worker_state['price_models'] = PriceModelCache(max_models=max_price_models)
+    _worker_state['agents'] = LRUCache(max_agents)
+    _worker_state['calendars'] = LRUCache(max_calendars)
+
+def _file_key(path: str) -> tuple:
+    """Identifies a version of a file by its absolute path, modification time and size."""
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+def run_job(raw_args: argparse.Namespace) -> dict:
+    """
+    Runs one evaluation job in a worker process, with the price model,
+    calendar and agents taken from the worker's caches.
+
+    The job runs like the command line with the same options, in a single
+    process (`--batch` advances its runs together). With an 'output_path'
+    the rows are written there; otherwise only run-level totals are
+    computed and the summaries returned.
+
+    Args:
+        raw_args (argparse.Namespace): The job's options, as returned by `parse_job`.
+
+    Returns:
+        dict: 'runs' (one summary per run and agent), 'mean' (the mean
+              summary of each agent), 'output_path' and 'log' (the messages
+              the simulation printed).
+
+    Raises:
+        ValueError: If the job is invalid.
+        FileNotFoundError: If the price data or an agent file is missing.
+    """
+    # Imported here because the main module imports this one
+    from .agents.baseline_agent import DumbAgent
+    from .agent_loader import load_policy
+    from .core.simulation_calendar import SimulationCalendar
+    from .data_logger import LOG_BACKENDS, StreamingDataLogger, output_format
+    from .main import _execute_adaptive_runs, _execute_runs, build_base_config, check_agent_tables
+
+    if not _worker_state:
+        _init_worker(1, 1, 1)
+    output_path = raw_args.output_path if raw_args.output_path != os.devnull else None
+
+    config_manager = ConfigManager()
+    power_levels = config_manager.parse_charger_power_levels(raw_args.charger_power_levels)
+    scenarios = config_manager.parse_scenarios(raw_args.scenarios)
+    agent_configs = config_manager.parse_agents(raw_args.agents)
+    sweep = config_manager.parse_sweep(raw_args.sweep) if raw_args.sweep else None
+    if sweep is not None:
+        raw_args.batch = True
+    if raw_args.ci_tolerance is not None and sweep is not None:
+        raise ValueError("--ci-tolerance cannot be combined with --sweep.")
+    base_config = build_base_config(raw_args, power_levels, scenarios, sweep, raw_args.seed)
+    if output_path is None:
+        base_config['log_level'] = 'run'
+
+    price_model = _worker_state['price_models'].get(raw_args.price_path)
+    num_days = int(raw_args.years * 365)
+    calendar = _worker_state['calendars'].get(
+        (price_model, num_days, tuple(astuple(s) for s in scenarios)),
+        lambda: SimulationCalendar(num_days, scenarios, price_model)
+    )
+    agents_to_run = {}
+    for agent_config in agent_configs:
+        if agent_config.path == 'baseline':
+            agents_to_run[agent_config.name] = DumbAgent()
+        else:
+            # Agents trained into the same file share one model, as in build_agents
+            agents_to_run[agent_config.name] = _worker_state['agents'].get(
+                _file_key(agent_config.path), lambda: load_policy(agent_config.path)
+            )
+    check_agent_tables(agents_to_run, base_config)
+    inputs = {'price_model': price_model, 'calendar': calendar, 'agents': agents_to_run}
+
+    streaming = output_path is not None and output_format(output_path) != 'csv'
+    if output_path is not None and os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    if streaming:
+        logger = StreamingDataLogger(output_path, flush_rows=raw_args.flush_rows)
+    else:
+        logger = LOG_BACKENDS[raw_args.log_backend]()
+
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        try:
+            if raw_args.ci_tolerance is not None:
+                summaries = _execute_adaptive_runs(raw_args, base_config, agent_configs, logger, inputs=inputs)
+            else:
+                run_ids = list(range(1, raw_args.runs + 1))
+                summaries = _execute_runs(raw_args, base_config, agent_configs, logger, run_ids, inputs=inputs)
+        finally:
+            if streaming:
+                logger.close()
+    if output_path is not None and not streaming:
+        logger.get_dataframe().to_csv(output_path, index=False)
+
+    runs = []
+    for key, run in summaries.items():
+        point, run_id = key if sweep is not None else (None, key)
+        for agent, summary in run.items():
+            runs.append({'run_id': run_id, **({'point': point} if sweep is not None else {}), 'agent': agent, **summary})
+    return {'runs': runs, 'mean': _mean_summaries(runs), 'output_path': output_path, 'log': log.getvalue()}
+
+def _mean_summaries(runs: List[dict]) -> List[dict]:
+    """Averages the run summaries of each agent (and grid point of a sweep)."""
+    groups = OrderedDict()
+    for run in runs:
+        key = (run.get('point'), run['agent'])
+        groups.setdefault(key, []).append(run)
+    means = []
+    for (point, agent), group in groups.items():
+        mean = {} if point is None else {'point': point}
+        mean.update({'agent': agent, 'runs': len(group)})
+        mean.update({field: sum(run[field] for run in group) / len(group) for field in _MEAN_FIELDS})
+        means.append(mean)
+    return means
+
+class EvaluationServer:
+    """
+    Serves evaluation jobs over HTTP, on a TCP port or a Unix socket.
+
+    A job is a JSON object with the simulator's command-line options (see
+    `job_argv`), POSTed to /evaluate. Jobs run concurrently on a pool of
+    worker processes. Each worker keeps the price models, simulation
+    calendars and agents of recent jobs in LRU caches, so a stream of
+    small evaluations only pays for process startup, imports, price parsing
+    and agent loading once per worker. GET /health reports that the server
+    is up.
+    """
+    def __init__(self, workers: int = 1, max_price_models: int = 4, max_agents: int = 16, max_calendars: int = 8):
+        """
+        Initializes the EvaluationServer and starts its worker processes.
+
+        Args:
+            workers (int): The number of jobs run concurrently.
+            max_price_models (int): The price models each worker caches.
+            max_agents (int): The agent models each worker caches.
+            max_calendars (int): The simulation calendars each worker caches.
+        """
+        self.workers = workers
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(max_price_models, max_agents, max_calendars)
+        )
+        self._socket_path = None
+
+    def evaluate(self, job: dict) -> dict:
+        """
+        Runs a job on the worker pool and waits for its results (see `run_job`).
+
+        Raises:
+            ValueError: If the job is invalid.
+        """
+        # Malformed jobs are rejected before they occupy a worker
+        return self.pool.submit(run_job, parse_job(job)).result()
+
+    def make_server(self, port: int = None, socket_path: str = None, host: str = '127.0.0.1'):
+        """
+        Creates the HTTP server for a TCP port (0 picks a free one) or a Unix socket.
+
+        Returns:
+            socketserver.BaseServer: The server; run it with `serve_forever`.
+        """
+        handler = type('Handler', (_JobRequestHandler,), {'evaluation_server': self})
+        if socket_path is None:
+            return ThreadingHTTPServer((host, port), handler)
+        if os.path.exists(socket_path):
+            os.remove(socket_path) # Left behind by a server that was killed
+        self._socket_path = socket_path
+        return _ThreadingUnixHTTPServer(socket_path, handler)
+
+    def close(self):
+        """Shuts the worker pool down and removes the Unix socket, if any."""
+        self.pool.shutdown()
+        if self._socket_path is not None and os.path.exists(self._socket_path):
+            os.remove(self._socket_path)
+
+class _ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """An HTTP server on a Unix socket that handles every connection in a thread."""
+    daemon_threads = True
+
+class _JobRequestHandler(BaseHTTPRequestHandler):
+    """Answers /health and /evaluate requests for an EvaluationServer."""
+    evaluation_server: EvaluationServer = None
+
+    def do_GET(self):
+        """Reports the server's status."""
+        if self.path != '/health':
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+            return
+        self._send_json(200, {'status': 'ok', 'workers': self.evaluation_server.workers})
+
+    def do_POST(self):
+        """Runs the job in the request body and returns its results."""
+        if self.path != '/evaluate':
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+            return
+        try:
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            result = self.evaluation_server.evaluate(json.loads(body))
+        except (ValueError, FileNotFoundError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': f"{type(e).__name__}: {e}"})
+            return
+        self._send_json(200, result)
+
+    def _send_json(self, status: int, payload: dict):
+        """Writes a JSON response."""
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        """Names the client in log messages; Unix socket clients have no address."""
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix-socket'
+
+def serve_main(args_list: List[str] = None):
+    """Entry point of the 'serve' subcommand: serves evaluation jobs until interrupted."""
+    args = parse_serve_args(args_list)
+    evaluation_server = EvaluationServer(args.workers, args.max_price_models, args.max_agents, args.max_calendars)
+    server = evaluation_server.make_server(args.port, args.socket, args.host)
+    where = args.socket if args.socket is not None else f"http://{args.host}:{server.server_address[1]}"
+    print(f"--- Serving evaluation jobs on {where} with {args.workers} worker(s) ---")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        evaluation_server.close()
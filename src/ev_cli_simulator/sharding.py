@@ -0,0 +1,166 @@
+import json
+import os
+from typing import List, Tuple
+
+from .checkpoint import concat_outputs
+from .data_logger import output_format
+
+SHARD_MANIFEST_VERSION = 1
+
+# Manifest entries that every shard of one evaluation shares, most telling first
+_SHARED_KEYS = ('seed', 'num_runs', 'num_shards', 'output_format', 'config_hash')
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    Parses a shard specification 'i/N' into the shard index i (from 1) and
+    the number of shards N.
+
+    Raises:
+        ValueError: If the specification is malformed or i is not in 1..N.
+    """
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}'. Expected the format 'i/N', e.g. '2/8'.")
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{spec}': the index must be between 1 and {count}.")
+    return index, count
+
+def shard_run_ids(run_ids: List[int], index: int, count: int) -> List[int]:
+    """
+    Returns the run_ids of shard `index` of `count`: a contiguous block, with
+    block sizes differing by at most one, so that the shards' outputs
+    concatenated in shard order hold the runs in order.
+    """
+    size, remainder = divmod(len(run_ids), count)
+    start = (index - 1) * size + min(index - 1, remainder)
+    end = start + size + (1 if index <= remainder else 0)
+    return run_ids[start:end]
+
+def shard_manifest_path(output_path: str) -> str:
+    """Returns the path of the manifest written next to a shard's output file."""
+    return os.path.splitext(output_path)[0] + '.shard.json'
+
+def load_shard_manifest(output_path: str) -> dict:
+    """
+    Reads the manifest of a shard's output file.
+
+    Raises:
+        ValueError: If the output has no manifest, was written by an
+                    unsupported version or has changed since.
+    """
+    path = shard_manifest_path(output_path)
+    if not os.path.exists(path):
+        raise ValueError(f"No shard manifest found for {output_path} (expected {path}).")
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get('version') != SHARD_MANIFEST_VERSION:
+        raise ValueError(f"Unsupported shard manifest version in {path}: {manifest.get('version')}")
+    if manifest['run_ids'] and os.path.getsize(output_path) != manifest['size']:
+        raise ValueError(f"{output_path} has changed since its shard finished ({path}).")
+    return manifest
+
+def write_shard_manifest(
+    output_path: str, shard: Tuple[int, int], num_runs: int, run_ids: List[int], config_hash: str, seed: int
+) -> dict:
+    """
+    Records a finished shard next to its output file: the shard, the runs
+    it holds and the configuration hash and seed that all shards of one
+    evaluation share. The manifest is replaced atomically.
+
+    Args:
+        output_path (str): The shard's output file.
+        shard (tuple): The shard index (from 1) and the number of shards.
+        num_runs (int): The number of runs of the whole evaluation.
+        run_ids (list): The run_ids simulated by this shard.
+        config_hash (str): The content hash of the run configuration (see `config_hash`).
+        seed (int): The global seed that the run RNG streams are derived from.
+
+    Returns:
+        dict: The manifest.
+    """
+    manifest = {
+        'version': SHARD_MANIFEST_VERSION,
+        'config_hash': config_hash,
+        'seed': seed,
+        'shard': list(shard),
+        'num_shards': shard[1],
+        'num_runs': num_runs,
+        'run_ids': list(run_ids),
+        'output': os.path.basename(output_path),
+        'output_format': output_format(output_path),
+        'size': os.path.getsize(output_path) if os.path.exists(output_path) else 0,
+    }
+    path = shard_manifest_path(output_path)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+    return manifest
+
+def merge_shards(shard_paths: List[str], output_path: str) -> dict:
+    """
+    Combines the outputs of the shards of one evaluation into a single file,
+    streaming them in shard order one part (or row group) at a time, and
+    writes a manifest for the merged output that covers every shard.
+
+    Args:
+        shard_paths (list): The shards' output files, each with its manifest.
+        output_path (str): The merged output; its format must be the shards'.
+
+    Returns:
+        dict: The manifest of the merged output.
+
+    Raises:
+        ValueError: If the shards belong to different evaluations, a shard or
+                    run is missing or duplicated, or the formats differ.
+    """
+    if not shard_paths:
+        raise ValueError("No shard outputs to merge.")
+    manifests = [load_shard_manifest(path) for path in shard_paths]
+
+    first = manifests[0]
+    for path, manifest in zip(shard_paths, manifests):
+        for key in _SHARED_KEYS:
+            if manifest[key] != first[key]:
+                difference = (
+                    "its configuration, price data or agents differ" if key == 'config_hash'
+                    else f"its {key} is {manifest[key]}, not {first[key]}"
+                )
+                raise ValueError(f"{path} belongs to a different evaluation than {shard_paths[0]}: {difference}.")
+    if output_format(output_path) != first['output_format']:
+        raise ValueError(f"The shards hold {first['output_format']} data, not {output_format(output_path)}.")
+
+    shards = {}
+    for path, manifest in zip(shard_paths, manifests):
+        index = manifest['shard'][0]
+        if index in shards:
+            raise ValueError(f"Shard {index}/{first['num_shards']} is given twice: {shards[index][0]} and {path}.")
+        shards[index] = (path, manifest)
+
+    seen = set()
+    duplicated = set()
+    for _, manifest in shards.values():
+        duplicated.update(seen.intersection(manifest['run_ids']))
+        seen.update(manifest['run_ids'])
+    if duplicated:
+        raise ValueError(f"Runs {_format_run_ids(duplicated)} are held by more than one shard.")
+    missing = set(range(1, first['num_runs'] + 1)) - seen
+    if missing:
+        missing_shards = sorted(set(range(1, first['num_shards'] + 1)) - set(shards))
+        raise ValueError(
+            f"Runs {_format_run_ids(missing)} are missing"
+            + (f" (shards {', '.join(map(str, missing_shards))} not given)." if missing_shards else ".")
+        )
+
+    paths = [path for _, (path, manifest) in sorted(shards.items()) if manifest['run_ids']]
+    concat_outputs(paths, output_path, first['output_format'])
+    return write_shard_manifest(
+        output_path, (1, 1), first['num_runs'], sorted(seen), first['config_hash'], first['seed']
+    )
+
+def _format_run_ids(run_ids) -> str:
+    """Formats a set of run_ids, listing at most ten of them."""
+    run_ids = sorted(run_ids)
+    listed = ', '.join(map(str, run_ids[:10]))
+    return listed + (f" and {len(run_ids) - 10} more" if len(run_ids) > 10 else "")
@@ -0,0 +1,233 @@
+import importlib.util
+import numpy as np
+from .agents.baseline_agent import DumbAgent
+from .agents.tabular_policy import TabularPolicy
+from .core.cost_calculator import CostCalculator
+
+# numba is optional and slow to import, so it is only imported once the kernel first runs
+JIT_AVAILABLE = importlib.util.find_spec("numba") is not None
+
+# Policy kinds understood by the kernel
+_THRESHOLD_POLICY = 0
+_TABLE_POLICY = 1
+
+# EOL is defined as a 20% loss of SOH (from 1.0 to 0.8), as in SimulationEngine
+_EOL_SOH_LOSS = 0.20
+
+_compiled_kernel = None
+
+def _kernel():
+    """Returns `_simulate_days` compiled in nopython mode, or as plain Python without numba."""
+    global _compiled_kernel
+    if not JIT_AVAILABLE:
+        return _simulate_days
+    if _compiled_kernel is None:
+        import numba
+        _compiled_kernel = numba.njit(cache=True, nogil=True)(_simulate_days)
+    return _compiled_kernel
+
+def _simulate_days(
+    day_scenarios, window_steps, window_lengths, step_prices,
+    policy_kind, threshold, charge_action, idle_action, action_table, table_columns, table_soc_min, table_soc_scale,
+    action_power, action_cyclic, capacity, start_soc, start_soh, duration_h, battery_eol_cost,
+    cell_segment, segment_start, segment_end, segment_slope, segment_rate, calendar_soc_min, calendar_soc_max, cell_scale
+):
+    """
+    Simulates one agent's battery over consecutive days.
+
+    Every step repeats the arithmetic of the Python run loop: the policy's
+    action, `CostCalculator.calculate_step_costs` with cost tables,
+    `SimulationEngine.get_soh_loss` and `Battery.update_soc`. The day
+    totals are summed in step order and the SOH is clamped at the end of
+    each day, as in the replay of a day trajectory.
+
+    Returns:
+        tuple: The (days, 6) totals in the order of metrics.SUM_FIELDS and
+               the SOC and SOH at the end of every day.
+    """
+    num_days = len(day_scenarios)
+    totals = np.zeros((num_days, 6))
+    day_soc = np.empty(num_days)
+    day_soh = np.empty(num_days)
+    last_row = action_table.shape[0] - 1
+    soh = start_soh
+
+    for day in range(num_days):
+        scenario = day_scenarios[day]
+        soc = start_soc
+        electricity_sum = 0.0
+        calendar_sum = 0.0
+        cyclic_sum = 0.0
+        total_sum = 0.0
+        kwh_sum = 0.0
+
+        for position in range(window_lengths[scenario]):
+            step = window_steps[scenario, position]
+
+            # Agents observe a float32 [soc, step]
+            observed_soc = np.float32(soc)
+            if policy_kind == _THRESHOLD_POLICY:
+                action = charge_action if observed_soc < threshold else idle_action
+            else:
+                row = np.rint((np.float64(observed_soc) - table_soc_min) * table_soc_scale)
+                row = min(max(row, 0.0), last_row)
+                action = action_table[int(row), table_columns[step]]
+            power_kw = action_power[action]
+
+            energy_kwh = power_kw * duration_h
+            electricity_cost = energy_kwh * step_prices[day, step]
+
+            clamped_soc = min(max(soc, calendar_soc_min), calendar_soc_max)
+            segment = cell_segment[int((clamped_soc - calendar_soc_min) * cell_scale)]
+            if clamped_soc < segment_start[segment]:
+                segment -= 1
+            elif clamped_soc >= segment_end[segment]:
+                segment += 1
+            rate = segment_slope[segment] * (clamped_soc - segment_start[segment]) + segment_rate[segment]
+            calendar_cost = rate * duration_h
+            cyclic_cost = action_cyclic[action]
+
+            electricity_sum += electricity_cost
+            calendar_sum += calendar_cost
+            cyclic_sum += cyclic_cost
+            total_sum += electricity_cost + calendar_cost + cyclic_cost
+            kwh_sum += energy_kwh if power_kw > 0 else 0.0
+
+            soh -= ((calendar_cost + cyclic_cost) / battery_eol_cost) * _EOL_SOH_LOSS
+            soc = max(0.0, min(1.0, soc + energy_kwh / capacity))
+
+        # Losses are never negative, so clamping once a day equals clamping every step
+        soh = max(0.0, soh)
+        totals[day, 0] = electricity_sum
+        totals[day, 1] = calendar_sum
+        totals[day, 2] = cyclic_sum
+        totals[day, 3] = total_sum
+        totals[day, 4] = kwh_sum
+        totals[day, 5] = window_lengths[scenario]
+        day_soc[day] = soc
+        day_soh[day] = soh
+
+    return totals, day_soc, day_soh
+
+class StepKernel:
+    """
+    Simulates whole runs of baseline and table-based agents in one compiled
+    loop.
+
+    The battery state carries from step to step and the SOC feeds the next
+    observation, so a run cannot be vectorized in time. DumbAgent and
+    TabularPolicy only need a comparison or a table lookup per step, though,
+    so the policy, the battery update, the cost tables and the day totals
+    fit into a single nopython kernel (compiled with numba when it is
+    installed). The results are identical to those of the Python run loop.
+    Cycle counts only feed the SEI cost, which the step costs do not
+    include, so the kernel does not track them.
+    """
+    def __init__(self, config, cost_calculator: CostCalculator, battery_eol_cost: float, duration_h: float = 0.25):
+        """
+        Initializes the StepKernel.
+
+        Args:
+            config (dict): The simulation configuration.
+            cost_calculator (CostCalculator): The calculator whose cost tables the kernel evaluates.
+            battery_eol_cost (float): The EOL cost used to convert costs into SOH loss.
+            duration_h (float): The duration of a step in hours.
+        """
+        self.config = config
+        self.battery_eol_cost = float(battery_eol_cost)
+        self.duration_h = duration_h
+        self.tables = cost_calculator.tables
+
+        levels = config['charger_power_levels']
+        self._idle_index = levels.index(0) if 0 in levels else 0
+        self._charge_index = levels.index(max(levels))
+        self._level_power = [min(p, config['max_charge_speed']) for p in levels]
+
+    @staticmethod
+    def supports(agent) -> bool:
+        """Checks whether the kernel can evaluate an agent's policy."""
+        return isinstance(agent, (DumbAgent, TabularPolicy))
+
+    def applies_to(self, agents) -> bool:
+        """Checks whether the kernel can simulate a run of these agents."""
+        if not JIT_AVAILABLE or self.tables is None:
+            return False
+        if not self.tables.applies_to(self.config['battery_capacity'], self.duration_h):
+            return False
+        if any(p > 0 and self.tables.cyclic_cost(p) is None for p in self._level_power):
+            return False
+        return all(self.supports(agent) for agent in agents)
+
+    def run(self, agent, day_scenarios: np.ndarray, window_masks: np.ndarray, step_prices: np.ndarray, start_soh: float = 1.0) -> tuple:
+        """
+        Simulates one agent over a sequence of days.
+
+        Args:
+            agent (DumbAgent | TabularPolicy): The agent.
+            day_scenarios (np.ndarray): The scenario index of every day.
+            window_masks (np.ndarray): The (scenarios, steps) charging window masks.
+            step_prices (np.ndarray): The (days, steps) price of every step.
+            start_soh (float): The SOH at the beginning of the first day.
+
+        Returns:
+            tuple: The (days, len(SUM_FIELDS)) day totals, and the SOC and
+                   SOH at the end of every day.
+        """
+        tables = self.tables
+        start, end, slope, rate = tables._segment_arrays
+        window_lengths = window_masks.sum(axis=1).astype(np.int64)
+        window_steps = np.zeros((len(window_masks), max(int(window_lengths.max(initial=0)), 1)), dtype=np.int64)
+        for scenario, mask in enumerate(window_masks):
+            steps = np.flatnonzero(mask)
+            window_steps[scenario, :len(steps)] = steps
+
+        policy = self._policy_arrays(agent)
+        action_power = np.array([self._level_power[i] for i in policy['action_levels']], dtype=np.float64)
+        action_cyclic = np.array(
+            [tables.cyclic_cost(p) if p > 0 else 0.0 for p in action_power.tolist()], dtype=np.float64
+        )
+        return _kernel()(
+            np.asarray(day_scenarios, dtype=np.int64), window_steps, window_lengths,
+            np.ascontiguousarray(step_prices, dtype=np.float64),
+            policy['kind'], policy['threshold'], policy['charge_action'], policy['idle_action'],
+            policy['table'], policy['columns'], policy['soc_min'], policy['soc_scale'],
+            action_power, action_cyclic, float(self.config['battery_capacity']), float(self.config['start_soc']),
+            float(start_soh), float(self.duration_h), self.battery_eol_cost,
+            tables._cell_segment_array, start, end, slope, rate,
+            float(tables._soc_min), float(tables._soc_max), float(tables._cell_scale)
+        )
+
+    def _policy_arrays(self, agent) -> dict:
+        """
+        Describes an agent's policy in kernel arrays. Actions are indices into
+        'action_levels', which maps each action to a charger power level the
+        way `_select_power` does.
+        """
+        num_levels = len(self._level_power)
+        if isinstance(agent, TabularPolicy):
+            num_actions = max(num_levels, int(agent.actions.max(initial=0)) + 1)
+            return {
+                'kind': _TABLE_POLICY,
+                'threshold': np.float32(0.0),
+                'charge_action': 0,
+                'idle_action': 0,
+                'table': np.ascontiguousarray(agent.actions),
+                'columns': np.minimum(np.arange(96), agent.actions.shape[1] - 1).astype(np.int64),
+                'soc_min': agent.soc_min,
+                'soc_scale': agent._soc_scale,
+                # Out-of-range actions fall back to the idle level
+                'action_levels': [a if a < num_levels else self._idle_index for a in range(num_actions)],
+            }
+        target = self.config['soc_target']
+        return {
+            'kind': _THRESHOLD_POLICY,
+            # NumPy compares the float32 observation with a Python float in float32
+            'threshold': np.float32(target) if type(target) in (int, float) else np.float64(target),
+            'charge_action': self._charge_index,
+            'idle_action': self._idle_index,
+            'table': np.zeros((1, 1), dtype=np.int8),
+            'columns': np.zeros(96, dtype=np.int64),
+            'soc_min': 0.0,
+            'soc_scale': 1.0,
+            'action_levels': list(range(num_levels)),
+        }
@@ -0,0 +1,74 @@
+import itertools
+import json
+import numpy as np
+from typing import Dict, List
+
+from .config_manager import SWEEP_PARAMETERS
+
+class ParameterGrid:
+    """
+    The combinations of battery and charger parameters evaluated together by
+    a grid sweep.
+
+    `config['sweep']` maps parameter names to lists of values; every
+    combination of them is a grid point, and the parameters that are not
+    swept are taken from the config. Without a sweep the grid has a single
+    point. The batch run loop lays the grid out point-major: row
+    `p * num_runs + r` of the battery bank holds the r-th run at grid point p.
+    """
+    def __init__(self, config):
+        """
+        Initializes the ParameterGrid.
+
+        Args:
+            config (dict): The run configuration, with an optional 'sweep' entry.
+        """
+        sweep = config.get('sweep') or {}
+        self.swept = list(sweep)
+        base = {name: config[name] for name in SWEEP_PARAMETERS}
+        self.points: List[dict] = [
+            {**base, **dict(zip(self.swept, combination))}
+            for combination in itertools.product(*sweep.values())
+        ]
+
+    def __len__(self) -> int:
+        """Returns the number of grid points."""
+        return len(self.points)
+
+    def values(self, name: str) -> list:
+        """Returns the value of a parameter at every grid point."""
+        return [point[name] for point in self.points]
+
+    def row_values(self, name: str, num_runs: int) -> np.ndarray:
+        """
+        Returns a scalar parameter for every row of a point-major bank.
+
+        Returns:
+            np.ndarray: A (points * num_runs, 1) array, broadcastable over the agents.
+        """
+        return np.repeat(np.asarray(self.values(name), dtype=np.float64), num_runs)[:, None]
+
+    def capped_power_levels(self) -> List[float]:
+        """Returns every power level that a grid point can apply, capped at its charge speed."""
+        levels = {
+            min(p, point['max_charge_speed'])
+            for point in self.points for p in point['charger_power_levels']
+        }
+        return sorted(levels)
+
+    def log_columns(self, points: np.ndarray) -> Dict[str, list]:
+        """
+        Returns the columns that identify the grid point of each logged row:
+        'grid_point' followed by the value of each swept parameter.
+
+        Args:
+            points (np.ndarray): The grid point index of each row.
+        """
+        columns = {'grid_point': np.asarray(points, dtype=np.int64)}
+        for name in self.swept:
+            if name == 'charger_power_levels':
+                labels = [json.dumps(levels) for levels in self.values(name)]
+                columns[name] = [labels[p] for p in points.tolist()]
+            else:
+                columns[name] = np.asarray(self.values(name), dtype=np.float64)[points]
+        return columns
@@ -0,0 +1,303 @@
+from datetime import datetime
+import numpy as np
+from .core.battery import Battery
+from .core.cost_calculator import CostCalculator
+from .core.simulation_engine import SimulationEngine
+
+class DayTrajectory:
+    """
+    The price-independent part of one agent's charging day.
+
+    Agents only observe [soc, step] and every day starts from the same SOC, so a
+    deterministic agent takes the same actions on every day with the same
+    scenario. Its powers, SOCs and degradation costs are recorded once; only the
+    electricity cost has to be recomputed against each day's prices.
+    """
+    def __init__(self, steps: list, start_soc: float, duration_h: float):
+        """
+        Initializes an empty DayTrajectory.
+
+        Args:
+            steps (list): The steps of the day's charging window.
+            start_soc (float): The SOC at the beginning of the window.
+            duration_h (float): The duration of a step in hours.
+        """
+        self.steps = steps
+        self.duration_h = duration_h
+        self.final_soc = start_soc
+        self.power_kw = []
+        self.soc = []
+        self.calendar_cost = []
+        self.cyclic_cost = []
+        self.soh_loss = []
+
+    def append(self, power_kw: float, soc: float, calendar_cost: float, cyclic_cost: float, soh_loss: float):
+        """Records one step: the power applied, the SOC after it and its degradation."""
+        self.power_kw.append(power_kw)
+        self.soc.append(soc)
+        self.calendar_cost.append(calendar_cost)
+        self.cyclic_cost.append(cyclic_cost)
+        self.soh_loss.append(soh_loss)
+        self.final_soc = soc
+
+    def freeze(self):
+        """Builds the arrays used to cost whole days at once."""
+        self.power_array = np.array(self.power_kw, dtype=np.float64)
+        self.energy_array = self.power_array * self.duration_h
+        self.calendar_array = np.array(self.calendar_cost, dtype=np.float64)
+        self.cyclic_array = np.array(self.cyclic_cost, dtype=np.float64)
+        self.soh_loss_array = np.array(self.soh_loss, dtype=np.float64)
+
+    def replay_step(self, position: int, price: float | None, timestamp: datetime, battery: Battery) -> tuple:
+        """
+        Replays one recorded step on a battery, costed at the given price.
+
+        Args:
+            position (int): The position of the step within the window.
+            price (float | None): The electricity price of the step.
+            timestamp (datetime): The timestamp of the step, for error messages.
+            battery (Battery): The battery to advance.
+
+        Returns:
+            tuple: The power applied and a result dictionary shaped like the
+                   one returned by `SimulationEngine.run_step`.
+
+        Raises:
+            ValueError: If the step has no price.
+        """
+        if price is None:
+            raise ValueError(f"Price not found for timestamp: {timestamp}")
+        power_kw = self.power_kw[position]
+        electricity_cost = (power_kw * self.duration_h) * price
+        calendar_cost = self.calendar_cost[position]
+        cyclic_cost = self.cyclic_cost[position]
+
+        battery.soc = self.soc[position]
+        battery.degrade(self.soh_loss[position])
+        costs = {
+            "electricity_cost": electricity_cost,
+            "calendar_cost": calendar_cost,
+            "cyclic_cost": cyclic_cost,
+            "total_cost": electricity_cost + calendar_cost + cyclic_cost,
+        }
+        return power_kw, {"costs": costs, "final_soc": battery.soc, "final_soh": battery.soh}
+
+    def day_costs(self, prices: np.ndarray) -> dict:
+        """Returns the cost arrays of the whole window at the given step prices."""
+        electricity_cost = self.energy_array * prices
+        return {
+            "electricity_cost": electricity_cost,
+            "calendar_cost": self.calendar_array,
+            "cyclic_cost": self.cyclic_array,
+            "total_cost": electricity_cost + self.calendar_array + self.cyclic_array,
+        }
+
+    def final_soh(self, soh: float) -> float:
+        """Returns the SOH after the window, degrading step by step from `soh`."""
+        if not self.soh_loss:
+            return soh
+        # Losses are never negative, so clamping once at the end equals clamping every step
+        return max(0.0, float(np.subtract.accumulate(np.concatenate(([soh], self.soh_loss_array)))[-1]))
+
+class DayTrajectoryCache:
+    """
+    Memoizes the day trajectories of deterministic agents, keyed by
+    (agent, scenario, start_soc).
+    """
+    def __init__(self, config, cost_calculator: CostCalculator, battery_eol_cost: float, duration_h: float = 0.25):
+        """
+        Initializes the DayTrajectoryCache.
+
+        Args:
+            config (dict): The simulation configuration.
+            cost_calculator (CostCalculator): The calculator used for the degradation costs.
+            battery_eol_cost (float): The EOL cost used to convert costs into SOH loss.
+            duration_h (float): The duration of a step in hours.
+        """
+        self.config = config
+        self.cost_calculator = cost_calculator
+        self.battery_eol_cost = battery_eol_cost
+        self.duration_h = duration_h
+        self._entries = {}
+
+    @staticmethod
+    def is_cacheable(agent) -> bool:
+        """Checks whether an agent declares that its actions depend only on its observation."""
+        return getattr(agent, 'is_deterministic', False) is True
+
+    def get(self, agent, scenario_index: int, steps: list, start_soc: float) -> DayTrajectory:
+        """Returns the agent's trajectory for a scenario, simulating it on first use."""
+        key = (id(agent), scenario_index, start_soc)
+        entry = self._entries.get(key)
+        if entry is None:
+            # The agent is kept alongside its trajectory so that its id stays unique
+            entry = (agent, self._simulate(agent, steps, start_soc))
+            self._entries[key] = entry
+        return entry[1]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _simulate(self, agent, steps: list, start_soc: float) -> DayTrajectory:
+        """Runs the agent through one charging window on a scratch battery."""
+        # Imported here because the main module imports this one
+        from .main import _select_power
+
+        battery = Battery(self.config['battery_capacity'])
+        battery.soc = start_soc
+        engine = SimulationEngine(battery, self.cost_calculator, self.battery_eol_cost)
+        trajectory = DayTrajectory(steps, start_soc, self.duration_h)
+
+        for step in steps:
+            power_kw = _select_power(agent, battery.soc, step, self.config)
+            # The price does not affect degradation; a zero price leaves only the ageing costs
+            costs = self.cost_calculator.calculate_step_costs(
+                power_kw=power_kw,
+                duration_h=self.duration_h,
+                timestamp=None,
+                battery_capacity_kwh=battery.capacity_kwh,
+                soc=battery.soc,
+                cycle_number=1,
+                price=0.0
+            )
+            soh_loss = engine.get_soh_loss(costs['calendar_cost'] + costs['cyclic_cost'])
+            battery.update_soc(power_kw, self.duration_h)
+            trajectory.append(power_kw, battery.soc, costs['calendar_cost'], costs['cyclic_cost'], soh_loss)
+
+        trajectory.freeze()
+        return trajectory
+
+class DayTrajectoryTable:
+    """
+    The day trajectories of every (grid point, scenario, agent) of a batch,
+    laid out as (points, scenarios, agents, positions) arrays over the steps
+    of each scenario's window, padded with zeros to the longest window.
+
+    The batch run loop gathers whole days for all of its batteries from these
+    arrays instead of stepping the battery bank. Sums over the positions run
+    in step order and the padding adds nothing, so every day's totals equal
+    those of the steps simulated one at a time.
+    """
+    def __init__(self, trajectories: list, window_steps: list, steps_per_day: int):
+        """
+        Initializes the DayTrajectoryTable.
+
+        Args:
+            trajectories (list): The DayTrajectory of each point, scenario and
+                                 agent, as nested lists in that order.
+            window_steps (list): The in-window steps of each scenario.
+            steps_per_day (int): The number of steps in a day.
+        """
+        num_points, num_scenarios, num_agents = len(trajectories), len(trajectories[0]), len(trajectories[0][0])
+        num_positions = max(1, max(len(steps) for steps in window_steps))
+        shape = (num_points, num_scenarios, num_agents, num_positions)
+
+        # The step at each position of a window, and the position of each step
+        self.window_steps = np.zeros((num_scenarios, num_positions), dtype=np.intp)
+        self.in_window = np.zeros((num_scenarios, num_positions), dtype=bool)
+        self.positions = np.zeros((num_scenarios, steps_per_day), dtype=np.intp)
+        for s, steps in enumerate(window_steps):
+            self.window_steps[s, :len(steps)] = steps
+            self.in_window[s, :len(steps)] = True
+            self.positions[s, steps] = np.arange(len(steps))
+
+        self.power_kw = np.zeros(shape)
+        self.soc = np.zeros(shape)
+        self.calendar_cost = np.zeros(shape)
+        self.cyclic_cost = np.zeros(shape)
+        self.soh_loss = np.zeros(shape)
+        self.final_soc = np.zeros(shape[:3])
+        duration_h = None
+        for p, point_trajectories in enumerate(trajectories):
+            for s, scenario_trajectories in enumerate(point_trajectories):
+                for a, trajectory in enumerate(scenario_trajectories):
+                    count = len(trajectory.steps)
+                    self.power_kw[p, s, a, :count] = trajectory.power_array
+                    self.soc[p, s, a, :count] = trajectory.soc
+                    self.calendar_cost[p, s, a, :count] = trajectory.calendar_array
+                    self.cyclic_cost[p, s, a, :count] = trajectory.cyclic_array
+                    self.soh_loss[p, s, a, :count] = trajectory.soh_loss_array
+                    self.final_soc[p, s, a] = trajectory.final_soc
+                    duration_h = trajectory.duration_h
+
+        self.energy_kwh = self.power_kw * duration_h
+        kwh_charged = np.where(self.power_kw > 0, self.energy_kwh, 0.0)
+        # The price-independent day totals, as (points, scenarios, agents) arrays
+        self.calendar_total = np.cumsum(self.calendar_cost, axis=-1)[..., -1]
+        self.cyclic_total = np.cumsum(self.cyclic_cost, axis=-1)[..., -1]
+        self.kwh_total = np.cumsum(kwh_charged, axis=-1)[..., -1]
+        self.steps_total = np.broadcast_to(self.in_window.sum(axis=-1, dtype=np.float64)[:, None], shape[:3])
+
+    def replay_days(self, step_prices: np.ndarray, points: np.ndarray, scenarios: np.ndarray, soh: np.ndarray) -> dict:
+        """
+        Replays consecutive days for every battery of a batch.
+
+        Args:
+            step_prices (np.ndarray): The (days, steps_per_day) price of every step.
+            points (np.ndarray): The grid point of each bank row.
+            scenarios (np.ndarray): The (rows, days) scenario of each bank row on each day.
+            soh (np.ndarray): The (rows, agents) SOH before the first day.
+
+        Returns:
+            dict: The 'day_totals' as a (days, fields, rows, agents) array in the
+                  order of `metrics.SUM_FIELDS`, the 'soc' and 'soh' at the end
+                  of each day as (days, rows, agents) arrays, and the step values
+                  read by `step_columns`.
+        """
+        num_days = len(step_prices)
+        num_rows, num_agents = soh.shape
+        # Costs of every (point, scenario, day, agent, position), zero in the padding
+        window_prices = step_prices[:, self.window_steps].transpose(1, 0, 2)[None, :, :, None, :]
+        electricity_cost = np.where(
+            self.in_window[None, :, None, None, :], self.energy_kwh[:, :, None] * window_prices, 0.0
+        )
+        total_cost = electricity_cost + self.calendar_cost[:, :, None] + self.cyclic_cost[:, :, None]
+
+        row_points, days = points[:, None], np.arange(num_days)
+        day_totals = np.stack((
+            np.cumsum(electricity_cost, axis=-1)[..., -1][row_points, scenarios, days],
+            self.calendar_total[row_points, scenarios],
+            self.cyclic_total[row_points, scenarios],
+            np.cumsum(total_cost, axis=-1)[..., -1][row_points, scenarios, days],
+            self.kwh_total[row_points, scenarios],
+            self.steps_total[row_points, scenarios],
+        ))
+
+        # Each battery's SOH walks through the losses of its days in order. Losses
+        # are never negative, so clamping the path once equals clamping every step.
+        soh_path = np.empty((num_rows, num_agents, num_days * self.soh_loss.shape[-1] + 1))
+        soh_path[..., 0] = soh
+        soh_path[..., 1:] = self.soh_loss[
+            points[:, None, None], scenarios[:, None, :], np.arange(num_agents)[None, :, None]
+        ].reshape(num_rows, num_agents, -1)
+        np.subtract.accumulate(soh_path, axis=-1, out=soh_path)
+        soh_path = soh_path[..., 1:].reshape(num_rows, num_agents, num_days, -1)
+
+        return {
+            'day_totals': day_totals.transpose(2, 0, 1, 3),
+            'soc': self.final_soc[row_points, scenarios].transpose(1, 0, 2),
+            'soh': np.maximum(0.0, soh_path[..., -1].transpose(2, 0, 1)),
+            'electricity_cost': electricity_cost,
+            'total_cost': total_cost,
+            'soh_path': soh_path,
+        }
+
+    def step_columns(self, replay: dict, day: int, rows: np.ndarray, points: np.ndarray, scenarios: np.ndarray, steps: np.ndarray) -> dict:
+        """
+        Returns the step values of one day of `replay_days` as (entries, agents)
+        arrays, for entries given by their bank row, grid point, scenario and step.
+
+        Args:
+            replay (dict): The result of `replay_days`.
+            day (int): The position of the day among the replayed days.
+        """
+        positions = self.positions[scenarios, steps]
+        return {
+            'power_kw': self.power_kw[points, scenarios, :, positions],
+            'electricity_cost': replay['electricity_cost'][points, scenarios, day, :, positions],
+            'calendar_cost': self.calendar_cost[points, scenarios, :, positions],
+            'cyclic_cost': self.cyclic_cost[points, scenarios, :, positions],
+            'total_cost': replay['total_cost'][points, scenarios, day, :, positions],
+            'soc': self.soc[points, scenarios, :, positions],
+            'soh': np.maximum(0.0, replay['soh_path'][rows, :, day, positions]),
+        }
@@ -2,9 +2,15 @@
 
 import pytest
 import os
+import subprocess
+import sys
+from pathlib import Path
+import numpy as np
+import torch
 from stable_baselines3 import DQN
 import gymnasium as gym
-from src.ev_cli_simulator.agent_loader import load_agent
+from src.ev_cli_simulator.agent_loader import load_agent, load_policy, export_agent, exported_policy_path
+from src.ev_cli_simulator.agents.numpy_policy import NumpyQPolicy
 
 @pytest.fixture
 def dummy_agent_file(tmp_path):
@@ -33,4 +39,67 @@ def test_load_agent_file_not_found():
     """Tests if a FileNotFoundError is raised for a non-existent path."""
     invalid_path = "path/to/non_existent_agent.zip"
     with pytest.raises(FileNotFoundError):
-        load_agent(invalid_path)
\ No newline at end of file
+        load_agent(invalid_path)
+
+
+def test_exported_policy_matches_greedy_sb3_actions(dummy_agent_file):
+    """Tests that the NumPy export picks the same greedy actions as the SB3 model."""
+    model = load_agent(dummy_agent_file)
+    policy = load_policy(dummy_agent_file)
+    assert isinstance(policy, NumpyQPolicy)
+
+    obs = np.random.default_rng(0).normal(size=(500, 4)).astype(np.float32)
+    expected, _ = model.predict(obs, deterministic=True)
+    actions, _ = policy.predict(obs)
+    np.testing.assert_array_equal(actions, expected)
+
+    action, _ = policy.predict(obs[0])
+    assert action == expected[0]
+    with torch.no_grad():
+        q_values = model.q_net(torch.as_tensor(obs)).numpy()
+    np.testing.assert_allclose(policy.q_values(obs), q_values, rtol=1e-5, atol=1e-6)
+
+def test_export_is_cached_until_the_agent_changes(dummy_agent_file, mocker):
+    """Tests that the export is reused while the agent file is unchanged."""
+    export_path = export_agent(dummy_agent_file)
+    assert export_path == exported_policy_path(dummy_agent_file)
+    assert NumpyQPolicy.load(export_path).n_actions == 2
+
+    spy = mocker.patch("src.ev_cli_simulator.agent_loader.load_agent", wraps=load_agent)
+    export_agent(dummy_agent_file)
+    assert spy.call_count == 0
+
+    stat = os.stat(dummy_agent_file)
+    os.utime(dummy_agent_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    export_agent(dummy_agent_file)
+    assert spy.call_count == 1
+
+def test_load_policy_from_npz_without_torch(dummy_agent_file):
+    """Tests that an exported policy can be evaluated in a process without torch."""
+    export_path = export_agent(dummy_agent_file)
+    code = (
+        "import sys; from src.ev_cli_simulator.agent_loader import load_policy; "
+        f"load_policy({export_path!r}).predict([0.0, 0.0, 0.0, 0.0]); "
+        "assert 'torch' not in sys.modules and 'stable_baselines3' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).parents[1])
+
+def test_main_reports_agents_that_cannot_be_exported(tmp_path, monkeypatch, capsys):
+    """Tests that the CLI reports a Q-network it cannot export instead of crashing."""
+    from src.ev_cli_simulator.main import main
+
+    env = gym.make("CartPole-v1")
+    agent_path = tmp_path / "leaky_agent.zip"
+    DQN("MlpPolicy", env, policy_kwargs={'activation_fn': torch.nn.LeakyReLU}).save(agent_path)
+    price_path = tmp_path / "prices.csv"
+    price_path.write_text("ts_start,price\n2025-01-01T10:00:00Z,0.15")
+    output_path = tmp_path / "out.csv"
+    monkeypatch.setattr(sys, 'argv', [
+        'ev-sim', '--price-path', str(price_path), '--years', '1', '--runs', '1',
+        '--battery-capacity', '20', '--max-charge-speed', '7', '--start-soc', '0.3',
+        '--soc-target', '0.8', '--charger-power-levels', '[0,11]', '--agents', f'Leaky:{agent_path}',
+        '--scenarios', 'Evening:19-23:1.0', '--output-path', str(output_path)
+    ])
+    main()
+    assert "Error: Cannot export agent 'Leaky' for NumPy inference: Cannot export Q-network layer" in capsys.readouterr().out
+    assert not output_path.exists()
@@ -0,0 +1,69 @@
+import pytest
+import numpy as np
+from datetime import datetime, timezone
+from src.ev_cli_simulator.core.batch_engine import BatchSimulationEngine
+from src.ev_cli_simulator.core.battery import Battery, BatteryBank
+from src.ev_cli_simulator.core.cost_calculator import CostCalculator
+from src.ev_cli_simulator.core.degradation_model import DegradationModel
+from src.ev_cli_simulator.core.price_model import PriceModel
+from src.ev_cli_simulator.core.simulation_engine import SimulationEngine
+
+@pytest.fixture
+def cost_calculator():
+    """A CostCalculator backed by a one-hour price series."""
+    price_model = PriceModel("ts_start,price\n2025-01-01T10:00:00Z,0.15")
+    return CostCalculator(price_model, DegradationModel())
+
+def test_battery_bank_update_soc_and_degrade():
+    """Tests that the bank clamps SOC/SOH and only updates masked batteries."""
+    bank = BatteryBank(capacity_kwh=77.0, shape=(2, 2), initial_soc=0.5)
+
+    power = np.array([[11.0, 50.0], [-50.0, 11.0]])
+    mask = np.array([[True, True], [True, False]])
+    bank.update_soc(power, 2.0, where=mask)
+    bank.degrade(np.full((2, 2), 0.3), where=mask)
+    bank.degrade(np.full((2, 2), 0.8), where=mask)
+
+    assert bank.soc[0, 0] == pytest.approx(0.7857, abs=1e-4)
+    assert bank.soc[0, 1] == 1.0
+    assert bank.soc[1, 0] == 0.0
+    assert bank.soc[1, 1] == 0.5
+    assert bank.soh[0, 0] == 0.0
+    assert bank.soh[1, 1] == 1.0
+
+def test_batch_run_step_matches_scalar_engine(cost_calculator):
+    """
+    Tests that a batched step gives bit-identical costs and states to running
+    the scalar SimulationEngine once per battery.
+    """
+    timestamp = datetime(2025, 1, 1, 10, 15, tzinfo=timezone.utc)
+    power = np.array([[11.0, 0.0, -7.5], [22.0, 3.7, 11.0]])
+    start_soc = np.array([[0.1, 0.5, 0.9], [0.3, 0.75, 0.99]])
+
+    bank = BatteryBank(capacity_kwh=40.0, shape=power.shape)
+    bank.soc[:] = start_soc
+    engine = BatchSimulationEngine(bank, cost_calculator, 8000)
+    results = engine.run_step(power, 0.25, timestamp, np.ones(power.shape, dtype=bool))
+
+    for idx in np.ndindex(power.shape):
+        battery = Battery(40.0, initial_soc=start_soc[idx])
+        expected = SimulationEngine(battery, cost_calculator, 8000).run_step(
+            float(power[idx]), 0.25, timestamp, 1
+        )
+        for key, value in expected['costs'].items():
+            assert results['costs'][key][idx] == value
+        assert results['final_soc'][idx] == expected['final_soc']
+        assert results['final_soh'][idx] == expected['final_soh']
+
+def test_batch_cycle_counting(cost_calculator):
+    """Tests that a full capacity of charged energy advances the cycle counter."""
+    timestamp = datetime(2025, 1, 1, 10, 0, tzinfo=timezone.utc)
+    bank = BatteryBank(capacity_kwh=5.0, shape=(1, 2))
+    engine = BatchSimulationEngine(bank, cost_calculator, 8000)
+    power = np.array([[10.0, 0.0]])
+
+    for _ in range(2):
+        engine.run_step(power, 0.25, timestamp, np.ones((1, 2), dtype=bool))
+
+    assert engine.cycle_counts.tolist() == [[2, 1]]
+    assert engine.kwh_charged.tolist() == [[0.0, 0.0]]
@@ -0,0 +1,70 @@
+import json
+import pytest
+from benchmarks.suite import (
+    BenchmarkResult, BENCHMARKS, run_suite, save_baseline, load_baseline,
+    find_regressions, format_report, main
+)
+from benchmarks.fixtures import price_csv_text
+from src.ev_cli_simulator.core.price_model import PriceModel
+
+def _result(name="engine", latency_s=1e-6, peak=1000, ops=100):
+    return BenchmarkResult(name, ops, latency_s * ops, latency_s, 1 / latency_s, peak)
+
+def test_price_fixture_covers_the_simulation_calendar():
+    """Tests that the synthetic prices cover every local hour of 2025."""
+    from datetime import datetime, timedelta
+    from zoneinfo import ZoneInfo
+    model = PriceModel(price_csv_text())
+    start = datetime(2025, 1, 1, tzinfo=ZoneInfo("Europe/Riga"))
+    assert all(model.get_price(start + timedelta(hours=h)) is not None for h in range(0, 365 * 24, 7))
+
+def test_quick_suite_measures_every_benchmark():
+    """Tests that a reduced run of the micro-benchmarks reports sane numbers."""
+    names = [name for name in BENCHMARKS if not name.startswith("run_simulation")]
+    results = run_suite(names, scale=0.01, repeats=1)
+    assert [r.name for r in results] == names
+    for r in results:
+        assert r.ops > 0 and r.seconds > 0
+        assert r.throughput == pytest.approx(r.ops / r.seconds)
+        assert r.peak_memory_bytes >= 0
+
+@pytest.mark.parametrize("suffix", ["", "_run_level"])
+def test_batch_beats_serial_runs(suffix):
+    """Tests that simulating eight runs as one batch is faster than one after another."""
+    serial, batch = run_suite(
+        [f"run_simulation_run.baseline_8_runs{suffix}", f"run_simulation_batch.baseline_8_runs{suffix}"],
+        scale=0.1, repeats=2
+    )
+    assert batch.ops == serial.ops
+    assert batch.throughput > serial.throughput
+
+def test_regressions_past_the_thresholds_are_reported(tmp_path):
+    """Tests the baseline round trip and the regression thresholds."""
+    path = str(tmp_path / "baseline.json")
+    save_baseline([_result("engine"), _result("logger", peak=2**20)], path, scale=1.0)
+    baseline = load_baseline(path)
+    assert baseline['metadata']['scale'] == 1.0
+
+    assert find_regressions([_result("engine", latency_s=1.2e-6)], baseline) == []
+    slower = find_regressions([_result("engine", latency_s=1.3e-6)], baseline)
+    assert len(slower) == 1 and "latency 1.30x" in slower[0]
+    bigger = find_regressions([_result("logger", peak=2 * 2**20)], baseline, memory_threshold=0.5)
+    assert len(bigger) == 1 and "peak memory" in bigger[0]
+    assert find_regressions([_result("unknown", latency_s=1.0)], baseline) == []
+
+    with pytest.raises(ValueError):
+        find_regressions([_result("engine", ops=5)], baseline)
+    assert "new" in format_report([_result("unknown")], baseline)
+
+def test_cli_saves_then_fails_on_regression(tmp_path, monkeypatch):
+    """Tests the exit codes of the command-line entry point."""
+    path = str(tmp_path / "baseline.json")
+    args = ["-k", "price_model", "--quick", "--repeats", "1", "--baseline", path]
+    assert main(args + ["--save"]) == 0
+
+    with open(path) as f:
+        baseline = json.load(f)
+    baseline['benchmarks']['price_model.get_price']['latency_s'] /= 100
+    with open(path, 'w') as f:
+        json.dump(baseline, f)
+    assert main(args) == 1
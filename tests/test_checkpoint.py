@@ -0,0 +1,127 @@
+import sys
+from datetime import datetime, timedelta
+import pandas as pd
+import pytest
+from src.ev_cli_simulator import main as main_module
+from src.ev_cli_simulator.checkpoint import RunCheckpoint, checkpoint_dir, load_manifest
+from src.ev_cli_simulator.data_logger import DataLogger, read_output
+from src.ev_cli_simulator.main import main, run_seed, run_simulation_run
+
+@pytest.fixture(scope="module")
+def price_path(tmp_path_factory):
+    """Writes an hourly price CSV covering all of 2025 in local time."""
+    lines = ["ts_start,price"]
+    for day in range(365):
+        date = datetime(2025, 1, 1) + timedelta(days=day)
+        for hour in range(24):
+            lines.append(f"{date:%Y-%m-%d}T{hour:02d}:00:00+02:00,{0.02 + 0.01 * ((day + hour) % 17):.2f}")
+    path = tmp_path_factory.mktemp("prices") / "year.csv"
+    path.write_text("\n".join(lines))
+    return str(path)
+
+def run_main(monkeypatch, price_path, output_path, *extra_args, runs=4):
+    """Runs the CLI on a short one-agent configuration."""
+    monkeypatch.setattr(sys, 'argv', [
+        'ev-sim', '--price-path', price_path, '--years', '1', '--runs', str(runs),
+        '--battery-capacity', '20', '--max-charge-speed', '7', '--start-soc', '0.3',
+        '--soc-target', '0.8', '--charger-power-levels', '[-11,0,11]',
+        '--agents', 'DumbAgent:baseline', '--scenarios', 'Evening:19-23:0.5', 'Night:22-02:0.5',
+        '--output-path', str(output_path), '--log-level', 'day', *extra_args
+    ])
+    main()
+
+def sorted_rows(df):
+    """Orders rows by run, so batches that interleave runs compare equal."""
+    return df.sort_values(['run_id', 'day', 'agent_type'], kind='stable').reset_index(drop=True)
+
+@pytest.mark.parametrize("extension", ['csv', 'parquet', 'arrow'])
+@pytest.mark.parametrize("extra_args", [[], ['--batch'], ['--workers', '2']])
+def test_checkpointed_output_matches_plain_output(price_path, tmp_path, monkeypatch, extension, extra_args):
+    """Tests that stitching the per-run parts reproduces the plain output."""
+    plain_path = tmp_path / f"plain.{extension}"
+    checkpointed_path = tmp_path / f"checkpointed.{extension}"
+    run_main(monkeypatch, price_path, plain_path, '--seed', '3', *extra_args)
+    run_main(monkeypatch, price_path, checkpointed_path, '--seed', '3', '--checkpoint', *extra_args)
+
+    pd.testing.assert_frame_equal(
+        sorted_rows(read_output(str(checkpointed_path))), sorted_rows(read_output(str(plain_path)))
+    )
+    manifest = load_manifest(checkpoint_dir(str(checkpointed_path)))
+    assert manifest['seed'] == 3
+    assert manifest['output_format'] == extension
+    assert {int(run_id): entry['rng_seed'] for run_id, entry in manifest['runs'].items()} == {
+        run_id: run_seed(3, run_id) for run_id in range(1, 5)
+    }
+
+def test_resume_skips_finished_runs(price_path, tmp_path, monkeypatch):
+    """
+    Tests that a killed checkpointed simulation resumes with the runs that
+    had not finished and ends with the output of an uninterrupted one.
+    """
+    output_path = tmp_path / "results.csv"
+    simulated = []
+
+    def crash_in_run_3(config, *args, **kwargs):
+        if config['run_id'] == 3:
+            raise KeyboardInterrupt
+        simulated.append(config['run_id'])
+        return run_simulation_run(config, *args, **kwargs)
+
+    monkeypatch.setattr(main_module, 'run_simulation_run', crash_in_run_3)
+    with pytest.raises(KeyboardInterrupt):
+        run_main(monkeypatch, price_path, output_path, '--checkpoint')
+    assert not output_path.exists()
+    seed = load_manifest(checkpoint_dir(str(output_path)))['seed']
+
+    def record_run(config, *args, **kwargs):
+        simulated.append(config['run_id'])
+        return run_simulation_run(config, *args, **kwargs)
+
+    monkeypatch.setattr(main_module, 'run_simulation_run', record_run)
+    run_main(monkeypatch, price_path, output_path, '--resume')
+    assert simulated == [1, 2, 3, 4]
+
+    uninterrupted_path = tmp_path / "uninterrupted.csv"
+    run_main(monkeypatch, price_path, uninterrupted_path, '--seed', str(seed))
+    pd.testing.assert_frame_equal(pd.read_csv(output_path), pd.read_csv(uninterrupted_path))
+
+def test_resume_rejects_a_changed_configuration(price_path, tmp_path, monkeypatch, capsys):
+    """Tests that resuming with other parameters is refused."""
+    output_path = tmp_path / "results.csv"
+    run_main(monkeypatch, price_path, output_path, '--checkpoint', '--seed', '1', runs=2)
+    output_path.unlink()
+    capsys.readouterr()
+
+    run_main(monkeypatch, price_path, output_path, '--resume', '--seed', '2', runs=2)
+    assert "different configuration or seed" in capsys.readouterr().out
+    assert not output_path.exists()
+
+def test_resume_with_more_runs_extends_the_checkpoint(price_path, tmp_path, monkeypatch):
+    """Tests that resuming with a larger --runs only simulates the new runs."""
+    output_path = tmp_path / "results.parquet"
+    run_main(monkeypatch, price_path, output_path, '--checkpoint', '--seed', '5', runs=2)
+    run_main(monkeypatch, price_path, output_path, '--resume', runs=3)
+
+    df = read_output(str(output_path))
+    assert sorted(df['run_id'].unique()) == [1, 2, 3]
+    assert sorted(load_manifest(checkpoint_dir(str(output_path)))['runs']) == ['1', '2', '3']
+
+def test_checkpoint_without_resume_starts_over(tmp_path):
+    """Tests that a new checkpoint discards the parts of an earlier one."""
+    directory = tmp_path / "results.parts"
+    output_path = str(tmp_path / "results.csv")
+    log = DataLogger()
+    log.log_step(run_id=1, value=1.0)
+
+    checkpoint = RunCheckpoint(str(directory), output_path, 'hash', 0, DataLogger)
+    checkpoint.save_runs([1], log)
+    assert (directory / "run_000001.csv").exists()
+
+    resumed = RunCheckpoint(str(directory), output_path, 'hash', 0, DataLogger, resume=True)
+    assert resumed.pending([1, 2]) == [2]
+
+    fresh = RunCheckpoint(str(directory), output_path, 'hash', 0, DataLogger)
+    assert fresh.pending([1, 2]) == [1, 2]
+    assert not (directory / "run_000001.csv").exists()
+    with pytest.raises(ValueError):
+        fresh.stitch([1])
@@ -35,4 +35,39 @@ def test_parse_args():
     assert args.agents[0] == 'AgentV1:path/to/agent1.zip'
     assert args.agents[2] == 'DumbAgent:baseline'
     assert len(args.scenarios) == 2
-    assert args.output_path == 'results/'
\ No newline at end of file
+    assert args.output_path == 'results/'
+
+REQUIRED_ARGS = [
+    '--price-path', 'data/prices.csv', '--years', '1', '--runs', '4',
+    '--battery-capacity', '77.0', '--max-charge-speed', '11.0',
+    '--start-soc', '0.3', '--soc-target', '0.8',
+    '--charger-power-levels', '[0,11]', '--agents', 'DumbAgent:baseline',
+    '--scenarios', 'Always:00-24:1.0', '--output-path', 'results/out.csv'
+]
+
+def test_parse_args_optional_defaults():
+    """Tests the defaults of the optional execution arguments."""
+    args = parse_args(REQUIRED_ARGS)
+    assert args.batch is False
+    assert args.workers == 1
+    assert args.seed is None
+    assert args.log_backend == 'records'
+    assert args.log_level == 'step'
+    assert args.profile is False
+    assert args.checkpoint is False
+    assert args.resume is False
+    assert args.sweep is None
+    assert args.record_trajectories is None
+    assert args.price_cache is False
+    assert args.no_jit is False
+    assert args.ci_tolerance is None
+    assert args.max_runs == 1000
+    assert args.confidence == 0.95
+    assert args.shard is None
+
+def test_parse_args_parallel_options():
+    """Tests parsing of the parallel execution arguments."""
+    args = parse_args(REQUIRED_ARGS + ['--workers', '8', '--seed', '123', '--batch'])
+    assert args.workers == 8
+    assert args.seed == 123
+    assert args.batch is True
@@ -35,3 +35,27 @@ def test_parse_agents_invalid_format():
     config_manager = ConfigManager()
     with pytest.raises(ValueError):
         config_manager.parse_agents(invalid_agent_string)
+
+def test_parse_sweep():
+    """Tests parsing of value lists, inclusive ranges and power level lists."""
+    sweep = ConfigManager().parse_sweep([
+        "battery-capacity=40,60,80", "soc_target=0.6:0.9:0.1", "charger_power_levels=[0,7.4];[-11,0,11]"
+    ])
+    assert sweep == {
+        'battery_capacity': [40.0, 60.0, 80.0],
+        'soc_target': [0.6, 0.7, 0.8, 0.9],
+        'charger_power_levels': [[0.0, 7.4], [-11.0, 0.0, 11.0]],
+    }
+
+@pytest.mark.parametrize("sweep_string", [
+    "years=1,2", "battery_capacity", "soc_target=0.9:0.6:0.1", "soc_target=0.6:0.9:0", "start_soc=a,b"
+])
+def test_parse_sweep_invalid(sweep_string):
+    """Tests that unknown parameters and malformed values are rejected."""
+    with pytest.raises(ValueError):
+        ConfigManager().parse_sweep([sweep_string])
+
+def test_parse_sweep_rejects_repeated_parameter():
+    """Tests that a parameter can only be swept once."""
+    with pytest.raises(ValueError):
+        ConfigManager().parse_sweep(["soc_target=0.7", "soc_target=0.8"])
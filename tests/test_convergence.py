@@ -0,0 +1,130 @@
+import sys
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from src.ev_cli_simulator.convergence import ConvergenceMonitor, RunningStats, t_quantile
+from src.ev_cli_simulator.data_logger import read_output
+from src.ev_cli_simulator.main import main
+
+def test_running_stats_match_batch_statistics():
+    """Tests that the streaming mean and variance equal those of the whole sample."""
+    rng = np.random.default_rng(0)
+    values = rng.normal(1000.0, 25.0, size=(200, 3))
+    stats = RunningStats(3)
+    for row in values:
+        stats.add(row)
+    assert stats.count == 200
+    np.testing.assert_allclose(stats.mean, values.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(stats.variance, values.var(axis=0, ddof=1), rtol=1e-10)
+    assert np.isinf(RunningStats(3).half_width(0.95)).all()
+
+@pytest.mark.parametrize("dof, expected", [(4, 2.7764), (9, 2.2622), (30, 2.0423), (1000, 1.9623)])
+def test_t_quantile(dof, expected):
+    """Tests the t quantile approximation against tabulated 97.5% quantiles."""
+    assert t_quantile(0.975, dof) == pytest.approx(expected, abs=1e-3)
+
+def _summaries(costs: dict, first_run_id: int = 1) -> dict:
+    """Builds run summaries from per-agent lists of run total costs."""
+    num_runs = len(next(iter(costs.values())))
+    return {
+        first_run_id + r: {
+            agent: {'total_cost': values[r], 'final_soh': 0.9, 'soc_fulfillment': 1.0}
+            for agent, values in costs.items()
+        }
+        for r in range(num_runs)
+    }
+
+def test_monitor_converges_on_clear_cut_difference():
+    """
+    Tests that a large, consistent difference between two agents converges,
+    while the same noise around two agents that perform alike does not.
+    """
+    rng = np.random.default_rng(1)
+    scenario_cost = rng.normal(500.0, 5.0, size=10)
+
+    clear_cut = ConvergenceMonitor(['A', 'B'], tolerance=0.05)
+    clear_cut.add_runs(_summaries({'A': scenario_cost, 'B': scenario_cost + 50.0 + rng.normal(0, 1.0, 10)}))
+    assert clear_cut.converged()
+
+    alike = ConvergenceMonitor(['A', 'B'], tolerance=0.05)
+    alike.add_runs(_summaries({'A': scenario_cost, 'B': scenario_cost + rng.normal(0, 1.0, 10)}))
+    assert alike.unconverged() == ['A - B total_cost']
+
+def test_monitor_waits_for_min_runs():
+    """Tests that identical runs only converge once the minimum number of runs is reached."""
+    monitor = ConvergenceMonitor(['A', 'B'], tolerance=0.01, min_runs=5)
+    monitor.add_runs(_summaries({'A': [100.0] * 4, 'B': [100.0] * 4}))
+    assert not monitor.converged()
+    monitor.add_runs(_summaries({'A': [100.0], 'B': [100.0]}, first_run_id=5))
+    assert monitor.runs == 5
+    assert monitor.converged()
+    assert 'A - B total_cost' in monitor.format_summary()
+
+def test_monitor_adds_runs_in_run_order():
+    """Tests that the statistics do not depend on the order in which runs finished."""
+    summaries = _summaries({'A': [101.0, 97.5, 130.25, 88.0], 'B': [3.0, 1.0, 4.0, 1.5]})
+    forward, backward = ConvergenceMonitor(['A', 'B'], 0.1), ConvergenceMonitor(['A', 'B'], 0.1)
+    forward.add_runs(summaries)
+    backward.add_runs(dict(reversed(list(summaries.items()))))
+    np.testing.assert_array_equal(forward.stats.mean, backward.stats.mean)
+    np.testing.assert_array_equal(forward.stats.variance, backward.stats.variance)
+
+def test_monitor_rejects_invalid_settings():
+    """Tests that a non-positive tolerance and an invalid confidence level raise ValueError."""
+    with pytest.raises(ValueError):
+        ConvergenceMonitor(['A'], tolerance=0.0)
+    with pytest.raises(ValueError):
+        ConvergenceMonitor(['A'], tolerance=0.1, confidence=1.0)
+
+@pytest.fixture(scope="module")
+def price_path(tmp_path_factory):
+    """Writes an hourly price CSV covering all of 2025 in local time."""
+    lines = ["ts_start,price"]
+    for day in range(365):
+        date = datetime(2025, 1, 1) + timedelta(days=day)
+        for hour in range(24):
+            lines.append(f"{date:%Y-%m-%d}T{hour:02d}:00:00+02:00,{0.02 + 0.01 * ((day + hour) % 17):.2f}")
+    path = tmp_path_factory.mktemp("prices") / "year.csv"
+    path.write_text("\n".join(lines))
+    return str(path)
+
+def run_main(monkeypatch, price_path, output_path, *extra_args):
+    """Runs the CLI on a short two-agent configuration."""
+    monkeypatch.setattr(sys, 'argv', [
+        'ev-sim', '--price-path', price_path, '--years', '1', '--runs', '5',
+        '--battery-capacity', '20', '--max-charge-speed', '7', '--start-soc', '0.3',
+        '--soc-target', '0.8', '--charger-power-levels', '[-11,0,11]',
+        '--agents', 'First:baseline', 'Second:baseline',
+        '--scenarios', 'Evening:19-23:0.5', 'Night:22-02:0.5',
+        '--output-path', str(output_path), '--log-level', 'run', '--seed', '3', *extra_args
+    ])
+    main()
+    return read_output(str(output_path))
+
+@pytest.mark.parametrize("extra_args", [[], ['--batch'], ['--workers', '2']])
+def test_adaptive_runs_stop_at_tolerance_or_cap(price_path, tmp_path, monkeypatch, capsys, extra_args):
+    """
+    Tests that adaptive runs stop after the first round once converged, stop
+    at --max-runs otherwise, and log the same rows as a fixed number of runs.
+    """
+    loose = run_main(monkeypatch, price_path, tmp_path / "loose.csv", '--ci-tolerance', '0.5', *extra_args)
+    assert sorted(loose['run_id'].unique()) == [1, 2, 3, 4, 5]
+    assert "Converged to a relative tolerance of 0.5 after 5 runs" in capsys.readouterr().out
+
+    capped = run_main(
+        monkeypatch, price_path, tmp_path / "capped.csv", '--ci-tolerance', '1e-9', '--max-runs', '7', *extra_args
+    )
+    assert "Stopped at --max-runs 7" in capsys.readouterr().out
+    fixed = run_main(monkeypatch, price_path, tmp_path / "fixed.csv", '--runs', '7', *extra_args)
+    assert capped.equals(fixed)
+
+def test_adaptive_rounds_share_one_worker_pool(price_path, tmp_path, monkeypatch, capsys, mocker):
+    """Tests that parallel adaptive runs start their worker processes once, not once per round."""
+    import src.ev_cli_simulator.parallel as parallel
+    pools = mocker.spy(parallel, 'ProcessPoolExecutor')
+    run_main(
+        monkeypatch, price_path, tmp_path / "capped.csv", '--ci-tolerance', '1e-9', '--max-runs', '12',
+        '--workers', '2'
+    )
+    assert "Stopped at --max-runs 12" in capsys.readouterr().out
+    assert pools.call_count == 1
@@ -1,6 +1,8 @@
+import numpy as np
 import pytest
 from datetime import datetime, timezone
 from src.ev_cli_simulator.core.cost_calculator import CostCalculator
+from src.ev_cli_simulator.core.degradation_model import DegradationModel
 from src.ev_cli_simulator.core.price_model import PriceModel
 
 # --- Mock Objects for Testing ---
@@ -62,4 +64,59 @@ def test_calculate_step_costs(calculator_setup):
     assert costs['cyclic_cost'] == pytest.approx(0.3)
     
     # Expected total cost: 1.65 + 0.1 + 0.3 = 2.05
-    assert costs['total_cost'] == pytest.approx(2.05)
\ No newline at end of file
+    assert costs['total_cost'] == pytest.approx(2.05)
+@pytest.fixture
+def compiled_calculators():
+    """A plain and a table-compiled CostCalculator over the same models."""
+    price_model = PriceModel("ts_start,price\n2025-01-01T10:00:00Z,0.15")
+    degradation_model = DegradationModel()
+    plain = CostCalculator(price_model, degradation_model)
+    compiled = CostCalculator(
+        price_model, degradation_model,
+        power_levels=[-11, 0, 3.7, 7, 11], battery_capacity_kwh=60.0, duration_h=0.25
+    )
+    return plain, compiled
+
+def _soc_samples():
+    """Random SOCs plus the interpolation points, cell edges and their neighbours."""
+    edges = np.concatenate([[0.0, 0.5, 1.0], np.arange(1025) / 1024])
+    return np.concatenate([
+        np.random.default_rng(0).uniform(-0.05, 1.05, 5000),
+        edges, np.nextafter(edges, -1.0), np.nextafter(edges, 2.0)
+    ])
+
+def test_compiled_step_costs_match_degradation_model(compiled_calculators):
+    """Tests that the scalar table lookups reproduce the model's costs exactly."""
+    plain, compiled = compiled_calculators
+    timestamp = datetime(2025, 1, 1, 10, tzinfo=timezone.utc)
+    for power_kw in (-11, 0, 3.7, 7, 11):
+        for soc in _soc_samples()[::7]:
+            expected = plain.calculate_step_costs(power_kw, 0.25, timestamp, 60.0, soc, 1)
+            assert compiled.calculate_step_costs(power_kw, 0.25, timestamp, 60.0, soc, 1) == expected
+
+def test_compiled_batch_costs_match_degradation_model(compiled_calculators):
+    """Tests that the array table lookups reproduce the model's costs exactly."""
+    plain, compiled = compiled_calculators
+    timestamp = datetime(2025, 1, 1, 10, tzinfo=timezone.utc)
+    soc = _soc_samples()
+    power_kw = np.resize(np.array([-11.0, 0.0, 3.7, 7.0, 11.0]), soc.shape)
+
+    expected = plain.calculate_batch_costs(power_kw, 0.25, timestamp, 60.0, soc)
+    actual = compiled.calculate_batch_costs(power_kw, 0.25, timestamp, np.full(soc.shape, 60.0), soc)
+    for key in expected:
+        np.testing.assert_array_equal(actual[key], expected[key])
+
+def test_compiled_costs_fall_back_outside_the_tables(compiled_calculators):
+    """Tests that untabulated powers, capacities and durations use the model."""
+    plain, compiled = compiled_calculators
+    timestamp = datetime(2025, 1, 1, 10, tzinfo=timezone.utc)
+    for args in ((5.0, 0.25, 60.0), (11, 0.5, 60.0), (11, 0.25, 40.0)):
+        power_kw, duration_h, capacity = args
+        expected = plain.calculate_step_costs(power_kw, duration_h, timestamp, capacity, 0.4, 1)
+        assert compiled.calculate_step_costs(power_kw, duration_h, timestamp, capacity, 0.4, 1) == expected
+
+    power_kw = np.array([5.0, 11.0, 0.0])
+    soc = np.array([0.2, 0.6, 0.9])
+    expected = plain.calculate_batch_costs(power_kw, 0.25, timestamp, 60.0, soc)
+    actual = compiled.calculate_batch_costs(power_kw, 0.25, timestamp, 60.0, soc)
+    np.testing.assert_array_equal(actual['cyclic_cost'], expected['cyclic_cost'])
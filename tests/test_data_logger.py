@@ -40,4 +40,127 @@ def test_data_logger():
         "run_id", "day", "timestamp", "agent_type", "soc", "soh"
     ]
     assert df.iloc[0]['soc'] == 0.5
-    assert df.iloc[1]['soh'] == 0.98
\ No newline at end of file
+    assert df.iloc[1]['soh'] == 0.98
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import numpy as np
+import pytest
+from src.ev_cli_simulator.data_logger import ColumnarDataLogger, Timestamps
+
+RIGA = ZoneInfo("Europe/Riga")
+
+def _log_sample_steps(logger):
+    """Logs rows shaped like the simulation's, across a DST change."""
+    for day, (agent, scenario, power) in enumerate([
+        ("Smart", "Workday", 11), ("Dumb", "Holiday", 7.5), ("Smart", "Holiday", -11)
+    ]):
+        logger.log_step(
+            run_id=1, day=day, timestamp=datetime(2025, 3 + 3 * day, 1, 19, tzinfo=RIGA),
+            agent_type=agent, charging_scenario=scenario,
+            power_kw=power, soc=0.5 + day / 10
+        )
+
+def test_columnar_data_logger_matches_records():
+    """
+    Tests that the columnar logger returns the same data as the record logger,
+    with categorical strings and time-zone aware timestamps.
+    """
+    records, columnar = DataLogger(), ColumnarDataLogger(chunk_rows=2)
+    _log_sample_steps(records)
+    _log_sample_steps(columnar)
+
+    df = columnar.get_dataframe()
+    assert len(columnar) == 3
+    assert isinstance(df['agent_type'].dtype, pd.CategoricalDtype)
+    assert str(df['timestamp'].dtype) == "datetime64[us, Europe/Riga]"
+    assert df['power_kw'].dtype == np.float64  # promoted from int on the 7.5 row
+    pd.testing.assert_frame_equal(
+        df.astype({'agent_type': str, 'charging_scenario': str}), records.get_dataframe()
+    )
+
+def test_columnar_log_columns_and_merge():
+    """Tests bulk logging and merging loggers whose category codes differ."""
+    first, second = ColumnarDataLogger(), ColumnarDataLogger()
+    first.log_columns(run_id=[1, 1], agent_type=["A", "B"], soc=np.array([0.1, 0.2]))
+    second.log_columns(run_id=2, agent_type=["B", "C"], soc=[0.3, 0.4])
+    first.merge(second)
+
+    df = first.get_dataframe()
+    assert df['run_id'].tolist() == [1, 1, 2, 2]
+    assert df['agent_type'].astype(str).tolist() == ["A", "B", "B", "C"]
+    assert df['soc'].tolist() == [0.1, 0.2, 0.3, 0.4]
+
+    merged_into_empty = ColumnarDataLogger()
+    merged_into_empty.merge(first)
+    pd.testing.assert_frame_equal(merged_into_empty.get_dataframe(), df)
+
+def test_timestamps_column_matches_datetimes():
+    """Tests that epoch Timestamps log the same rows as the datetimes they stand for."""
+    times = [datetime(2025, 3, 30, 2, 45, tzinfo=RIGA), datetime(2025, 3, 30, 4, 0, tzinfo=RIGA)]
+    epochs = Timestamps([int(t.timestamp()) for t in times], RIGA)
+    for logger_class in (DataLogger, ColumnarDataLogger):
+        expected, logged = logger_class(), logger_class()
+        expected.log_columns(run_id=1, timestamp=times, soc=[0.1, 0.2])
+        logged.log_columns(run_id=1, timestamp=epochs, soc=[0.1, 0.2])
+        pd.testing.assert_frame_equal(logged.get_dataframe(), expected.get_dataframe())
+
+def test_columnar_rejects_changed_columns():
+    """Tests that a step with different columns raises a ValueError."""
+    logger = ColumnarDataLogger()
+    logger.log_step(run_id=1, soc=0.5)
+    with pytest.raises(ValueError):
+        logger.log_step(run_id=1, soh=0.9)
+    assert ColumnarDataLogger().get_dataframe().empty
+
+
+from src.ev_cli_simulator.data_logger import StreamingDataLogger, read_output
+
+@pytest.mark.parametrize("file_name", ["log.parquet", "log.arrow"])
+def test_streaming_logger_flushes_row_groups(tmp_path, file_name):
+    """Tests that rows are written every flush_rows rows and read back intact."""
+    path = str(tmp_path / file_name)
+    logger = StreamingDataLogger(path, flush_rows=2)
+    _log_sample_steps(logger)
+
+    assert logger.rows_written == 2
+    assert len(logger) == 3
+
+    logger.end_run()
+    assert logger.rows_written == 3
+
+    expected = DataLogger()
+    _log_sample_steps(expected)
+    df = logger.get_dataframe()
+    assert isinstance(df['agent_type'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(
+        df.astype({'agent_type': str, 'charging_scenario': str}), expected.get_dataframe()
+    )
+
+def test_streaming_arrow_is_readable_before_close(tmp_path):
+    """Tests that an Arrow stream keeps the flushed rows if never closed."""
+    path = str(tmp_path / "partial.arrow")
+    logger = StreamingDataLogger(path, flush_rows=2)
+    _log_sample_steps(logger)
+    logger._sink.flush()
+
+    assert read_output(path)['day'].tolist() == [0, 1]
+
+def test_streaming_logger_rejects_unknown_format(tmp_path):
+    """Tests that a non-streaming format is refused."""
+    with pytest.raises(ValueError):
+        StreamingDataLogger(str(tmp_path / "log.csv"))
+
+@pytest.mark.parametrize("file_name", ["log.parquet", "log.arrow"])
+def test_streaming_logger_promotes_written_int_columns(tmp_path, file_name):
+    """Tests that an int column that turns float after the first flush is rewritten as float."""
+    path = str(tmp_path / file_name)
+    logger = StreamingDataLogger(path, flush_rows=2)
+    for day, power_kw in enumerate([0, 11, 11, 3.5, 0]):
+        logger.log_step(run_id=1, day=day, power_kw=power_kw)
+    df = logger.get_dataframe()
+
+    assert logger.rows_written == 5
+    assert df['power_kw'].tolist() == [0.0, 11.0, 11.0, 3.5, 0.0]
+    assert df['power_kw'].dtype == np.float64 and df['day'].dtype == np.int64
+    assert sorted(p.name for p in tmp_path.iterdir()) == [file_name]
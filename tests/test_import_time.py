@@ -0,0 +1,68 @@
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parents[1]
+
+# Cumulative import time of the CLI module, in seconds. Tracks the cost paid by
+# every invocation before argument parsing; raise deliberately, not casually.
+IMPORT_TIME_BUDGET_S = 0.5
+
+HEAVY_MODULES = ("pandas", "torch", "stable_baselines3", "pyarrow")
+
+def _run_python(code: str, *args) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+
+def _loaded_heavy_modules(code: str) -> list:
+    """Runs `code` in a fresh interpreter and returns the heavy modules it loaded."""
+    probe = f"{code}\nimport sys; print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    return eval(_run_python(probe).stdout.strip().splitlines()[-1])
+
+def test_cli_import_loads_no_heavy_dependencies():
+    """Tests that importing the CLI and printing --help skips pandas, torch and SB3."""
+    assert _loaded_heavy_modules("import src.ev_cli_simulator.main") == []
+    help_code = (
+        "import sys\nfrom src.ev_cli_simulator.main import main\nsys.argv = ['ev-sim', '--help']\n"
+        "try:\n    main()\nexcept SystemExit:\n    pass"
+    )
+    assert _loaded_heavy_modules(help_code) == []
+
+def test_cli_import_defers_numba():
+    """Tests that the optional step kernel only imports numba once it runs."""
+    probe = "import sys\nimport src.ev_cli_simulator.main\nprint('numba' in sys.modules)"
+    assert _run_python(probe).stdout.strip().splitlines()[-1] == "False"
+
+def test_baseline_run_without_output_loads_no_heavy_dependencies(tmp_path):
+    """Tests that a baseline-only simulation run needs neither pandas nor SB3."""
+    price_path = tmp_path / "prices.csv"
+    price_path.write_text("ts_start,price\n" + "\n".join(
+        f"2025-01-01 {hour:02d}:00:00+02:00,0.1" for hour in range(24)
+    ))
+    code = (
+        "from src.ev_cli_simulator.main import run_simulation_run, DumbAgent\n"
+        "from src.ev_cli_simulator.data_logger import ColumnarDataLogger\n"
+        "from src.ev_cli_simulator.config_manager import ScenarioConfig\n"
+        "run_simulation_run({'run_id': 1, 'years': 1/365, 'battery_capacity': 20.0,"
+        " 'max_charge_speed': 7.0, 'charger_power_levels': [0, 7], 'soc_target': 0.8,"
+        " 'start_soc': 0.3, 'scenarios': [ScenarioConfig('Evening', 19, 23, 1.0)],"
+        f" 'price_path': {str(price_path)!r}}}, {{'DumbAgent': DumbAgent()}}, ColumnarDataLogger())"
+    )
+    assert _loaded_heavy_modules(code) == []
+
+def test_cli_import_time_budget():
+    """Tests that the cumulative import time of the CLI module stays within budget."""
+    timings = []
+    for _ in range(3):
+        result = _run_python("import src.ev_cli_simulator.main", "-X", "importtime")
+        match = re.search(r"\|\s*(\d+)\s*\|\s*src\.ev_cli_simulator\.main\s*$", result.stderr, re.MULTILINE)
+        timings.append(int(match.group(1)) / 1e6)
+
+    best = min(timings)
+    assert best < IMPORT_TIME_BUDGET_S, (
+        f"CLI import took {best:.3f}s (best of {', '.join(f'{t:.3f}s' for t in timings)}), "
+        f"budget is {IMPORT_TIME_BUDGET_S}s"
+    )
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from src.ev_cli_simulator.inference import BatchInference
+from src.ev_cli_simulator.main import DumbAgent, _select_power
+
+CONFIG = {
+    'charger_power_levels': [-11, 0, 7, 11],
+    'max_charge_speed': 7.0,
+    'soc_target': 0.8,
+}
+
+def test_dumb_agent_predict_batch_matches_predict():
+    """Tests that the vectorized DumbAgent agrees with its scalar predict."""
+    agent = DumbAgent()
+    obs = np.empty((200, 2), dtype=np.float32)
+    obs[:, 0] = np.linspace(0.0, 1.0, 200)
+    obs[:, 1] = 80
+
+    actions = agent.predict_batch(obs, CONFIG['charger_power_levels'], CONFIG['soc_target'])
+    expected = [agent.predict(o, CONFIG['charger_power_levels'], CONFIG['soc_target'])[0] for o in obs]
+    assert actions.tolist() == expected
+
+def test_select_power_matches_scalar_selection():
+    """Tests that batched power selection equals the per-battery selection."""
+    rng = np.random.default_rng(0)
+    soc = rng.uniform(0.0, 1.0, size=(5, 3))
+    soc[0, 0] = 0.8
+    agents = {"A": DumbAgent(), "B": DumbAgent(), "C": DumbAgent()}
+    active_runs = np.array([0, 2, 3])
+
+    power = BatchInference(agents, CONFIG).select_power(soc, 77, active_runs)
+
+    for r in range(5):
+        for a, agent in enumerate(agents.values()):
+            expected = _select_power(agent, soc[r, a], 77, CONFIG) if r in active_runs else 0.0
+            assert power[r, a] == expected
+
+def test_shared_model_is_called_once_per_step():
+    """Tests that batteries using the same model are batched into one call."""
+    model = MagicMock()
+    model.predict.side_effect = lambda obs: (np.array([3, 1, 9, 0])[:len(obs)], None)
+    agents = {"Smart1": model, "Smart2": model}
+
+    soc = np.array([[0.1, 0.2], [0.3, 0.4]])
+    power = BatchInference(agents, CONFIG).select_power(soc, 5, np.array([0, 1]))
+
+    assert model.predict.call_count == 1
+    obs = model.predict.call_args.args[0]
+    assert obs.dtype == np.float32
+    np.testing.assert_array_equal(obs[:, 0], np.float32([0.1, 0.2, 0.3, 0.4]))
+    assert (obs[:, 1] == 5).all()
+    # Actions past the last power level fall back to idling; power is capped
+    assert power.tolist() == [[7.0, 0.0], [0.0, -11.0]]
+
+def test_sb3_model_batch_matches_single_predictions():
+    """Tests that a DQN policy gives the same actions batched and one by one."""
+    gym = pytest.importorskip("gymnasium")
+    sb3 = pytest.importorskip("stable_baselines3")
+
+    class ChargingEnv(gym.Env):
+        observation_space = gym.spaces.Box(low=0.0, high=96.0, shape=(2,), dtype=np.float32)
+        action_space = gym.spaces.Discrete(4)
+
+    model = sb3.DQN("MlpPolicy", ChargingEnv(), seed=0)
+    soc = np.linspace(0.0, 1.0, 12).reshape(6, 2)
+    power = BatchInference({"A": model, "B": model}, CONFIG).select_power(soc, 40, np.arange(6))
+
+    for r in range(6):
+        for a in range(2):
+            assert power[r, a] == _select_power(model, soc[r, a], 40, CONFIG)
@@ -1,6 +1,11 @@
+import random
+import sys
+from datetime import datetime, timedelta
+import pandas as pd
 import pytest
 from unittest.mock import MagicMock
-from src.ev_cli_simulator.main import run_simulation_run
+from src.ev_cli_simulator.main import main, run_simulation_run, run_simulation_batch, DumbAgent
+from src.ev_cli_simulator.data_logger import DataLogger, read_output
 from src.ev_cli_simulator.config_manager import ScenarioConfig, AgentConfig
 
 def test_run_simulation_run_with_multiple_agents(mocker):
@@ -19,7 +24,11 @@ def test_run_simulation_run_with_multiple_agents(mocker):
 
     mock_engine = MagicMock()
     mock_engine.run_step.return_value = {
-        "costs": {"total_cost": 1.0}, "final_soc": 0.5, "final_soh": 0.99
+        "costs": {
+            "electricity_cost": 0.5, "calendar_cost": 0.2,
+            "cyclic_cost": 0.3, "total_cost": 1.0
+        },
+        "final_soc": 0.5, "final_soh": 0.99
     }
     
     mock_logger = MagicMock()
@@ -61,4 +70,140 @@ def test_run_simulation_run_with_multiple_agents(mocker):
 
     # Engine is called for each agent for each step in the window
     assert mock_engine.run_step.call_count == steps_in_window * 3
-    assert mock_logger.log_step.call_count == steps_in_window * 3
\ No newline at end of file
+    # The day's step rows are logged together as columns
+    assert mock_logger.log_columns.call_count == 1
+    assert len(mock_logger.log_columns.call_args.kwargs['power_kw']) == steps_in_window * 3
+
+
+@pytest.fixture
+def price_file(tmp_path):
+    """Writes a small hourly price CSV covering the first days of 2025."""
+    lines = ["ts_start,price"]
+    for day in range(1, 5):
+        for hour in range(24):
+            lines.append(f"2025-01-{day:02d}T{hour:02d}:00:00+02:00,{0.05 + 0.01 * hour:.2f}")
+    path = tmp_path / "prices.csv"
+    path.write_text("\n".join(lines))
+    return str(path)
+
+@pytest.fixture
+def batch_config(price_file):
+    """A short two-scenario configuration backed by a real price file."""
+    return {
+        'years': 3/365,
+        'battery_capacity': 20.0,
+        'max_charge_speed': 7.0,
+        'charger_power_levels': [-11, 0, 11],
+        'scenarios': [
+            ScenarioConfig("Evening", 19, 23, 0.5),
+            ScenarioConfig("Night", 20, 3, 0.5),
+        ],
+        'price_path': price_file,
+        'soc_target': 0.8,
+        'start_soc': 0.3
+    }
+
+class SteppedDumbAgent(DumbAgent):
+    """A baseline agent that does not declare its actions deterministic."""
+    is_deterministic = False
+
+@pytest.mark.parametrize("second_agent", [DumbAgent, SteppedDumbAgent])
+def test_run_simulation_batch_matches_serial_runs(batch_config, second_agent):
+    """
+    Tests that a seeded batch of runs produces exactly the rows of the same
+    runs simulated one after another, both when every day is replayed from
+    trajectories and when the bank is stepped.
+    """
+    agents_to_run = {"DumbAgent": DumbAgent(), "Baseline2": second_agent()}
+
+    random.seed(42)
+    serial_log = DataLogger()
+    for run_id in (1, 2, 3):
+        run_simulation_run({'run_id': run_id, **batch_config}, agents_to_run, serial_log)
+
+    random.seed(42)
+    batch_log = DataLogger()
+    run_simulation_batch(batch_config, agents_to_run, batch_log, [1, 2, 3])
+
+    serial_df = serial_log.get_dataframe()
+    batch_df = batch_log.get_dataframe().sort_values('run_id', kind='stable').reset_index(drop=True)
+
+    assert len(serial_df) > 0
+    pd.testing.assert_frame_equal(serial_df, batch_df)
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_aggregated_log_levels_match_step_rows(batch_config, batch):
+    """
+    Tests that the daily and per-run rows hold the sums of the step rows and
+    the state at the end of each day.
+    """
+    agents_to_run = {"DumbAgent": DumbAgent(), "Baseline2": DumbAgent()}
+    frames = {}
+    for log_level in ('step', 'day', 'run'):
+        config = {**batch_config, 'seed': 11, 'log_level': log_level}
+        logger = DataLogger()
+        if batch:
+            summaries = run_simulation_batch(config, agents_to_run, logger, [1, 2])
+        else:
+            summaries = {
+                run_id: run_simulation_run({'run_id': run_id, **config}, agents_to_run, logger)
+                for run_id in (1, 2)
+            }
+        frames[log_level] = logger.get_dataframe()
+
+    steps, days, runs = frames['step'], frames['day'], frames['run']
+    keys = ['run_id', 'day', 'agent_type']
+    fields = ['electricity_cost', 'calendar_cost', 'cyclic_cost', 'total_cost']
+
+    daily = steps.groupby(keys, sort=True)[fields].sum().reset_index()
+    last = steps.groupby(keys, sort=True)[['soc', 'soh']].last().reset_index()
+    days = days.sort_values(keys).reset_index(drop=True)
+    num_days = steps['day'].nunique()
+    assert len(days) == 2 * num_days * 2
+    pd.testing.assert_frame_equal(days[fields], daily[fields], rtol=1e-12)
+    pd.testing.assert_frame_equal(days[['soc', 'soh']], last[['soc', 'soh']])
+    assert (days['steps'] == steps.groupby(keys, sort=True).size().values).all()
+
+    totals = steps.groupby(['run_id', 'agent_type'], sort=True)['total_cost'].sum()
+    runs = runs.set_index(['run_id', 'agent_type']).sort_index()
+    assert (runs['days'] == num_days).all()
+    assert runs['total_cost'].values == pytest.approx(totals.values, rel=1e-12)
+    for (run_id, agent), row in runs.iterrows():
+        assert summaries[run_id][agent]['total_cost'] == pytest.approx(row['total_cost'], rel=1e-12)
+        assert summaries[run_id][agent]['final_soh'] == row['final_soh']
+
+@pytest.fixture(scope="module")
+def year_price_file(tmp_path_factory):
+    """Writes an hourly UTC price CSV covering all of 2025."""
+    lines = ["ts_start,price"]
+    for day in range(365):
+        date = datetime(2025, 1, 1) + timedelta(days=day)
+        for hour in range(24):
+            lines.append(f"{date:%Y-%m-%d} {hour:02d}:00:00,{0.02 + 0.01 * ((day + hour) % 17):.2f}")
+    path = tmp_path_factory.mktemp("prices") / "year.csv"
+    path.write_text("\n".join(lines))
+    return str(path)
+
+@pytest.mark.parametrize("extra_args", [[], ['--batch'], ['--log-backend', 'columnar']])
+def test_main_streams_parquet_like_csv(year_price_file, tmp_path, monkeypatch, extra_args):
+    """Tests that Parquet output holds the same rows as the CSV output."""
+    def run_main(output_path):
+        monkeypatch.setattr(sys, 'argv', [
+            'ev-sim', '--price-path', year_price_file, '--years', '1', '--runs', '2',
+            '--battery-capacity', '20', '--max-charge-speed', '7', '--start-soc', '0.3',
+            '--soc-target', '0.8', '--charger-power-levels', '[-11,0,11]',
+            '--agents', 'DumbAgent:baseline', '--scenarios', 'Evening:19-23:1.0',
+            '--output-path', output_path, '--seed', '5', '--flush-rows', '7', *extra_args
+        ])
+        main()
+        return read_output(output_path)
+
+    csv_df = run_main(str(tmp_path / "out" / "results.csv"))
+    parquet_df = run_main(str(tmp_path / "out" / "results.parquet"))
+
+    assert len(csv_df) == 2 * 365 * 16
+    assert parquet_df['timestamp'].astype(str).tolist() == csv_df['timestamp'].tolist()
+    pd.testing.assert_frame_equal(
+        parquet_df.drop(columns='timestamp').astype({'agent_type': str, 'charging_scenario': str}),
+        csv_df.drop(columns='timestamp')
+    )
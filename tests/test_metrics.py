@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from src.ev_cli_simulator.metrics import MetricsAccumulator
+from src.ev_cli_simulator.data_logger import DataLogger
+
+COSTS = {"electricity_cost": 0.5, "calendar_cost": 0.1, "cyclic_cost": 0.2, "total_cost": 0.8}
+
+def test_add_step_and_add_batch_accumulate_the_same_totals():
+    """Tests that scalar and array accumulation agree."""
+    scalar = MetricsAccumulator([1, 2], ["A", "B"], soc_target=0.8)
+    batch = MetricsAccumulator([1, 2], ["A", "B"], soc_target=0.8)
+    power = np.array([[11.0, 0.0], [-11.0, 7.0]])
+    active = np.array([[True, True], [False, True]])
+
+    for r in range(2):
+        for a in range(2):
+            if active[r, a]:
+                scalar.add_step(r, a, COSTS, power[r, a], 0.25)
+    batch.add_batch({k: np.full((2, 2), v) for k, v in COSTS.items()}, power, 0.25, active)
+
+    soc = np.array([[0.9, 0.5], [0.8, 0.1]])
+    scalar.end_day(0, soc, 0.99, ["Work", "Home"])
+    batch.end_day(0, soc, 0.99, ["Work", "Home"])
+    assert scalar.summaries() == batch.summaries()
+
+    summary = scalar.summaries()
+    assert summary[1]["A"]["total_cost"] == pytest.approx(0.8)
+    assert summary[1]["A"]["kwh_charged"] == pytest.approx(2.75)
+    assert summary[2]["A"]["total_cost"] == 0.0
+    assert summary[2]["B"]["soc_fulfillment"] == pytest.approx(0.125)
+
+def test_day_and_run_rows():
+    """Tests the schema and values of the daily and per-run rows."""
+    metrics = MetricsAccumulator([7], ["A", "B"], soc_target=0.8)
+    day_log = DataLogger()
+    for day, soc in enumerate(([0.8, 0.4], [0.6, 0.8])):
+        metrics.add_step(0, 0, COSTS, 11.0, 0.25)
+        metrics.end_day(day, soc, [0.99, 0.98], ["Work"], day_log)
+
+    days = day_log.get_dataframe()
+    assert list(days['agent_type']) == ["A", "B", "A", "B"]
+    assert list(days['charging_scenario']) == ["Work"] * 4
+    assert list(days['steps']) == [1, 0, 1, 0]
+    assert list(days['total_cost']) == [0.8, 0.0, 0.8, 0.0]
+
+    run_log = DataLogger()
+    metrics.log_runs(run_log)
+    runs = run_log.get_dataframe()
+    assert list(runs['run_id']) == [7, 7]
+    assert list(runs['days']) == [2, 2]
+    assert runs['total_cost'].tolist() == pytest.approx([1.6, 0.0])
+    assert runs['final_soc'].tolist() == [0.6, 0.8]
+    assert runs['target_met_share'].tolist() == [0.5, 0.5]
+    assert runs['mean_soc_fulfillment'].tolist() == pytest.approx([0.875, 0.75])
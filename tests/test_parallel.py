@@ -0,0 +1,106 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import pytest
+from src.ev_cli_simulator.config_manager import AgentConfig, ScenarioConfig
+from src.ev_cli_simulator.data_logger import ColumnarDataLogger, DataLogger
+from src.ev_cli_simulator.main import build_agents, make_run_rng, run_simulation_run
+from src.ev_cli_simulator import parallel
+from src.ev_cli_simulator.parallel import run_parallel
+
+@pytest.fixture
+def base_config(tmp_path):
+    """A seeded two-day configuration backed by a small price file."""
+    lines = ["ts_start,price"]
+    for day in range(1, 4):
+        for hour in range(24):
+            lines.append(f"2025-01-{day:02d}T{hour:02d}:00:00+02:00,{0.05 + 0.01 * hour:.2f}")
+    price_path = tmp_path / "prices.csv"
+    price_path.write_text("\n".join(lines))
+    return {
+        'years': 2/365,
+        'battery_capacity': 20.0,
+        'max_charge_speed': 7.0,
+        'start_soc': 0.3,
+        'soc_target': 0.8,
+        'charger_power_levels': [-11, 0, 11],
+        'price_path': str(price_path),
+        'scenarios': [
+            ScenarioConfig("Evening", 19, 23, 0.5),
+            ScenarioConfig("Night", 22, 3, 0.5),
+        ],
+        'seed': 7
+    }
+
+def test_make_run_rng_is_deterministic_per_run():
+    """Tests that run streams depend only on the seed and run_id."""
+    first = [make_run_rng(7, 3).random() for _ in range(2)]
+    again = [make_run_rng(7, 3).random() for _ in range(2)]
+    assert first == again
+    assert make_run_rng(7, 4).random() != make_run_rng(7, 3).random()
+    assert make_run_rng(8, 3).random() != make_run_rng(7, 3).random()
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_run_parallel_matches_serial_runs(base_config, batch):
+    """
+    Tests that runs spread over worker processes are merged in run order and
+    reproduce the seeded serial results.
+    """
+    agent_configs = [AgentConfig("DumbAgent", "baseline")]
+    run_ids = [1, 2, 3, 4]
+
+    serial_log = DataLogger()
+    agents_to_run = build_agents(agent_configs)
+    for run_id in run_ids:
+        run_simulation_run({'run_id': run_id, **base_config}, agents_to_run, serial_log)
+
+    parallel_log = DataLogger()
+    run_parallel(base_config, agent_configs, parallel_log, run_ids, workers=2, batch=batch)
+
+    parallel_df = parallel_log.get_dataframe().sort_values('run_id', kind='stable').reset_index(drop=True)
+    pd.testing.assert_frame_equal(serial_log.get_dataframe(), parallel_df)
+
+def test_run_parallel_with_columnar_logger(base_config):
+    """Tests that workers log into the caller's logger class and merge into it."""
+    agent_configs = [AgentConfig("DumbAgent", "baseline"), AgentConfig("Other", "baseline")]
+    run_ids = [1, 2, 3]
+
+    serial_log = DataLogger()
+    agents_to_run = build_agents(agent_configs)
+    for run_id in run_ids:
+        run_simulation_run({'run_id': run_id, **base_config}, agents_to_run, serial_log)
+
+    columnar_log = ColumnarDataLogger()
+    run_parallel(base_config, agent_configs, columnar_log, run_ids, workers=2, batch=True)
+
+    df = columnar_log.get_dataframe().astype({'agent_type': str, 'charging_scenario': str})
+    df = df.sort_values('run_id', kind='stable').reset_index(drop=True)
+    pd.testing.assert_frame_equal(serial_log.get_dataframe(), df)
+
+def test_run_parallel_merges_out_of_order_tasks_in_run_order(base_config, monkeypatch, capsys):
+    """Tests that tasks finishing out of order are merged in run order, each once all earlier ones are."""
+    agent_configs = [AgentConfig("DumbAgent", "baseline")]
+    run_ids = [1, 2, 3]
+    serial_log = DataLogger()
+    agents_to_run = build_agents(agent_configs)
+    for run_id in run_ids:
+        run_simulation_run({'run_id': run_id, **base_config}, agents_to_run, serial_log)
+
+    # Threads share the worker state of this process; the first run finishes last
+    monkeypatch.setattr(parallel, '_worker_state', {})
+    parallel._init_worker(base_config, agent_configs)
+    run_task = parallel._run_task
+    def slow_first_run(task):
+        if task[0] == [1]:
+            time.sleep(0.5)
+        return run_task(task)
+    monkeypatch.setattr(parallel, '_run_task', slow_first_run)
+    parallel_log = DataLogger()
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        summaries = run_parallel(base_config, agent_configs, parallel_log, run_ids, workers=3, pool=pool)
+
+    assert list(summaries) == run_ids
+    assert [line for line in capsys.readouterr().out.splitlines() if line.startswith("--- Completed")] == [
+        f"--- Completed Simulation Run {run_id} of 3 ---" for run_id in run_ids
+    ]
+    pd.testing.assert_frame_equal(parallel_log.get_dataframe(), serial_log.get_dataframe())
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from stable_baselines3 import DQN
+import gymnasium as gym
+from src.ev_cli_simulator.agent_loader import load_policy
+from src.ev_cli_simulator.agents.baseline_agent import DumbAgent
+from src.ev_cli_simulator.agents.tabular_policy import TabularPolicy
+from src.ev_cli_simulator.main import main as cli_main
+from src.ev_cli_simulator.policy_compiler import compile_policy, disagreement_rate, main
+
+POWER_LEVELS = [-11.0, 0.0, 11.0]
+
+class ChargingEnv(gym.Env):
+    """An environment with the simulator's observation and action spaces."""
+    observation_space = gym.spaces.Box(low=0.0, high=96.0, shape=(2,), dtype=np.float32)
+    action_space = gym.spaces.Discrete(3)
+
+def test_compiled_dumb_agent_matches_on_the_grid():
+    """Tests that the table reproduces the agent at every grid point."""
+    agent = DumbAgent()
+    policy = compile_policy(agent, POWER_LEVELS, 0.8, soc_points=101)
+    assert policy.actions.shape == (101, 96)
+    assert policy.actions.dtype == np.int8
+
+    for soc in policy.soc_grid[::10]:
+        obs = np.array([soc, 40], dtype=np.float32)
+        assert policy.predict(obs)[0] == agent.predict(obs, POWER_LEVELS, 0.8)[0]
+
+    # Off the grid the table only errs next to the SOC target
+    rate = disagreement_rate(policy, agent, POWER_LEVELS, 0.8, samples=20_000)
+    assert 0.0 < rate < 0.01
+
+def test_compiled_sb3_model_matches_on_the_grid():
+    """Tests that a DQN is tabulated with its greedy actions."""
+    model = DQN("MlpPolicy", ChargingEnv(), seed=0)
+    policy = compile_policy(model, POWER_LEVELS, 0.8, soc_points=21)
+
+    obs = np.stack(np.meshgrid(policy.soc_grid, np.arange(96), indexing='ij'), axis=-1).reshape(-1, 2)
+    expected, _ = model.predict(obs.astype(np.float32), deterministic=True)
+    np.testing.assert_array_equal(policy.predict(obs)[0], expected)
+
+    # The model ignores the SOC target, so the table does not pin it
+    assert 'soc_target' not in policy.metadata
+    policy.check_config(POWER_LEVELS, 0.9)
+
+def test_table_round_trip_and_loading_as_agent(tmp_path):
+    """Tests that a saved table loads back through load_policy."""
+    policy = compile_policy(DumbAgent(), POWER_LEVELS, 0.8, soc_points=51)
+    path = tmp_path / "table.npz"
+    policy.save(path)
+
+    loaded = load_policy(str(path))
+    assert isinstance(loaded, TabularPolicy)
+    np.testing.assert_array_equal(loaded.actions, policy.actions)
+    assert loaded.metadata['soc_target'] == 0.8
+
+def test_table_rejects_actions_outside_int8():
+    """Tests that the table refuses actions it cannot store."""
+    with pytest.raises(ValueError):
+        TabularPolicy(np.full((3, 96), 200))
+
+def test_compiler_cli(tmp_path, capsys):
+    """Tests the command-line compiler and its disagreement gate."""
+    output_path = str(tmp_path / "baseline.npz")
+    args = [
+        "--agent", "baseline", "--output-path", output_path,
+        "--charger-power-levels", "[-11, 0, 11]", "--soc-target", "0.8",
+        "--soc-points", "11", "--check-samples", "5000"
+    ]
+    assert main(args) == 0
+    assert "Disagreement with the live agent" in capsys.readouterr().out
+    assert load_policy(output_path).actions.shape == (11, 96)
+
+    assert main(args + ["--max-disagreement", "0.0"]) == 1
+
+def test_table_refuses_other_configurations(tmp_path, monkeypatch, capsys):
+    """Tests that a table is refused for power levels or SOC targets it was not compiled for."""
+    policy = compile_policy(DumbAgent(), POWER_LEVELS, 0.8, soc_points=11)
+    policy.check_config([-11, 0, 11], 0.8)
+    with pytest.raises(ValueError, match="power levels"):
+        policy.check_config([0.0, 11.0], 0.8)
+    with pytest.raises(ValueError, match="SOC target"):
+        policy.check_config(POWER_LEVELS, 0.9)
+    TabularPolicy(policy.actions).check_config([0.0, 7.0], 0.5)
+
+    table_path = str(tmp_path / "table.npz")
+    policy.save(table_path)
+    price_path = tmp_path / "prices.csv"
+    price_path.write_text("ts_start,price\n" + "\n".join(
+        f"{date:%Y-%m-%d}T{hour:02d}:00:00Z,0.1"
+        for date in (datetime(2025, 1, 1) + timedelta(days=day) for day in range(365)) for hour in range(24)
+    ))
+    output_path = tmp_path / "out.csv"
+    args = [
+        'ev-sim', '--price-path', str(price_path), '--years', '1', '--runs', '1',
+        '--battery-capacity', '20', '--max-charge-speed', '7', '--start-soc', '0.3',
+        '--charger-power-levels', '[-11,0,11]', '--agents', f'Table:{table_path}',
+        '--scenarios', 'Evening:19-23:1.0', '--output-path', str(output_path)
+    ]
+    monkeypatch.setattr('sys.argv', args + ['--soc-target', '0.8', '--sweep', 'soc_target=0.8,0.9'])
+    cli_main()
+    assert "Error: Agent 'Table': The action table was compiled for a SOC target of 0.8, not 0.9." in capsys.readouterr().out
+    assert not output_path.exists()
+
+    monkeypatch.setattr('sys.argv', args + ['--soc-target', '0.8'])
+    cli_main()
+    assert output_path.exists()
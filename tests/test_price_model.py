@@ -1,82 +1,245 @@
-import csv
-import io
+import os
+import numpy as np
+import pytest
 from datetime import datetime, timezone, timedelta
+from zoneinfo import ZoneInfo
+from src.ev_cli_simulator.core.price_model import PriceModel, PriceModelCache, compile_price_cache, price_cache_dir
 
-class PriceModel:
+CSV_DATA = "ts_start,price\n2025-01-01T10:00:00Z,0.15\n2025-01-01T11:00:00Z,0.25"
+
+def test_get_price_truncates_to_hour():
+    """Tests that any timestamp within an hour returns that hour's price."""
+    price_model = PriceModel(CSV_DATA)
+    assert price_model.get_price(datetime(2025, 1, 1, 10, 45, tzinfo=timezone.utc)) == 0.15
+    assert price_model.get_price(datetime(2025, 1, 1, 11, 0, tzinfo=timezone.utc)) == 0.25
+
+@pytest.fixture(scope="module")
+def year_price_model():
+    """A PriceModel with one hourly price for every UTC hour of 2023 and 2024."""
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    lines = ["ts_start,price"]
+    for hour in range(2 * 365 * 24 + 24):
+        ts = start + timedelta(hours=hour)
+        lines.append(f"{ts:%Y-%m-%d %H:%M:%S},{(hour % 97) / 100:.2f}")
+    return PriceModel("\n".join(lines))
+
+def _dict_lookup_price(price_model, timestamp):
+    """The reference lookup: resolve the dictionary key, then read the dict."""
+    key = price_model._resolve_key(timestamp)
+    return None if key is None else price_model._prices[key]
+
+def test_array_lookup_matches_dict_lookup(year_price_model):
+    """
+    Tests that the array-backed lookup reproduces the dictionary lookup,
+    including year looping and DST gaps, for every 15-minute step of a year.
+    """
+    riga = ZoneInfo("Europe/Riga")
+    timestamps = [
+        datetime(2025, 1, 1, tzinfo=riga) + timedelta(days=day, minutes=15 * step)
+        for day in range(366) for step in range(96)
+    ]
+    expected = [_dict_lookup_price(year_price_model, ts) for ts in timestamps]
+
+    assert [year_price_model.get_price(ts) for ts in timestamps] == expected
+
+    vectorized = year_price_model.get_prices(timestamps)
+    expected_array = np.array([np.nan if p is None else p for p in expected])
+    np.testing.assert_array_equal(vectorized, expected_array)
+
+def test_array_lookup_leap_day_and_fold(year_price_model):
+    """Tests lookups that bypass the index table: Feb 29 and repeated DST hours."""
+    riga = ZoneInfo("Europe/Riga")
+    leap_day = datetime(2028, 2, 29, 13, 15, tzinfo=riga)
+    repeated_hour = datetime(2025, 10, 26, 3, 30, fold=1, tzinfo=riga)
+
+    # 2025 is not a leap year, so Feb 29 has no looped date in this model
+    single_year_model = PriceModel(CSV_DATA)
+    assert single_year_model.get_price(leap_day) is None
+    assert single_year_model._index_table(riga)[0][59 * 24] == -2
+
+    expected = _dict_lookup_price(year_price_model, repeated_hour)
+    assert expected is not None
+    assert year_price_model.get_price(repeated_hour) == expected
+    assert year_price_model.get_prices([repeated_hour])[0] == expected
+
+def test_get_price_indices_missing_price():
+    """Tests that timestamps without data resolve to -1 and NaN."""
+    price_model = PriceModel(CSV_DATA)
+    timestamps = [
+        datetime(2025, 1, 1, 10, 30, tzinfo=timezone.utc),
+        datetime(2025, 1, 1, 15, 0, tzinfo=timezone.utc),
+    ]
+    assert price_model.get_price_indices(timestamps).tolist() == [0, -1]
+    np.testing.assert_array_equal(price_model.get_prices(timestamps), [0.15, np.nan])
+    assert price_model.get_price(timestamps[1]) is None
+
+@pytest.fixture
+def price_file(tmp_path):
+    """Writes CSV_DATA to a temporary file."""
+    path = tmp_path / "prices.csv"
+    path.write_text(CSV_DATA)
+    return path
+
+def test_price_model_cache_reuses_parsed_model(price_file):
+    """Tests that repeated loads of an unchanged file return the same model."""
+    cache = PriceModelCache()
+    first = cache.get(str(price_file))
+    assert cache.get(str(price_file)) is first
+    assert cache.get(os.path.relpath(price_file)) is first
+
+def test_price_model_cache_reloads_modified_file(price_file):
+    """Tests that a change of the file's mtime invalidates the cached model."""
+    cache = PriceModelCache()
+    first = cache.get(str(price_file))
+
+    price_file.write_text(CSV_DATA.replace("0.15", "0.35"))
+    stat = os.stat(price_file)
+    os.utime(price_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    second = cache.get(str(price_file))
+    assert second is not first
+    assert second.get_price(datetime(2025, 1, 1, 10, tzinfo=timezone.utc)) == 0.35
+
+def test_price_model_cache_missing_file(tmp_path):
+    """Tests that a missing file raises FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        PriceModelCache().get(str(tmp_path / "missing.csv"))
+
+@pytest.fixture(scope="module")
+def dst_price_csv():
+    """Hourly prices for 2024 and 2025 with local Riga offsets, so the data has DST gaps and repeats."""
+    riga = ZoneInfo("Europe/Riga")
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    lines = ["ts_start,price"]
+    for hour in range(731 * 24):
+        ts = (start + timedelta(hours=hour)).astimezone(riga)
+        lines.append(f"{ts.isoformat()},{(hour % 89) / 100:.2f}")
+    return "\n".join(lines)
+
+def test_cached_model_matches_parsed_model(dst_price_csv, tmp_path):
+    """Tests that a memory-mapped cache answers every lookup like the parsed CSV."""
+    path = tmp_path / "prices.csv"
+    path.write_text(dst_price_csv)
+    cache_dir = compile_price_cache(str(path))
+    parsed, cached = PriceModel(dst_price_csv), PriceModel.from_cache(cache_dir)
+    assert cached._prices is None
+
+    riga = ZoneInfo("Europe/Riga")
+    timestamps = [
+        datetime(2026, 1, 1, tzinfo=riga) + timedelta(days=day, minutes=15 * step)
+        for day in range(366) for step in range(96)
+    ] + [
+        datetime(2028, 2, 29, 13, tzinfo=riga),
+        # Dates loop to 2024, whose DST changes were on March 31 and October 27
+        datetime(2026, 10, 27, 3, 30, fold=1, tzinfo=riga),
+        datetime(2026, 3, 31, 3, 15, tzinfo=riga),
+        datetime(2026, 3, 31, 3, 15, tzinfo=timezone.utc),
+        datetime(2030, 6, 1, 12, tzinfo=timezone(timedelta(hours=5))),
+    ]
+    assert [cached.get_price(ts) for ts in timestamps] == [parsed.get_price(ts) for ts in timestamps]
+    np.testing.assert_array_equal(cached.get_price_indices(timestamps), parsed.get_price_indices(timestamps))
+    dates = [datetime(2027, 1, 1) + timedelta(days=d) for d in range(365)]
+    # An uncached zone object is not served by the precompiled table
+    for tz in (riga, ZoneInfo.no_cache("Europe/Riga"), timezone.utc):
+        np.testing.assert_array_equal(cached.get_day_price_indices(dates, tz), parsed.get_day_price_indices(dates, tz))
+    np.testing.assert_array_equal(cached._index_table(riga)[0], parsed._index_table(riga)[0])
+
+def test_price_model_cache_uses_compiled_cache(price_file):
+    """Tests that loads map a valid binary cache and parse the CSV once its hash changes."""
+    compile_price_cache(str(price_file))
+    header_path = os.path.join(price_cache_dir(str(price_file)), 'header.json')
+    stamp = os.stat(header_path).st_mtime_ns
+    assert compile_price_cache(str(price_file)) == price_cache_dir(str(price_file))
+    assert os.stat(header_path).st_mtime_ns == stamp # Unchanged source, no recompilation
+
+    model = PriceModelCache().get(str(price_file))
+    assert model._prices is None
+    assert not model._price_array.flags.writeable
+    assert model.get_price(datetime(2025, 1, 1, 10, tzinfo=timezone.utc)) == 0.15
+
+    price_file.write_text(CSV_DATA.replace("0.15", "0.35"))
+    model = PriceModelCache().get(str(price_file))
+    assert model._price_array.flags.writeable # Parsed, not mapped
+    assert model.get_price(datetime(2025, 1, 1, 10, tzinfo=timezone.utc)) == 0.35
+
+def _assert_same_model(model, reference):
+    """Asserts that two models hold the same price array, year range and duplicate count."""
+    assert (model._start_epoch, model._resolution_s) == (reference._start_epoch, reference._resolution_s)
+    np.testing.assert_array_equal(model._price_array, reference._price_array)
+    assert (model._min_year, model._max_year) == (reference._min_year, reference._max_year)
+    assert model.num_duplicates == reference.num_duplicates
+
+def test_from_csv_matches_row_parser(dst_price_csv, tmp_path):
+    """Tests that the vectorized loader builds the same model as the row-by-row parser."""
+    path = tmp_path / "prices.csv"
+    path.write_text(dst_price_csv)
+    loaded, parsed = PriceModel.from_csv(str(path)), PriceModel(dst_price_csv)
+    assert loaded._prices is None
+    _assert_same_model(loaded, parsed)
+
+    riga = ZoneInfo("Europe/Riga")
+    timestamps = [
+        datetime(2026, 1, 1, tzinfo=riga) + timedelta(days=day, hours=hour)
+        for day in range(366) for hour in range(24)
+    ] + [datetime(2026, 10, 25, 3, 30, fold=1, tzinfo=riga), datetime(2026, 3, 29, 3, 15, tzinfo=timezone.utc)]
+    assert [loaded.get_price(ts) for ts in timestamps] == [parsed.get_price(ts) for ts in timestamps]
+
+def test_from_csv_timestamp_formats(tmp_path):
     """
-    Models electricity prices by loading hourly data from a CSV source.
-    Handles Daylight Saving Time transitions and loops data for long-term simulations.
+    Tests the timestamp layouts and CSV quirks handled by the vectorized loader,
+    including the row parser's reading of negative offsets as UTC wall-clock time.
     """
-    def __init__(self, price_data_csv: str):
-        """
-        Initializes the PriceModel by parsing CSV data into a lookup dictionary.
-
-        Args:
-            price_data_csv (str): A string containing the price data in CSV format.
-                                  Expected headers: 'ts_start', 'price'.
-        """
-        self._prices = {}
-        self._base_year_map = {}
-        min_year = 9999
-        max_year = 0
-
-        csv_file = io.StringIO(price_data_csv)
-        reader = csv.DictReader(csv_file)
-
-        for row in reader:
-            timestamp_str = row['ts_start']
-            price = float(row['price'])
-            
-            # This parsing is robust to different timezone formats
-            if 'Z' in timestamp_str:
-                 timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-            elif '+' in timestamp_str:
-                 timestamp = datetime.fromisoformat(timestamp_str)
-            else:
-                 ts_naive = datetime.fromisoformat(timestamp_str)
-                 timestamp = ts_naive.replace(tzinfo=timezone.utc)
-
-            self._prices[timestamp] = price
-            
-            # Keep track of the range of years in the data
-            min_year = min(min_year, timestamp.year)
-            max_year = max(max_year, timestamp.year)
-
-        # Create a map for looping data. For each day of a leap year,
-        # it stores the corresponding date in a year that exists in the data.
-        if min_year <= max_year:
-            for day_of_year in range(1, 367):
-                try:
-                    base_date = datetime(2024, 1, 1) + timedelta(days=day_of_year - 1) # 2024 is a leap year
-                    target_year = min_year + ((base_date.year - min_year) % (max_year - min_year + 1))
-                    looped_date = base_date.replace(year=target_year)
-                    self._base_year_map[(base_date.month, base_date.day)] = (looped_date.month, looped_date.day, looped_date.year)
-                except ValueError:
-                    continue # Skip Feb 29 if target year is not a leap year
-
-
-    def get_price(self, timestamp: datetime) -> float | None:
-        """
-        Gets the electricity price for the hour corresponding to the given timestamp.
-        Handles data looping for long simulations and DST gaps.
-        """
-        lookup_time = timestamp.replace(minute=0, second=0, microsecond=0)
-
-        # --- Data Looping Logic ---
-        # Find the corresponding date in a year for which we have data
-        month, day, year = self._base_year_map.get((lookup_time.month, lookup_time.day), (lookup_time.month, lookup_time.day, lookup_time.year))
-        try:
-            looped_lookup_time = lookup_time.replace(year=year, month=month, day=day)
-        except ValueError: # Handle Feb 29 in non-leap years
-            looped_lookup_time = lookup_time.replace(year=year, month=month, day=28)
-
-        price = self._prices.get(looped_lookup_time)
-
-        # --- DST Handling ---
-        # If price is not found (e.g., during DST spring forward),
-        # use the price from the previous hour.
-        if price is None:
-            previous_hour = looped_lookup_time - timedelta(hours=1)
-            return self._prices.get(previous_hour)
-
-        return price
+    csv_data = (
+        'region,price,ts_start\r\n'
+        'LV,0.10,2025-01-01T00:00:00Z\r\n'
+        '"LV, Riga",0.11,2025-01-01 01:00:00\r\n'
+        '\r\n'
+        'LV,0.12,2025-01-01T04:00+02:00\r\n'
+        'LV,"0.13",2025-01-01T03:00:00-05:00\r\n'
+        'LV,0.14,2024-12-31T23:00:00-01:00\r\n'
+        'LV,0.15,2025-01-01T09:00:00+05:30\r\n'
+    )
+    path = tmp_path / "prices.csv"
+    path.write_text(csv_data, newline='')
+    loaded = PriceModel.from_csv(str(path))
+    assert loaded._prices is None
+    _assert_same_model(loaded, PriceModel(csv_data))
+    assert loaded._resolution_s == 1800
+    slot = (int(datetime(2025, 1, 1, 3, tzinfo=timezone.utc).timestamp()) - loaded._start_epoch) // 1800
+    assert loaded._price_array[slot] == 0.13
+
+def test_from_csv_duplicates_and_gaps(tmp_path):
+    """Tests that the last of duplicate timestamps wins and that gaps are counted."""
+    csv_data = (
+        "ts_start,price\n"
+        "2025-01-01T00:00:00Z,0.10\n"
+        "2025-01-01T02:00:00+02:00,0.20\n"
+        "2025-01-01T01:00:00Z,0.30\n"
+        "2025-01-01T04:00:00Z,0.50\n"
+        "2025-01-01T00:00:00Z,0.40\n"
+    )
+    path = tmp_path / "prices.csv"
+    path.write_text(csv_data)
+    loaded = PriceModel.from_csv(str(path))
+    _assert_same_model(loaded, PriceModel(csv_data))
+    assert loaded.get_price(datetime(2025, 1, 1, 0, tzinfo=timezone.utc)) == 0.40
+    assert (loaded.num_duplicates, loaded.num_gaps) == (2, 2)
+
+@pytest.mark.parametrize("csv_data", [
+    "ts_start,price\n2025-01-01T00:00:00.500Z,0.10\n2025-01-01T01:00:00Z,0.20\n",
+    "ts_start,price\n2025-01-01T00:00:00+0200,0.10\n",
+    "ts_start,price\n2025-02-29T00:00:00Z,0.10\n",
+    "ts_start,price\n",
+    "",
+])
+def test_from_csv_falls_back_to_row_parser(csv_data, tmp_path):
+    """Tests that layouts the vectorized loader does not decode behave as in the row parser."""
+    path = tmp_path / "prices.csv"
+    path.write_text(csv_data)
+    try:
+        parsed = PriceModel(csv_data)
+    except ValueError as error:
+        with pytest.raises(ValueError, match=str(error)):
+            PriceModel.from_csv(str(path))
+    else:
+        _assert_same_model(PriceModel.from_csv(str(path)), parsed)
@@ -0,0 +1,146 @@
+import json
+import sys
+from datetime import datetime, timedelta
+import pandas as pd
+import pytest
+from src.ev_cli_simulator.config_manager import AgentConfig, ScenarioConfig
+from src.ev_cli_simulator.data_logger import DataLogger
+from src.ev_cli_simulator.main import DumbAgent, main, run_simulation_batch, run_simulation_run
+from src.ev_cli_simulator.parallel import run_parallel
+from src.ev_cli_simulator.profiling import Profiler, peak_rss_bytes
+
+@pytest.fixture
+def config(tmp_path):
+    """A seeded two-day configuration backed by a small price file."""
+    lines = ["ts_start,price"]
+    for day in range(1, 4):
+        for hour in range(24):
+            lines.append(f"2025-01-{day:02d}T{hour:02d}:00:00+02:00,{0.05 + 0.01 * hour:.2f}")
+    price_path = tmp_path / "prices.csv"
+    price_path.write_text("\n".join(lines))
+    return {
+        'years': 2/365,
+        'battery_capacity': 20.0,
+        'max_charge_speed': 7.0,
+        'start_soc': 0.3,
+        'soc_target': 0.8,
+        'charger_power_levels': [-11, 0, 11],
+        'price_path': str(price_path),
+        'scenarios': [ScenarioConfig("Evening", 19, 23, 1.0)],
+        'seed': 7
+    }
+
+def test_lap_accumulates_time_and_calls():
+    """Tests that laps add up per phase and return the new clock reading."""
+    profiler = Profiler()
+    t = profiler.lap('a', 0.0)
+    t = profiler.lap('a', t)
+    profiler.lap('b', t)
+    assert profiler.phases['a'][1] == 2
+    assert profiler.phases['b'][1] == 1
+    assert profiler.phases['a'][0] == pytest.approx(t)
+
+def test_report_and_merge():
+    """Tests the report totals and the merging of a worker's report."""
+    worker = Profiler()
+    worker.phases = {'costs': [2.0, 10], 'inference': [1.0, 10]}
+    worker.add_rows(10)
+    worker.record_run([1], 4.0, 20, 10)
+
+    profiler = Profiler()
+    profiler.phases = {'costs': [1.0, 5]}
+    profiler.merge(worker.report())
+    profiler.record_run([2], 1.0, 30, 0)
+    report = profiler.report()
+
+    assert report['phases']['costs'] == {'seconds': 3.0, 'calls': 15, 'share': 0.75}
+    assert list(report['phases']) == ['costs', 'inference']
+    assert report['steps'] == 50
+    assert report['steps_per_sec'] == pytest.approx(10.0)
+    assert report['rows_logged'] == 10
+    assert [run['run_ids'] for run in report['runs']] == [[1], [2]]
+    assert report['runs'][0]['steps_per_sec'] == 5.0
+    assert report['worker_peak_rss_bytes'] == peak_rss_bytes()
+
+    summary = profiler.format_summary(report)
+    assert summary.splitlines()[1].startswith('costs')
+    assert 'battery steps: 50' in summary
+
+@pytest.mark.parametrize("log_level", ['step', 'day', 'run'])
+@pytest.mark.parametrize("batch", [False, True])
+def test_profiled_runs_match_plain_runs(config, batch, log_level):
+    """
+    Tests that profiling leaves the results unchanged and records the phases,
+    steps and logged rows of the runs.
+    """
+    # The day loop's phases are profiled in Python; the step kernel is a single phase
+    config = {**config, 'log_level': log_level, 'jit': False}
+    agents_to_run = {"DumbAgent": DumbAgent(), "Baseline2": DumbAgent()}
+
+    def simulate(profiler):
+        logger = DataLogger()
+        if batch:
+            summaries = run_simulation_batch(config, agents_to_run, logger, [1, 2], profiler=profiler)
+        else:
+            summaries = {
+                run_id: run_simulation_run({'run_id': run_id, **config}, agents_to_run, logger, profiler=profiler)
+                for run_id in (1, 2)
+            }
+        return summaries, logger.get_dataframe()
+
+    plain_summaries, plain_df = simulate(None)
+    profiler = Profiler()
+    summaries, df = simulate(profiler)
+
+    assert summaries == plain_summaries
+    pd.testing.assert_frame_equal(df, plain_df)
+
+    report = profiler.report()
+    # The batch replays deterministic agents a block of days at a time
+    day_phases = {'day_replay'} if batch else {'day_setup', 'day_end'}
+    assert {'setup', 'run_end'} | day_phases <= set(report['phases'])
+    assert report['steps'] == sum(s['steps'] for run in summaries.values() for s in run.values())
+    assert report['steps'] == 2 * 2 * 2 * 16
+    assert report['rows_logged'] == len(df)
+    assert sum(run['rows_logged'] for run in report['runs']) == len(df)
+    assert sorted(i for run in report['runs'] for i in run['run_ids']) == [1, 2]
+
+def test_run_parallel_merges_worker_profiles(config):
+    """Tests that the workers' profiling reports are merged into the profiler."""
+    profiler = Profiler()
+    logger = DataLogger()
+    run_parallel(
+        {**config, 'profile': True}, [AgentConfig("DumbAgent", "baseline")], logger, [1, 2, 3],
+        workers=2, profiler=profiler
+    )
+    report = profiler.report()
+    assert [run['run_ids'] for run in report['runs']] == [[1], [2], [3]]
+    assert report['rows_logged'] == len(logger.get_dataframe())
+    # Deterministic agents replay their memoized day trajectories
+    assert report['phases']['step_replay']['calls'] == 3 * 2 * 16
+
+def test_main_writes_profile_report(tmp_path, monkeypatch, capsys):
+    """Tests that --profile prints a summary and writes a JSON report beside the output."""
+    lines = ["ts_start,price"]
+    for day in range(365):
+        date = datetime(2025, 1, 1) + timedelta(days=day)
+        for hour in range(24):
+            lines.append(f"{date:%Y-%m-%d} {hour:02d}:00:00,0.1")
+    price_path = tmp_path / "prices.csv"
+    price_path.write_text("\n".join(lines))
+    output_path = tmp_path / "out" / "results.csv"
+
+    monkeypatch.setattr(sys, 'argv', [
+        'ev-sim', '--price-path', str(price_path), '--years', '1', '--runs', '2',
+        '--battery-capacity', '20', '--max-charge-speed', '7', '--start-soc', '0.3',
+        '--soc-target', '0.8', '--charger-power-levels', '[-11,0,11]',
+        '--agents', 'DumbAgent:baseline', '--scenarios', 'Evening:19-23:1.0',
+        '--output-path', str(output_path), '--seed', '5', '--profile'
+    ])
+    main()
+
+    report = json.loads((tmp_path / "out" / "results.profile.json").read_text())
+    assert {'load_inputs', 'export_agents', 'write_output', 'step_replay'} <= set(report['phases'])
+    assert report['rows_logged'] == len(pd.read_csv(output_path))
+    assert len(report['runs']) == 2
+    assert "--- Profile ---" in capsys.readouterr().out
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+from src.ev_cli_simulator.agents.numpy_policy import NumpyQPolicy
+from src.ev_cli_simulator.config_manager import ScenarioConfig
+from src.ev_cli_simulator.data_logger import DataLogger
+from src.ev_cli_simulator.main import DumbAgent, run_simulation_batch, run_simulation_run
+from src.ev_cli_simulator.recording import RecordedTrajectories, TrajectoryRecorder
+
+METADATA = {'battery_capacity': 20.0, 'start_soc': 0.3, 'duration_h': 0.25, 'num_days': 3, 'price_path': 'p.csv'}
+
+@pytest.fixture
+def config(tmp_path):
+    """A seeded three-day configuration backed by a small price file."""
+    lines = ["ts_start,price"]
+    for day in range(1, 5):
+        for hour in range(24):
+            lines.append(f"2025-01-{day:02d}T{hour:02d}:00:00+02:00,{0.05 + 0.01 * hour:.2f}")
+    price_path = tmp_path / "prices.csv"
+    price_path.write_text("\n".join(lines))
+    return {
+        'years': 3/365,
+        'battery_capacity': 20.0,
+        'max_charge_speed': 7.0,
+        'start_soc': 0.3,
+        'soc_target': 0.8,
+        'charger_power_levels': [-11, 0, 11],
+        'price_path': str(price_path),
+        'scenarios': [
+            ScenarioConfig("Evening", 19, 23, 0.5),
+            ScenarioConfig("Night", 20, 3, 0.5),
+        ],
+        'seed': 4
+    }
+
+def make_policy() -> NumpyQPolicy:
+    """A small random Q-network over the three power levels."""
+    rng = np.random.default_rng(1)
+    return NumpyQPolicy(
+        [rng.normal(size=(8, 2)), rng.normal(size=(3, 8))],
+        [rng.normal(size=8), rng.normal(size=3)],
+        ['tanh', 'identity']
+    )
+
+def test_save_groups_steps_per_series(tmp_path):
+    """Tests that steps are grouped per (run, agent) in their recorded order."""
+    recorder = TrajectoryRecorder(["A", "B"])
+    recorder.add_batch(np.array([2, 1]), 0, 76, np.array([[7.0, 0.0], [7.0, -11.0]]), np.array([[0.65, 0.3], [0.65, 0.1]]))
+    recorder.add_step(1, 0, 0, 77, 0.0, 0.65)
+    recorder.add_steps(1, 0, 1, [76, 77], np.array([7.0, 7.0]), np.array([0.65, 1.0]))
+    path = tmp_path / "trajectories.npz"
+    recorder.save(str(path), METADATA)
+
+    recorded = RecordedTrajectories.load(str(path))
+    assert recorded.agent_names == ["A", "B"]
+    assert recorded.series_run_id.tolist() == [1, 1, 2, 2]
+    assert recorded.series_agent.tolist() == [0, 1, 0, 1]
+    assert recorded.series_offsets.tolist() == [0, 4, 5, 6, 7]
+    assert recorded.power_kw.tolist() == [7.0, 0.0, 7.0, 7.0, -11.0, 7.0, 0.0]
+    assert recorded.action.dtype == np.int8
+    assert recorded.day.tolist() == [0, 0, 1, 1, 0, 0, 0]
+    # The SOC resets to the start SOC on the first step of every day and series
+    np.testing.assert_array_equal(recorded.soc_before(), [0.3, 0.65, 0.3, 0.65, 0.3, 0.3, 0.3])
+    np.testing.assert_array_equal(recorded.series_sums(np.arange(7.0)), [6.0, 4.0, 5.0, 6.0])
+
+def record(config, batch: bool, tmp_path, name: str) -> RecordedTrajectories:
+    """Simulates runs 1-3 with a recorder and loads the recording."""
+    agents_to_run = {"DumbAgent": DumbAgent(), "Smart": make_policy()}
+    recorder = TrajectoryRecorder(list(agents_to_run))
+    if batch:
+        run_simulation_batch(config, agents_to_run, DataLogger(), [1, 2, 3], recorder=recorder)
+    else:
+        for run_id in (1, 2, 3):
+            run_simulation_run({'run_id': run_id, **config}, agents_to_run, DataLogger(), recorder=recorder)
+    path = tmp_path / f"{name}.npz"
+    recorder.save(str(path), METADATA)
+    return RecordedTrajectories.load(str(path))
+
+def test_recordings_match_across_execution_modes(config, tmp_path):
+    """
+    Tests that step-by-step, whole-day replay and batch simulation record
+    the same trajectories, and that the recorded SOCs follow the logged ones.
+    """
+    steps_log = DataLogger()
+    run_simulation_run({'run_id': 1, **config}, {"DumbAgent": DumbAgent()}, steps_log)
+    logged = steps_log.get_dataframe()
+
+    recordings = [
+        record({**config, 'log_level': 'step'}, False, tmp_path, "serial"),
+        record({**config, 'log_level': 'run'}, False, tmp_path, "replayed"),
+        record({**config, 'log_level': 'run'}, True, tmp_path, "batch"),
+    ]
+    for other in recordings[1:]:
+        for name in ('series_run_id', 'series_agent', 'series_offsets', 'day', 'step', 'action', 'power_levels', 'soc'):
+            np.testing.assert_array_equal(getattr(other, name), getattr(recordings[0], name))
+
+    first = recordings[0]
+    start, end = first.series_offsets[:2]
+    np.testing.assert_array_equal(first.soc[start:end], logged['soc'].to_numpy())
+    np.testing.assert_array_equal(first.power_kw[start:end], logged['power_kw'].to_numpy())
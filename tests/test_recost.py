@@ -0,0 +1,146 @@
+import json
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from src.ev_cli_simulator.agents.numpy_policy import NumpyQPolicy
+from src.ev_cli_simulator.config_manager import ScenarioConfig
+from src.ev_cli_simulator.core.degradation_model import DegradationModel
+from src.ev_cli_simulator.core.price_model import load_price_model
+from src.ev_cli_simulator.data_logger import DataLogger
+from src.ev_cli_simulator.main import DumbAgent, main as simulator_main, run_simulation_run
+from src.ev_cli_simulator.recording import RecordedTrajectories, TrajectoryRecorder
+from src.ev_cli_simulator.recost import DegradationSetting, main, recost, step_prices
+
+def write_prices(path, scale: float = 1.0, days: int = 4):
+    """Writes an hourly price CSV in local time, starting on 2025-01-01."""
+    lines = ["ts_start,price"]
+    for day in pd.date_range("2025-01-01", periods=days).strftime("%Y-%m-%d"):
+        for hour in range(24):
+            lines.append(f"{day}T{hour:02d}:00:00+02:00,{scale * (0.05 + 0.01 * hour):.4f}")
+    path.write_text("\n".join(lines))
+    return str(path)
+
+@pytest.fixture
+def config(tmp_path):
+    """A seeded three-day configuration backed by a small price file."""
+    return {
+        'years': 3/365,
+        'battery_capacity': 20.0,
+        'max_charge_speed': 7.0,
+        'start_soc': 0.3,
+        'soc_target': 0.8,
+        'charger_power_levels': [-11, 0, 11],
+        'price_path': write_prices(tmp_path / "prices.csv"),
+        'scenarios': [
+            ScenarioConfig("Evening", 19, 23, 0.5),
+            ScenarioConfig("Night", 20, 3, 0.5),
+        ],
+        'seed': 4
+    }
+
+@pytest.fixture
+def recorded(config, tmp_path):
+    """Simulates two runs with a recorder; returns their summaries and the recording."""
+    rng = np.random.default_rng(1)
+    policy = NumpyQPolicy(
+        [rng.normal(size=(8, 2)), rng.normal(size=(3, 8))], [rng.normal(size=8), rng.normal(size=3)],
+        ['tanh', 'identity']
+    )
+    agents_to_run = {"DumbAgent": DumbAgent(), "Smart": policy}
+    recorder = TrajectoryRecorder(list(agents_to_run))
+    summaries = {
+        run_id: run_simulation_run({'run_id': run_id, **config}, agents_to_run, DataLogger(), recorder=recorder)
+        for run_id in (1, 2)
+    }
+    path = tmp_path / "trajectories.npz"
+    recorder.save(str(path), {
+        'battery_capacity': 20.0, 'start_soc': 0.3, 'duration_h': 0.25, 'num_days': 3,
+        'price_path': config['price_path']
+    })
+    return summaries, RecordedTrajectories.load(str(path))
+
+def test_recost_reproduces_the_simulation(config, recorded):
+    """Tests that the recorded prices and default degradation give the simulated results."""
+    summaries, trajectories = recorded
+    prices = step_prices(trajectories, load_price_model(config['price_path']))
+    results = pd.DataFrame(recost(trajectories, [('base', prices)], [DegradationSetting('default', DegradationModel())]))
+
+    assert len(results) == 4
+    for row in results.itertuples():
+        summary = summaries[row.run_id][row.agent_type]
+        assert row.total_cost == pytest.approx(summary['total_cost'], rel=1e-12)
+        assert row.kwh_charged == pytest.approx(summary['kwh_charged'], rel=1e-12)
+        assert row.final_soh == pytest.approx(summary['final_soh'], rel=1e-12)
+        assert row.steps == summary['steps']
+
+def test_recost_broadcasts_over_settings(config, recorded, tmp_path):
+    """Tests that every price and degradation setting is applied on its own."""
+    _, trajectories = recorded
+    base = step_prices(trajectories, load_price_model(config['price_path']))
+    double = step_prices(trajectories, load_price_model(write_prices(tmp_path / "double.csv", scale=2.0)))
+    model = DegradationModel()
+    settings = [
+        DegradationSetting('default', model),
+        DegradationSetting.from_dict({
+            'name': 'pricier', 'calendar_cost_rates': [2 * r for r in model._calendar_cost_rates],
+            'battery_eol_cost': 16000
+        }),
+    ]
+    results = pd.DataFrame(recost(trajectories, [('base', base), ('double', double)], settings))
+    assert len(results) == 2 * 2 * 4
+    results = results.set_index(['price_setting', 'degradation_setting', 'run_id', 'agent_type']).sort_index()
+
+    base_default = results.loc[('base', 'default')]
+    double_default = results.loc[('double', 'default')]
+    base_pricier = results.loc[('base', 'pricier')]
+    np.testing.assert_allclose(double_default['electricity_cost'], 2 * base_default['electricity_cost'], rtol=1e-3)
+    np.testing.assert_array_equal(double_default['calendar_cost'], base_default['calendar_cost'])
+    np.testing.assert_allclose(base_pricier['calendar_cost'], 2 * base_default['calendar_cost'], rtol=1e-12)
+    np.testing.assert_array_equal(base_pricier['cyclic_cost'], base_default['cyclic_cost'])
+    # Twice the calendar cost at twice the EOL cost keeps the calendar loss and halves the cyclic one
+    np.testing.assert_allclose(
+        1 - base_pricier['final_soh'],
+        (1 - base_default['final_soh']) - base_default['cyclic_cost'] / 8000 * 0.2 / 2, rtol=1e-9
+    )
+
+def test_degradation_setting_validation():
+    """Tests that malformed degradation settings are rejected."""
+    with pytest.raises(ValueError):
+        DegradationSetting.from_dict({'calendar_cost_rates': [0.1, 0.2, 0.3]})
+    with pytest.raises(ValueError):
+        DegradationSetting.from_dict({'name': 'x', 'decay_rate': 0.1})
+    with pytest.raises(ValueError):
+        DegradationSetting.from_dict({'name': 'x', 'calendar_cost_rates': [0.1, 0.2]})
+
+def test_record_and_recost_from_the_command_line(tmp_path, monkeypatch):
+    """Tests recording with worker processes and re-costing the recording with the CLI."""
+    price_path = write_prices(tmp_path / "prices.csv", days=365)
+    trajectories_path = tmp_path / "trajectories.npz"
+    monkeypatch.setattr(sys, 'argv', [
+        'ev-sim', '--price-path', price_path, '--years', '1', '--runs', '3',
+        '--battery-capacity', '20', '--max-charge-speed', '7', '--start-soc', '0.3',
+        '--soc-target', '0.8', '--charger-power-levels', '[-11,0,11]',
+        '--agents', 'DumbAgent:baseline', '--scenarios', 'Evening:19-23:1.0',
+        '--output-path', str(tmp_path / "runs.csv"), '--seed', '5', '--log-level', 'run',
+        '--workers', '2', '--record-trajectories', str(trajectories_path)
+    ])
+    simulator_main()
+    simulated = pd.read_csv(tmp_path / "runs.csv").set_index('run_id')
+
+    settings_path = tmp_path / "settings.json"
+    settings_path.write_text(json.dumps([{'name': 'default'}, {'name': 'cheap_eol', 'battery_eol_cost': 4000}]))
+    output_path = tmp_path / "recost.csv"
+    assert main([
+        str(trajectories_path), '--output-path', str(output_path),
+        '--price-paths', price_path, write_prices(tmp_path / "double.csv", scale=2.0, days=365),
+        '--degradation-settings', str(settings_path)
+    ]) == 0
+
+    results = pd.read_csv(output_path)
+    assert len(results) == 2 * 2 * 3
+    default = results[(results['price_setting'] == price_path) & (results['degradation_setting'] == 'default')]
+    np.testing.assert_allclose(
+        default.set_index('run_id')['total_cost'], simulated['total_cost'].loc[default['run_id']], rtol=1e-9
+    )
+    assert main([str(tmp_path / "missing.npz"), '--output-path', str(output_path)]) == 1
@@ -0,0 +1,163 @@
+import json
+import socket
+import sys
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+import pandas as pd
+import pytest
+from src.ev_cli_simulator.main import main
+from src.ev_cli_simulator.data_logger import read_output
+from src.ev_cli_simulator.server import EvaluationServer, LRUCache, _worker_state, job_argv, parse_job, run_job
+from src.ev_cli_simulator.core.price_model import PriceModelCache
+
+@pytest.fixture(scope="module")
+def price_path(tmp_path_factory):
+    """Writes an hourly price CSV covering all of 2025 in local time."""
+    lines = ["ts_start,price"]
+    for day in range(365):
+        date = datetime(2025, 1, 1) + timedelta(days=day)
+        for hour in range(24):
+            lines.append(f"{date:%Y-%m-%d}T{hour:02d}:00:00+02:00,{0.02 + 0.01 * ((day + hour) % 17):.2f}")
+    path = tmp_path_factory.mktemp("prices") / "year.csv"
+    path.write_text("\n".join(lines))
+    return str(path)
+
+def make_job(price_path, **options):
+    """Builds a short two-agent evaluation job."""
+    return {
+        'price_path': price_path, 'years': 1, 'runs': 3, 'battery_capacity': 20,
+        'max_charge_speed': 7, 'start_soc': 0.3, 'soc_target': 0.8,
+        'charger_power_levels': [-11, 0, 11], 'agents': ['First:baseline', 'Second:baseline'],
+        'scenarios': ['Evening:19-23:0.5', 'Night:22-02:0.5'], 'seed': 4, **options
+    }
+
+def test_lru_cache_evicts_least_recently_used():
+    """Tests that a full cache drops the entry that was used longest ago."""
+    cache = LRUCache(2)
+    loads = []
+    def load(key):
+        return lambda: loads.append(key) or key.upper()
+    assert cache.get('a', load('a')) == 'A'
+    cache.get('b', load('b'))
+    cache.get('a', load('a'))
+    cache.get('c', load('c'))
+    cache.get('a', load('a'))
+    cache.get('b', load('b'))
+    assert loads == ['a', 'b', 'c', 'b']
+    assert len(cache) == 2
+
+def test_price_model_cache_bound(price_path, tmp_path):
+    """Tests that a bounded price model cache keeps only the most recently used models."""
+    other = tmp_path / "other.csv"
+    other.write_text("ts_start,price\n2025-01-01T10:00:00Z,0.15")
+    cache = PriceModelCache(max_models=1)
+    first = cache.get(price_path)
+    cache.get(str(other))
+    assert len(cache) == 1
+    assert cache.get(price_path) is not first
+
+def test_job_argv_and_parse_job(price_path):
+    """Tests the conversion of jobs into command lines and the rejection of unsupported options."""
+    argv = job_argv({'runs': 2, 'batch': True, 'profile': False, 'charger-power-levels': [0, 11], 'agents': ['A:baseline']})
+    assert argv == ['--runs', '2', '--batch', '--charger-power-levels', '[0, 11]', '--agents', 'A:baseline', '--output-path', '/dev/null']
+
+    assert parse_job(make_job(price_path)).runs == 3
+    with pytest.raises(ValueError, match="required"):
+        parse_job({'runs': 2})
+    with pytest.raises(ValueError, match="checkpoint, workers"):
+        parse_job(make_job(price_path, checkpoint=True, workers=2))
+    with pytest.raises(ValueError, match="unrecognized arguments"):
+        parse_job(make_job(price_path, unknown_option=1))
+    with pytest.raises(ValueError):
+        parse_job([1, 2])
+
+@pytest.mark.parametrize("extension, options", [('csv', {}), ('parquet', {'batch': True})])
+def test_run_job_matches_cli(price_path, tmp_path, monkeypatch, extension, options):
+    """Tests that a job writes the same output as the CLI and returns the runs' summaries."""
+    job = make_job(price_path, output_path=str(tmp_path / f"job.{extension}"), log_level='day', **options)
+    result = run_job(parse_job(job))
+
+    cli_path = str(tmp_path / f"cli.{extension}")
+    monkeypatch.setattr(sys, 'argv', ['ev-sim'] + job_argv({**job, 'output_path': cli_path}))
+    main()
+    pd.testing.assert_frame_equal(read_output(result['output_path']), read_output(cli_path))
+
+    assert len(result['runs']) == 3 * 2
+    first = [run['total_cost'] for run in result['runs'] if run['agent'] == 'First']
+    assert result['mean'][0]['agent'] == 'First'
+    assert result['mean'][0]['total_cost'] == pytest.approx(sum(first) / 3)
+
+    # Without an output file, the same summaries come from run-level totals
+    summaries = run_job(parse_job(make_job(price_path, log_level='day', **options)))
+    assert summaries['output_path'] is None
+    assert [run['total_cost'] for run in summaries['runs']] == pytest.approx([run['total_cost'] for run in result['runs']])
+
+def test_run_job_reuses_cached_inputs(price_path):
+    """Tests that repeated jobs reuse the worker's price model and calendar."""
+    _worker_state.clear()
+    run_job(parse_job(make_job(price_path)))
+    price_models, calendars = _worker_state['price_models'], _worker_state['calendars']
+    calendar = next(iter(calendars._entries.values()))
+    run_job(parse_job(make_job(price_path, runs=1, seed=9)))
+    assert len(price_models) == 1 and len(calendars) == 1
+    assert next(iter(calendars._entries.values())) is calendar
+
+def _unix_request(socket_path: str, request: bytes) -> bytes:
+    """Sends a raw HTTP request over a Unix socket and returns the response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(request)
+        chunks = []
+        while chunk := client.recv(65536):
+            chunks.append(chunk)
+    return b''.join(chunks)
+
+def test_server_answers_over_http_and_unix_socket(price_path, tmp_path):
+    """Tests the HTTP endpoints on a TCP port and a Unix socket, with concurrent jobs."""
+    evaluation_server = EvaluationServer(workers=2)
+    tcp = evaluation_server.make_server(port=0)
+    unix = evaluation_server.make_server(socket_path=str(tmp_path / "eval.sock"))
+    threads = [threading.Thread(target=server.serve_forever, daemon=True) for server in (tcp, unix)]
+    for thread in threads:
+        thread.start()
+    url = f"http://127.0.0.1:{tcp.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{url}/health") as response:
+            assert json.load(response) == {'status': 'ok', 'workers': 2}
+
+        def post(job):
+            request = urllib.request.Request(f"{url}/evaluate", data=json.dumps(job).encode(), method='POST')
+            with urllib.request.urlopen(request) as response:
+                return json.load(response)
+        results = [None, None]
+        posters = [
+            threading.Thread(target=lambda i=i: results.__setitem__(i, post(make_job(price_path, seed=i))))
+            for i in range(2)
+        ]
+        for poster in posters:
+            poster.start()
+        for poster in posters:
+            poster.join()
+        assert [len(result['runs']) for result in results] == [6, 6]
+        assert results[0]['runs'] != results[1]['runs']
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post(make_job(price_path, resume=True))
+        assert error.value.code == 400
+        assert "resume" in json.load(error.value)['error']
+
+        body = json.dumps(make_job(price_path, runs=1)).encode()
+        response = _unix_request(
+            unix.server_address,
+            b"POST /evaluate HTTP/1.0\r\nContent-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+        )
+        assert response.startswith(b"HTTP/1.0 200")
+        assert len(json.loads(response.split(b"\r\n\r\n", 1)[1])['runs']) == 2
+    finally:
+        for server in (tcp, unix):
+            server.shutdown()
+            server.server_close()
+        evaluation_server.close()
+    assert not (tmp_path / "eval.sock").exists()
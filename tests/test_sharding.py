@@ -0,0 +1,117 @@
+import shutil
+import sys
+from datetime import datetime, timedelta
+import pandas as pd
+import pytest
+from src.ev_cli_simulator.main import main
+from src.ev_cli_simulator.data_logger import read_output
+from src.ev_cli_simulator.sharding import load_shard_manifest, parse_shard, shard_manifest_path, shard_run_ids
+
+@pytest.fixture(scope="module")
+def price_path(tmp_path_factory):
+    """Writes an hourly price CSV covering all of 2025 in local time."""
+    lines = ["ts_start,price"]
+    for day in range(365):
+        date = datetime(2025, 1, 1) + timedelta(days=day)
+        for hour in range(24):
+            lines.append(f"{date:%Y-%m-%d}T{hour:02d}:00:00+02:00,{0.02 + 0.01 * ((day + hour) % 17):.2f}")
+    path = tmp_path_factory.mktemp("prices") / "year.csv"
+    path.write_text("\n".join(lines))
+    return str(path)
+
+def run_main(monkeypatch, *args):
+    """Runs the CLI with the given arguments."""
+    monkeypatch.setattr(sys, 'argv', ['ev-sim', *args])
+    main()
+
+def run_shard(monkeypatch, price_path, output_path, *extra_args, runs=5, seed=11):
+    """Runs the CLI on a short one-agent configuration."""
+    run_main(
+        monkeypatch, '--price-path', price_path, '--years', '1', '--runs', str(runs),
+        '--battery-capacity', '20', '--max-charge-speed', '7', '--start-soc', '0.3',
+        '--soc-target', '0.8', '--charger-power-levels', '[-11,0,11]',
+        '--agents', 'DumbAgent:baseline', '--scenarios', 'Evening:19-23:0.5', 'Night:22-02:0.5',
+        '--output-path', str(output_path), '--log-level', 'day', '--seed', str(seed), *extra_args
+    )
+
+def test_parse_shard():
+    """Tests parsing of valid and invalid shard specifications."""
+    assert parse_shard("2/8") == (2, 8)
+    for spec in ["0/4", "5/4", "2", "a/b", "1/2/3"]:
+        with pytest.raises(ValueError):
+            parse_shard(spec)
+
+@pytest.mark.parametrize("num_runs", [1, 7, 10, 64])
+@pytest.mark.parametrize("num_shards", [1, 3, 8])
+def test_shard_run_ids_partition_the_runs(num_runs, num_shards):
+    """Tests that shards are disjoint contiguous blocks that cover every run in order."""
+    run_ids = list(range(1, num_runs + 1))
+    shards = [shard_run_ids(run_ids, i, num_shards) for i in range(1, num_shards + 1)]
+    assert [run_id for shard in shards for run_id in shard] == run_ids
+    sizes = [len(shard) for shard in shards]
+    assert max(sizes) - min(sizes) <= 1
+
+@pytest.mark.parametrize("extension, extra_args", [
+    ('csv', []), ('parquet', ['--batch']), ('arrow', ['--workers', '2']), ('csv', ['--checkpoint'])
+])
+def test_merged_shards_match_unsharded_output(price_path, tmp_path, monkeypatch, extension, extra_args):
+    """Tests that merging the shards of an evaluation reproduces the output of a single invocation."""
+    single = tmp_path / f"single.{extension}"
+    run_shard(monkeypatch, price_path, single, *extra_args)
+
+    shard_paths = []
+    for index in (1, 2, 3):
+        # Every shard runs in its own directory, as on separate machines
+        path = tmp_path / f"node{index}" / f"shard.{extension}"
+        run_shard(monkeypatch, price_path, path, '--shard', f"{index}/3", *extra_args)
+        assert load_shard_manifest(str(path))['run_ids'] == shard_run_ids([1, 2, 3, 4, 5], index, 3)
+        shard_paths.append(str(path))
+
+    merged = tmp_path / f"merged.{extension}"
+    run_main(monkeypatch, 'merge', *reversed(shard_paths), '--output-path', str(merged))
+    keys = ['run_id', 'day', 'agent_type']
+    pd.testing.assert_frame_equal(
+        read_output(str(merged)).sort_values(keys, kind='stable').reset_index(drop=True),
+        read_output(str(single)).sort_values(keys, kind='stable').reset_index(drop=True)
+    )
+    assert load_shard_manifest(str(merged))['run_ids'] == [1, 2, 3, 4, 5]
+
+def test_merge_rejects_missing_duplicated_and_foreign_shards(price_path, tmp_path, monkeypatch, capsys):
+    """Tests that merge refuses incomplete or inconsistent sets of shards."""
+    paths = {}
+    for index, seed in ((1, 11), (2, 11), (3, 12)):
+        paths[index] = str(tmp_path / f"shard{index}.csv")
+        run_shard(monkeypatch, price_path, paths[index], '--shard', f"{index}/3", seed=seed)
+    # A shard copied to another directory keeps its manifest next to it
+    copy = tmp_path / "copy" / "shard1.csv"
+    copy.parent.mkdir()
+    shutil.copy(paths[1], copy)
+    shutil.copy(shard_manifest_path(paths[1]), shard_manifest_path(str(copy)))
+    capsys.readouterr()
+
+    merged = str(tmp_path / "merged.csv")
+    run_main(monkeypatch, 'merge', paths[1], paths[2], '--output-path', merged)
+    assert "Runs 5 are missing (shards 3 not given)" in capsys.readouterr().out
+    run_main(monkeypatch, 'merge', paths[1], str(copy), paths[2], '--output-path', merged)
+    assert "Shard 1/3 is given twice" in capsys.readouterr().out
+    run_main(monkeypatch, 'merge', paths[1], paths[2], paths[3], '--output-path', merged)
+    assert "its seed is 12, not 11" in capsys.readouterr().out
+    run_main(monkeypatch, 'merge', paths[1], paths[2], paths[3], '--output-path', str(tmp_path / "merged.parquet"))
+    assert "Error:" in capsys.readouterr().out
+
+    with open(paths[2], 'a') as f:
+        f.write("truncated copy\n")
+    run_main(monkeypatch, 'merge', str(copy), paths[2], '--output-path', merged)
+    assert "has changed since its shard finished" in capsys.readouterr().out
+
+def test_shard_requires_seed(price_path, tmp_path, monkeypatch, capsys):
+    """Tests that a shard without a global seed is rejected."""
+    run_main(
+        monkeypatch, '--price-path', price_path, '--years', '1', '--runs', '2',
+        '--battery-capacity', '20', '--max-charge-speed', '7', '--start-soc', '0.3',
+        '--soc-target', '0.8', '--charger-power-levels', '[0,11]',
+        '--agents', 'DumbAgent:baseline', '--scenarios', 'Evening:19-23:1.0',
+        '--output-path', str(tmp_path / "out.csv"), '--shard', '1/2'
+    )
+    assert "--shard requires --seed" in capsys.readouterr().out
+    assert not (tmp_path / "out.csv").exists()
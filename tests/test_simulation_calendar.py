@@ -0,0 +1,49 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from src.ev_cli_simulator.config_manager import ScenarioConfig
+from src.ev_cli_simulator.core.price_model import PriceModel
+from src.ev_cli_simulator.core.simulation_calendar import SimulationCalendar
+
+SCENARIOS = [
+    ScenarioConfig("Workday", 19, 7, 0.7),
+    ScenarioConfig("Afternoon", 12, 16, 0.3),
+]
+
+@pytest.fixture(scope="module")
+def price_model():
+    """A PriceModel with hourly UTC prices for all of 2025."""
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    lines = ["ts_start,price"]
+    for hour in range(365 * 24):
+        lines.append(f"{start + timedelta(hours=hour):%Y-%m-%dT%H:%M:%SZ},{(hour % 53) / 100:.2f}")
+    return PriceModel("\n".join(lines))
+
+def _reference_timestamp(day, step):
+    """The timestamp the run loop used to build on every step."""
+    return datetime(2025, 1, 1, tzinfo=ZoneInfo("Europe/Riga")) + timedelta(days=day, minutes=15 * step)
+
+def test_calendar_matches_per_step_datetimes(price_model):
+    """
+    Tests that the precomputed hours, epochs and prices equal what per-step
+    datetime arithmetic gives, across both DST transitions of 2025.
+    """
+    calendar = SimulationCalendar(365, SCENARIOS, price_model)
+
+    for day in (0, 87, 88, 200, 298, 299, 364):
+        day_prices = calendar.day_prices(day)
+        for step in range(96):
+            timestamp = _reference_timestamp(day, step)
+            assert calendar.timestamp(day, step) == timestamp
+            assert calendar.step_hours[step] == timestamp.hour
+            assert calendar.step_epochs[day, step] == int(timestamp.timestamp())
+            assert day_prices[timestamp.hour] == price_model.get_price(timestamp)
+
+def test_calendar_window_steps():
+    """Tests the in-window masks, including a window that wraps past midnight."""
+    calendar = SimulationCalendar(1, SCENARIOS)
+
+    assert calendar.window_steps[0] == list(range(0, 28)) + list(range(76, 96))
+    assert calendar.window_steps[1] == list(range(48, 64))
+    assert calendar.window_masks.shape == (2, 96)
+    assert calendar.day_prices(0) == [None] * 24
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.ev_cli_simulator.main import run_simulation_run, DumbAgent
+from src.ev_cli_simulator.agents.numpy_policy import NumpyQPolicy
+from src.ev_cli_simulator.agents.tabular_policy import TabularPolicy
+from src.ev_cli_simulator.config_manager import ScenarioConfig
+from src.ev_cli_simulator.data_logger import DataLogger
+from src.ev_cli_simulator.main import _build_cost_calculator
+from src.ev_cli_simulator.core.price_model import load_price_model
+from src.ev_cli_simulator.policy_compiler import compile_policy
+from src.ev_cli_simulator.profiling import Profiler
+from src.ev_cli_simulator import step_kernel
+from src.ev_cli_simulator.step_kernel import JIT_AVAILABLE, StepKernel, _simulate_days
+
+requires_jit = pytest.mark.skipif(not JIT_AVAILABLE, reason="numba is not installed")
+
+@pytest.fixture
+def month_config(tmp_path):
+    """A 30-day, three-scenario configuration with varying and negative prices."""
+    lines = ["ts_start,price"]
+    for day in range(1, 32):
+        for hour in range(24):
+            lines.append(f"2025-01-{day:02d} {hour:02d}:00:00+02:00,{((day * 7 + hour * 3) % 11 - 2) / 10:.2f}")
+    path = tmp_path / "prices.csv"
+    path.write_text("\n".join(lines))
+    return {
+        'run_id': 1,
+        'years': 30 / 365 + 1e-9,
+        'battery_capacity': 30.0,
+        'max_charge_speed': 7.0,
+        'charger_power_levels': [-11, 0, 7.4, 11],
+        'scenarios': [
+            ScenarioConfig("Evening", 19, 23, 0.4), ScenarioConfig("Night", 20, 3, 0.4),
+            ScenarioConfig("Holiday", 0, 24, 0.2),
+        ],
+        'price_path': str(path),
+        'soc_target': 0.7,
+        'start_soc': 0.3,
+        'seed': 9,
+    }
+
+@pytest.fixture
+def agents(month_config):
+    """A baseline agent and table policies, one with actions outside the power levels."""
+    rng = np.random.default_rng(3)
+    network = NumpyQPolicy(
+        [rng.normal(size=(16, 2)), rng.normal(size=(4, 16))], [rng.normal(size=16), rng.normal(size=4)],
+        ['tanh', 'identity']
+    )
+    levels, target = month_config['charger_power_levels'], month_config['soc_target']
+    actions = rng.integers(0, 6, size=(51, 48))
+    return {
+        "Dumb": DumbAgent(),
+        "Network": compile_policy(network, levels, target, soc_points=201),
+        "Random": TabularPolicy(actions, 0.1, 0.9),
+    }
+
+@requires_jit
+@pytest.mark.parametrize("log_level", ["day", "run"])
+def test_kernel_matches_python_loop(month_config, agents, log_level):
+    """Tests that the compiled kernel reproduces the Python run loop exactly."""
+    config = {**month_config, 'log_level': log_level}
+    kernel = StepKernel(config, _build_cost_calculator(config, load_price_model(config['price_path'])), 8000)
+    assert kernel.applies_to(agents.values())
+
+    python_log, kernel_log = DataLogger(), DataLogger()
+    expected = run_simulation_run({**config, 'jit': False}, agents, python_log)
+    actual = run_simulation_run(config, agents, kernel_log)
+
+    assert actual == expected
+    pd.testing.assert_frame_equal(kernel_log.get_dataframe(), python_log.get_dataframe(), check_exact=True)
+
+@requires_jit
+@pytest.mark.parametrize("soc_target", [0.7, 0.300000012920929, np.float64(0.300000012920929)])
+def test_kernel_threshold_compares_like_numpy(month_config, soc_target):
+    """
+    Tests that the baseline's SOC comparison follows NumPy's promotion: the
+    float32 observation of SOC 0.3 is below 0.300000012920929 in float64 but
+    not in float32, where a Python float target is compared.
+    """
+    config = {**month_config, 'log_level': 'run', 'soc_target': soc_target}
+    assert run_simulation_run(config, {"Dumb": DumbAgent()}, DataLogger()) == \
+        run_simulation_run({**config, 'jit': False}, {"Dumb": DumbAgent()}, DataLogger())
+
+@requires_jit
+def test_kernel_is_profiled_as_one_phase(month_config, agents):
+    """Tests that a profiled kernel run records its phase, steps and logged rows."""
+    profiler, logger = Profiler(), DataLogger()
+    summaries = run_simulation_run({**month_config, 'log_level': 'day'}, agents, logger, profiler=profiler)
+
+    report = profiler.report()
+    assert set(report['phases']) == {'setup', 'kernel', 'run_end'}
+    assert report['rows_logged'] == len(logger.get_dataframe()) == 30 * len(agents)
+    assert report['steps'] == sum(s['steps'] for s in summaries.values())
+
+def test_kernel_is_optional(month_config, agents):
+    """Tests that unsupported agents, step logging and a missing numba use the Python loop."""
+    config = {**month_config, 'log_level': 'run'}
+    kernel = StepKernel(config, _build_cost_calculator(config, load_price_model(config['price_path'])), 8000)
+    network = NumpyQPolicy([np.ones((3, 2))], [np.zeros(3)], ['identity'])
+    assert not kernel.applies_to([DumbAgent(), network])
+    assert kernel.applies_to([DumbAgent()]) == JIT_AVAILABLE
+
+    step_log = DataLogger()
+    summaries = run_simulation_run({**config, 'log_level': 'step'}, agents, step_log)
+    assert summaries == run_simulation_run(config, agents, DataLogger())
+
+def test_python_kernel_matches_compiled_kernel(month_config, agents, monkeypatch):
+    """Tests that the kernel function also runs, with the same results, as plain Python."""
+    config = {**month_config, 'log_level': 'run'}
+    kernel = StepKernel(config, _build_cost_calculator(config, load_price_model(config['price_path'])), 8000)
+    masks = np.zeros((2, 96), dtype=bool)
+    masks[0, 76:92] = True
+    masks[1, :] = True
+    day_scenarios = np.array([0, 1, 1, 0, 1])
+    prices = np.random.default_rng(0).uniform(-0.05, 0.3, size=(5, 96))
+
+    for agent in agents.values():
+        compiled = kernel.run(agent, day_scenarios, masks, prices)
+        with monkeypatch.context() as patch:
+            patch.setattr(step_kernel, '_kernel', lambda: _simulate_days)
+            interpreted = kernel.run(agent, day_scenarios, masks, prices)
+        for a, b in zip(compiled, interpreted):
+            np.testing.assert_array_equal(a, b)
+        assert compiled[0][:, 5].tolist() == [16, 96, 96, 16, 96]
+
+@requires_jit
+def test_kernel_missing_price(month_config):
+    """Tests that a window step without a price raises like the Python loop."""
+    config = {**month_config, 'years': 40 / 365, 'log_level': 'run'}
+    with pytest.raises(ValueError, match="Price not found") as compiled:
+        run_simulation_run(config, {"Dumb": DumbAgent()}, DataLogger())
+    with pytest.raises(ValueError, match="Price not found") as python:
+        run_simulation_run({**config, 'jit': False}, {"Dumb": DumbAgent()}, DataLogger())
+    assert str(compiled.value) == str(python.value)
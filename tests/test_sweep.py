@@ -0,0 +1,120 @@
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from src.ev_cli_simulator.agents.numpy_policy import NumpyQPolicy
+from src.ev_cli_simulator.config_manager import ScenarioConfig
+from src.ev_cli_simulator.data_logger import DataLogger
+from src.ev_cli_simulator.main import DumbAgent, main, run_simulation_batch
+from src.ev_cli_simulator.sweep import ParameterGrid
+
+@pytest.fixture
+def config(tmp_path):
+    """A seeded three-day configuration backed by a small price file."""
+    lines = ["ts_start,price"]
+    for day in range(1, 5):
+        for hour in range(24):
+            lines.append(f"2025-01-{day:02d}T{hour:02d}:00:00+02:00,{0.05 + 0.01 * hour:.2f}")
+    price_path = tmp_path / "prices.csv"
+    price_path.write_text("\n".join(lines))
+    return {
+        'years': 3/365,
+        'battery_capacity': 20.0,
+        'max_charge_speed': 7.0,
+        'start_soc': 0.3,
+        'soc_target': 0.8,
+        'charger_power_levels': [-11, 0, 11],
+        'price_path': str(price_path),
+        'scenarios': [
+            ScenarioConfig("Evening", 19, 23, 0.5),
+            ScenarioConfig("Night", 20, 3, 0.5),
+        ],
+        'seed': 4
+    }
+
+def make_policy(num_actions: int) -> NumpyQPolicy:
+    """A small random Q-network with `num_actions` outputs."""
+    rng = np.random.default_rng(1)
+    return NumpyQPolicy(
+        [rng.normal(size=(8, 2)), rng.normal(size=(num_actions, 8))],
+        [rng.normal(size=8), rng.normal(size=num_actions)],
+        ['tanh', 'identity']
+    )
+
+def test_parameter_grid_expands_combinations(config):
+    """Tests that the grid holds every combination, point-major per row."""
+    grid = ParameterGrid({**config, 'sweep': {'battery_capacity': [20.0, 40.0], 'soc_target': [0.7, 0.8, 0.9]}})
+    assert len(grid) == 6
+    assert grid.values('battery_capacity') == [20.0, 20.0, 20.0, 40.0, 40.0, 40.0]
+    assert grid.values('start_soc') == [0.3] * 6
+    assert grid.row_values('soc_target', 2).ravel().tolist() == [0.7, 0.7, 0.8, 0.8, 0.9, 0.9] * 2
+
+    columns = grid.log_columns(np.array([0, 5]))
+    assert list(columns) == ['grid_point', 'battery_capacity', 'soc_target']
+    assert columns['battery_capacity'].tolist() == [20.0, 40.0]
+
+    levels = ParameterGrid({**config, 'max_charge_speed': 7.0, 'sweep': {'charger_power_levels': [[0, 11], [-3, 0, 5]]}})
+    assert levels.capped_power_levels() == [-3, 0, 5, 7.0]
+    assert levels.log_columns(np.array([1]))['charger_power_levels'] == ['[-3, 0, 5]']
+    assert len(ParameterGrid(config)) == 1
+
+@pytest.mark.parametrize("log_level", ['step', 'day'])
+def test_sweep_matches_separate_batches(config, log_level):
+    """
+    Tests that every grid point of a sweep reproduces a batch simulated with
+    that point's parameters on its own.
+    """
+    sweep = {
+        'battery_capacity': [20.0, 35.0],
+        'start_soc': [0.2, 0.3],
+        'soc_target': [0.8, 0.9],
+        'charger_power_levels': [[-11.0, 0.0, 11.0], [0.0, 3.7]],
+    }
+    config = {**config, 'log_level': log_level}
+    agents_to_run = {"DumbAgent": DumbAgent(), "Smart": make_policy(3)}
+    run_ids = [1, 2, 3]
+
+    sweep_log = DataLogger()
+    summaries = run_simulation_batch({**config, 'sweep': sweep}, agents_to_run, sweep_log, run_ids)
+    sweep_df = sweep_log.get_dataframe()
+    grid = ParameterGrid({**config, 'sweep': sweep})
+    assert len(grid) == 16
+    assert sorted(sweep_df['grid_point'].unique()) == list(range(16))
+
+    for p, point in enumerate(grid.points):
+        point_log = DataLogger()
+        point_summaries = run_simulation_batch({**config, **point}, agents_to_run, point_log, run_ids)
+        for run_id in run_ids:
+            assert summaries[(p, run_id)] == point_summaries[run_id]
+
+        rows = sweep_df[sweep_df['grid_point'] == p].reset_index(drop=True)
+        assert (rows['battery_capacity'] == point['battery_capacity']).all()
+        pd.testing.assert_frame_equal(
+            rows.drop(columns=['grid_point', *sweep]), point_log.get_dataframe()
+        )
+
+def test_main_sweep(tmp_path, monkeypatch):
+    """Tests that --sweep writes the rows of every grid point in one invocation."""
+    lines = ["ts_start,price"]
+    for day in pd.date_range("2025-01-01", periods=365).strftime("%Y-%m-%d"):
+        for hour in range(24):
+            lines.append(f"{day}T{hour:02d}:00:00+02:00,{0.05 + 0.01 * hour:.2f}")
+    price_path = tmp_path / "prices.csv"
+    price_path.write_text("\n".join(lines))
+    output_path = tmp_path / "sweep.csv"
+
+    monkeypatch.setattr(sys, 'argv', [
+        'ev-sim', '--price-path', str(price_path), '--years', '1', '--runs', '2',
+        '--battery-capacity', '20', '--max-charge-speed', '7', '--start-soc', '0.3',
+        '--soc-target', '0.8', '--charger-power-levels', '[-11,0,11]',
+        '--agents', 'DumbAgent:baseline', '--scenarios', 'Evening:19-23:1.0',
+        '--output-path', str(output_path), '--seed', '5', '--log-level', 'run',
+        '--sweep', 'battery_capacity=20:60:20', 'soc_target=0.7,0.9'
+    ])
+    main()
+
+    df = pd.read_csv(output_path)
+    assert len(df) == 6 * 2
+    assert (df['days'] == 365).all()
+    assert sorted(df['battery_capacity'].unique()) == [20.0, 40.0, 60.0]
+    assert sorted(df['soc_target'].unique()) == [0.7, 0.9]
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.ev_cli_simulator.main import run_simulation_run, DumbAgent
+from src.ev_cli_simulator.data_logger import DataLogger
+from src.ev_cli_simulator.config_manager import ScenarioConfig
+from src.ev_cli_simulator.core.battery import Battery
+from src.ev_cli_simulator.core.cost_calculator import CostCalculator
+from src.ev_cli_simulator.core.degradation_model import DegradationModel
+from src.ev_cli_simulator.core.price_model import PriceModel
+from src.ev_cli_simulator.trajectory_cache import DayTrajectoryCache
+
+class LiveDumbAgent(DumbAgent):
+    """A DumbAgent that opts out of memoization, simulated step by step."""
+    is_deterministic = False
+
+@pytest.fixture
+def week_config(tmp_path):
+    """A seven-day, two-scenario configuration with varying prices."""
+    lines = ["ts_start,price"]
+    for day in range(1, 9):
+        for hour in range(24):
+            lines.append(f"2025-01-{day:02d} {hour:02d}:00:00+02:00,{((day * 7 + hour * 3) % 11 - 2) / 10:.2f}")
+    path = tmp_path / "prices.csv"
+    path.write_text("\n".join(lines))
+    return {
+        'years': 7 / 365 + 1e-9,
+        'battery_capacity': 30.0,
+        'max_charge_speed': 7.0,
+        'charger_power_levels': [-11, 0, 11],
+        'scenarios': [ScenarioConfig("Evening", 19, 23, 0.5), ScenarioConfig("Night", 20, 3, 0.5)],
+        'price_path': str(path),
+        'soc_target': 0.8,
+        'start_soc': 0.3,
+        'seed': 4,
+    }
+
+@pytest.mark.parametrize("log_level", ["step", "day", "run"])
+def test_memoized_days_match_live_simulation(week_config, log_level):
+    """Tests that replaying cached trajectories reproduces the live simulation exactly."""
+    config = {**week_config, 'run_id': 1, 'log_level': log_level}
+    live_log, memo_log = DataLogger(), DataLogger()
+
+    live = run_simulation_run(config, {"A": LiveDumbAgent(), "B": LiveDumbAgent()}, live_log)
+    memo = run_simulation_run(config, {"A": DumbAgent(), "B": DumbAgent()}, memo_log)
+
+    assert memo == live
+    pd.testing.assert_frame_equal(memo_log.get_dataframe(), live_log.get_dataframe(), check_exact=True)
+
+def test_mixed_agents_match_live_simulation(week_config):
+    """Tests that memoized and live agents can share a run."""
+    config = {**week_config, 'run_id': 1, 'log_level': 'day'}
+    live_log, mixed_log = DataLogger(), DataLogger()
+
+    run_simulation_run(config, {"A": LiveDumbAgent(), "B": LiveDumbAgent()}, live_log)
+    run_simulation_run(config, {"A": DumbAgent(), "B": LiveDumbAgent()}, mixed_log)
+
+    pd.testing.assert_frame_equal(mixed_log.get_dataframe(), live_log.get_dataframe(), check_exact=True)
+
+def test_trajectories_are_simulated_once_per_scenario(week_config, mocker):
+    """Tests that a deterministic agent is only queried while building trajectories."""
+    spy = mocker.spy(DumbAgent, "predict")
+    run_simulation_run({**week_config, 'run_id': 1, 'log_level': 'run'}, {"A": DumbAgent()}, DataLogger())
+    # One pass over each scenario's window: 16 evening steps and 28 night steps
+    assert spy.call_count <= 16 + 28
+
+def test_cache_keys_on_agent_scenario_and_start_soc(week_config):
+    """Tests the cache key and the recorded trajectory."""
+    price_model = PriceModel("ts_start,price\n2025-01-01T10:00:00Z,0.15")
+    calculator = CostCalculator(price_model, DegradationModel())
+    cache = DayTrajectoryCache(week_config, calculator, 8000)
+    agent = DumbAgent()
+
+    trajectory = cache.get(agent, 0, [76, 77, 78], 0.3)
+    assert cache.get(agent, 0, [76, 77, 78], 0.3) is trajectory
+    cache.get(agent, 0, [76, 77, 78], 0.5)
+    cache.get(agent, 1, [80, 81], 0.3)
+    cache.get(DumbAgent(), 0, [76, 77, 78], 0.3)
+    assert len(cache) == 4
+
+    battery = Battery(30.0)
+    battery.soc = 0.3
+    for power_kw, soc in zip(trajectory.power_kw, trajectory.soc):
+        assert power_kw == 7
+        battery.update_soc(power_kw, 0.25)
+        assert soc == battery.soc
+    assert trajectory.final_soc == battery.soc
+    assert trajectory.final_soh(1.0) == pytest.approx(1.0 - sum(trajectory.soh_loss))
+    np.testing.assert_allclose(
+        trajectory.day_costs(np.array([0.1, 0.2, -0.1]))['electricity_cost'], [0.175, 0.35, -0.175]
+    )